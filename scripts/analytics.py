@@ -0,0 +1,239 @@
+import functools
+import sqlite3
+from pathlib import Path
+from typing import List, Dict, Any
+
+import pandas as pd
+
+from build_institutions import institution_key
+from db_utils import DbSnapshot
+
+DB_PATH = Path("database/chi_ac.db")
+PARQUET_DIR = Path("data/parquet")
+
+# Seconds between DB version checks of the in-memory snapshot
+SNAPSHOT_CHECK_INTERVAL = 1.0
+
+# Memoized tool results per frames object; arguments come from the LLM, so bounded
+MEMO_SIZE = 256
+
+ROLE_COLUMNS = ["ac_role_id", "year", "venue", "committee", "affiliation_raw", "country", "person_id"]
+FACT_COLUMNS = ["person_id", "pub_key", "year", "venue"]
+INSTITUTION_TABLES = ["institutions", "institution_aliases", "role_institutions"]
+GEO_TABLE = "countries"
+
+
+def _or_unknown(s: pd.Series) -> pd.Series:
+    """COALESCE(NULLIF(TRIM(x), ''), 'Unknown') as a categorical column."""
+    s = s.astype("object").where(s.notna(), None)
+    s = s.map(lambda v: v.strip(" ") if isinstance(v, str) else v)
+    s = s.where(s.notna() & (s != ""), "Unknown")
+    return s.astype("category")
+
+def _top(counts: pd.Series, key_name: str, value_name: str, limit=None) -> List[Dict[str, Any]]:
+    """Sort by count desc, then key asc (deterministic ties), as a list of dicts."""
+    df = counts.rename(value_name).reset_index()
+    df.columns = [key_name, value_name]
+    df[key_name] = df[key_name].astype("object")
+    df = df.sort_values([value_name, key_name], ascending=[False, True], kind="mergesort")
+    if limit is not None:
+        df = df.head(limit)
+    return [{key_name: k, value_name: int(v)} for k, v in zip(df[key_name], df[value_name])]
+
+
+class AnalyticsFrames:
+    """
+    Columnar copy of the tables behind the aggregate tools in db_queries.
+    String columns are categorical, so groupbys run on small integer codes.
+    Each method returns exactly what the SQL version of the same tool returns.
+
+    roles: ac_roles columns ROLE_COLUMNS
+    high_conf_ids: person_ids in persons_high_conf
+    hc_pubs: high-confidence AC publication fact (FACT_COLUMNS)
+    institutions: optional {name: DataFrame} of INSTITUTION_TABLES
+                  (build_institutions.py); without it affiliations are raw strings
+    countries: optional countries table (build_geography.py); with it, and a
+               country_code column in roles, countries are ISO-normalized names
+    """
+
+    def __init__(self, roles: pd.DataFrame, high_conf_ids, hc_pubs: pd.DataFrame,
+                 institutions: Dict[str, pd.DataFrame] = None, countries: pd.DataFrame = None):
+        country_codes = roles["country_code"] if "country_code" in roles else None
+        roles = roles[ROLE_COLUMNS].copy()
+        for col in ("venue", "committee", "affiliation_raw", "country"):
+            roles[col] = roles[col].astype("category")
+        roles["person_id"] = roles["person_id"].astype("Int64")
+        if countries is not None and country_codes is not None:
+            names = dict(zip(countries["country_code"], countries["name"]))
+            roles["country_key"] = country_codes.astype("object").map(names).fillna("Unknown").astype("category")
+        else:
+            roles["country_key"] = _or_unknown(roles["country"])
+        roles["committee_key"] = _or_unknown(roles["committee"])
+        roles["high_conf"] = roles["person_id"].isin(set(high_conf_ids)).fillna(False).astype(bool)
+        self.roles = roles
+        self.hc_roles = roles[roles["high_conf"]]
+        self.hc_pubs = hc_pubs[FACT_COLUMNS].copy()
+        self.institutions = institutions
+        if institutions is not None:
+            names = institutions["institutions"]
+            self.inst_names = pd.Series(names["name"].values, index=names["institution_id"].values)
+            aliases = institutions["institution_aliases"]
+            self.alias_keys = " " + aliases["alias_key"].astype("object") + " "
+            self.alias_inst = aliases["institution_id"]
+            self.role_insts = institutions["role_institutions"][["ac_role_id", "institution_id"]]
+        self._memo = functools.lru_cache(maxsize=MEMO_SIZE)(self._compute)
+
+    def _compute(self, method: str, args: tuple):
+        return getattr(self, method)(*args)
+
+    def cached(self, method: str, *args):
+        """
+        Result of self.<method>(*args), kept for the MEMO_SIZE most recently
+        used argument sets of this frames object. The frames never change after
+        loading, so a reload (new object) is the only invalidation needed.
+        Callers get a copy of the outer list / dict only: rows are shared
+        between calls and must not be mutated.
+        """
+        hit = self._memo(method, args)
+        return list(hit) if isinstance(hit, list) else dict(hit)
+
+    def _roles(self, high_conf_only: bool) -> pd.DataFrame:
+        return self.hc_roles if high_conf_only else self.roles
+
+    # ----- tools -----
+
+    def ac_year_stats_all(self) -> List[Dict[str, Any]]:
+        s = self.roles.groupby("year")["person_id"].nunique()
+        return [{"year": int(y), "ac_count": int(c)} for y, c in s.items()]
+
+    def ac_year_stats_high_conf(self) -> List[Dict[str, Any]]:
+        s = self.hc_roles.groupby("year")["person_id"].nunique()
+        return [{"year": int(y), "ac_count_high_conf": int(c)} for y, c in s.items()]
+
+    def top_affiliations_high_conf(self, limit: int = 20) -> List[Dict[str, Any]]:
+        if self.institutions is not None:
+            links = self.role_insts[self.role_insts["ac_role_id"].isin(self.hc_roles["ac_role_id"])]
+            counts = links.groupby("institution_id").size()
+            counts.index = self.inst_names.reindex(counts.index).values
+            return _top(counts, "affiliation", "ac_roles_count", limit)
+
+        r = self.hc_roles
+        aff = r["affiliation_raw"]
+        r = r[aff.notna() & (aff != "")]
+        counts = r.groupby("affiliation_raw", observed=True).size()
+        return _top(counts, "affiliation", "ac_roles_count", limit)
+
+    def affiliation_trend(self, keyword: str, high_conf_only: bool = True) -> List[Dict[str, Any]]:
+        r = self._roles(high_conf_only)
+        if self.institutions is not None:
+            key = institution_key(keyword)
+            if not key:
+                return []
+            hits = self.alias_inst[self.alias_keys.str.contains(f" {key} ", regex=False)]
+            role_ids = self.role_insts.loc[self.role_insts["institution_id"].isin(hits), "ac_role_id"]
+            r = r[r["ac_role_id"].isin(role_ids)]
+            s = r.groupby("year")["person_id"].nunique()
+            return [{"year": int(y), "ac_count": int(c)} for y, c in s.items()]
+
+        cats = r["affiliation_raw"].cat.categories
+        hits = cats[cats.str.lower().str.contains(keyword.lower(), regex=False)]
+        r = r[r["affiliation_raw"].isin(hits)]
+        s = r.groupby("year")["person_id"].nunique()
+        return [{"year": int(y), "ac_count": int(c)} for y, c in s.items()]
+
+    def top_countries_overall(self, limit: int = 20, high_conf_only: bool = True) -> List[Dict[str, Any]]:
+        r = self._roles(high_conf_only)
+        counts = r.groupby("country_key", observed=True)["person_id"].nunique()
+        return _top(counts, "country", "ac_count", limit)
+
+    def ac_year_overview(self, year: int, high_conf_only: bool = True,
+                         max_countries: int = 30, max_committees: int = 30) -> Dict[str, Any]:
+        r = self._roles(high_conf_only)
+        r = r[r["year"] == year]
+        total_ac = int(r["person_id"].nunique())
+
+        def add_percentage(key_col, key_name, max_items):
+            if total_ac <= 0:
+                return []
+            counts = r.groupby(key_col, observed=True)["person_id"].nunique()
+            rows = _top(counts, key_name, "ac_count", max_items)
+            for row in rows:
+                row["percentage"] = round(100.0 * row["ac_count"] / total_ac, 2)
+            return rows
+
+        return {
+            "year": year,
+            "high_conf_only": high_conf_only,
+            "total_ac": total_ac,
+            "countries": add_percentage("country_key", "country", max_countries),
+            "committees": add_percentage("committee_key", "committee", max_committees),
+        }
+
+    def hci_ac_publication_stats(self) -> List[Dict[str, Any]]:
+        g = self.hc_pubs.groupby(["year", "venue"], dropna=False, observed=True).agg(
+            paper_count=("pub_key", "nunique"),
+            unique_ac_authors=("person_id", "nunique"),
+        ).reset_index()
+        g["venue"] = g["venue"].astype("object")
+        g = g.sort_values(["year", "venue"], na_position="first", kind="mergesort")
+        return [
+            {
+                "year": None if pd.isna(r.year) else int(r.year),
+                "venue": None if pd.isna(r.venue) else r.venue,
+                "paper_count": int(r.paper_count),
+                "unique_ac_authors": int(r.unique_ac_authors),
+            }
+            for r in g.itertuples(index=False)
+        ]
+
+
+def load_parquet_frames(parquet_dir: Path = PARQUET_DIR) -> AnalyticsFrames:
+    """Frames from the export_parquet.py output (dictionary columns load as categoricals)."""
+    roles = pd.read_parquet(parquet_dir / "ac_roles.parquet")
+    hc = pd.read_parquet(parquet_dir / "persons_high_conf.parquet", columns=["person_id"])
+    hc_pubs = pd.read_parquet(parquet_dir / "hc_ac_publications.parquet", columns=FACT_COLUMNS)
+    institutions = None
+    if all((parquet_dir / f"{t}.parquet").exists() for t in INSTITUTION_TABLES):
+        institutions = {t: pd.read_parquet(parquet_dir / f"{t}.parquet") for t in INSTITUTION_TABLES}
+    countries = None
+    if (parquet_dir / f"{GEO_TABLE}.parquet").exists():
+        countries = pd.read_parquet(parquet_dir / f"{GEO_TABLE}.parquet")
+    return AnalyticsFrames(roles, hc["person_id"], hc_pubs, institutions, countries)
+
+
+def load_sqlite_frames(db_path: Path = DB_PATH) -> AnalyticsFrames:
+    """Frames read straight from the SQLite DB (no Parquet export needed)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        roles = pd.read_sql_query("SELECT * FROM ac_roles", conn)
+        hc = pd.read_sql_query("SELECT person_id FROM persons_high_conf", conn)
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        institutions = None
+        if set(INSTITUTION_TABLES) <= existing:
+            institutions = {t: pd.read_sql_query(f"SELECT * FROM {t}", conn) for t in INSTITUTION_TABLES}
+        countries = None
+        if GEO_TABLE in existing:
+            countries = pd.read_sql_query(f"SELECT * FROM {GEO_TABLE}", conn)
+        if {"authorships", "publications"} <= existing:
+            hc_pubs = pd.read_sql_query(
+                """
+                SELECT a.person_id, a.pub_key, pub.year, pub.venue
+                FROM authorships a
+                JOIN persons_high_conf phc ON phc.person_id = a.person_id
+                JOIN publications pub ON pub.pub_key = a.pub_key
+                """,
+                conn,
+            )
+        else:
+            hc_pubs = pd.DataFrame(columns=FACT_COLUMNS)
+    finally:
+        conn.close()
+    hc_pubs["venue"] = hc_pubs["venue"].astype("category")
+    return AnalyticsFrames(roles, hc["person_id"], hc_pubs, institutions, countries)
+
+
+class AnalyticsSnapshot(DbSnapshot):
+    """AnalyticsFrames loaded from SQLite and kept in memory for the API server."""
+
+    def __init__(self, db_path: Path = DB_PATH, check_interval: float = SNAPSHOT_CHECK_INTERVAL):
+        super().__init__(load_sqlite_frames, db_path, check_interval, name="analytics")
@@ -1,6 +1,7 @@
 import os
 from flask import Flask, request, jsonify, send_from_directory
 from llm_router import answer_with_db_tools  
+from db_queries import gazetteer, person_registry, preload_analytics
 
 app = Flask(__name__)
 
@@ -47,4 +48,7 @@ def api_generate():
 
 
 if __name__ == "__main__":
+    preload_analytics()
+    person_registry()
+    gazetteer()
     app.run(host="127.0.0.1", port=8000, debug=True)
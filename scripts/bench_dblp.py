@@ -0,0 +1,131 @@
+import argparse
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import dblp_fetch_publications
+import dblp_search_candidates
+import http_client
+from dblp_stub_server import StubConfig, StubData, start_server
+
+DB_PATH = Path("database/chi_ac.db")
+
+MATCHED = "('matched_exact', 'matched_fuzzy', 'matched_evidence')"
+
+
+def prepare_db(src: Path, dst: Path, n: int):
+    """
+    Copy of the DB where the first n persons need a search and the first n
+    matched persons need a publication fetch.
+    """
+    shutil.copyfile(src, dst)
+    conn = sqlite3.connect(dst)
+    with conn:
+        search_ids = [r[0] for r in conn.execute(
+            "SELECT person_id FROM persons ORDER BY person_id LIMIT ?", (n,))]
+        conn.executemany("DELETE FROM person_dblp_candidates WHERE person_id = ?",
+                         [(i,) for i in search_ids])
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(persons)")}
+        if "dblp_query_key" in cols:
+            conn.execute("UPDATE persons SET dblp_query_key = NULL")
+        conn.execute("DROP TABLE IF EXISTS dblp_search_results")
+
+        fetch_ids = [r[0] for r in conn.execute(f"""
+            SELECT person_id FROM persons
+            WHERE match_status IN {MATCHED} AND dblp_pid IS NOT NULL
+            ORDER BY person_id LIMIT ?
+        """, (n,))]
+        conn.executemany("DELETE FROM authorships WHERE person_id = ?", [(i,) for i in fetch_ids])
+        conn.execute("DROP TABLE IF EXISTS dblp_fetch_log")
+    conn.close()
+
+    # Recreates dblp_search_results / persons.dblp_query_key as the pipeline would
+    import setup_dblp_schema
+    setup_dblp_schema.DB_PATH = dst
+    setup_dblp_schema.main()
+    return len(search_ids), len(fetch_ids)
+
+def run_stage(name, fn, persons: int):
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    return name, persons, elapsed
+
+def report(name, persons, elapsed, telemetry, stub_counts):
+    c = telemetry.counters
+    backoff = c.get("backoff_s", 0.0)
+    print(f"{name:28s} {persons:5d} persons  {elapsed:7.2f}s  "
+          f"{persons / elapsed if elapsed else 0:7.2f} persons/s  "
+          f"requests {c.get('requests', 0):5d}  retries {c.get('retries', 0):4d}  "
+          f"backoff {backoff:6.2f}s ({100 * backoff / elapsed if elapsed else 0:.0f}% of wall time)")
+    print(f"{'':28s} stub: {dict(sorted(stub_counts.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the DBLP search / fetch stages against the local stub server.")
+    parser.add_argument("-n", type=int, default=200, help="persons per stage")
+    parser.add_argument("--workers", type=int, default=4, help="dblp_fetch_publications --workers")
+    parser.add_argument("--sleep", type=float, default=0.0,
+                        help="per-request pacing (BASE_SLEEP) of both stages")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--p429", type=float, default=0.0)
+    parser.add_argument("--p5xx", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=None,
+                        help="Retry-After seconds on 429 (default: none, client backoff)")
+    parser.add_argument("--backoff-base", type=float, default=0.05,
+                        help="retry policy base for the run (seconds)")
+    parser.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    parser.add_argument("--stages", nargs="+", default=["search", "fetch"], choices=["search", "fetch"])
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="chipulse_bench_"))
+    db = tmp / "bench.db"
+    n_search, n_fetch = prepare_db(DB_PATH, db, args.n)
+
+    data = StubData(None, None) if args.synthetic else StubData(DB_PATH)
+    config = StubConfig(args.latency, args.jitter, args.p429, args.p5xx, args.retry_after)
+    server, url = start_server(data, config)
+    print(f"Stub {url}: latency {args.latency}s, 429 {args.p429:.0%}, 5xx {args.p5xx:.0%}; "
+          f"DB copy {db}")
+
+    http_client.DBLP_BASE_URL = url
+    for mod in (dblp_search_candidates, dblp_fetch_publications):
+        mod.DB_PATH = db
+        mod.BASE_SLEEP = args.sleep
+    dblp_search_candidates.DBLP_SEARCH_URL = url + "/search/author/api"
+    dblp_search_candidates.MAX_SUCCESS_PER_RUN = n_search
+    dblp_search_candidates.SEARCH_RETRY = http_client.RetryPolicy(
+        max_retries=6, base=args.backoff_base, max_backoff=args.backoff_base * 4)
+    dblp_fetch_publications.FETCH_RETRY = http_client.RetryPolicy(
+        max_retries=5, base=args.backoff_base, max_backoff=args.backoff_base * 12)
+    dblp_fetch_publications.MAX_PERSONS_PER_RUN = n_fetch
+    dblp_fetch_publications.XML_CACHE_DIR = tmp / "dblp_xml"
+
+    results = []
+    try:
+        if "search" in args.stages:
+            config.counts.clear()
+            name, persons, elapsed = run_stage(
+                "dblp_search_candidates", dblp_search_candidates.main, n_search)
+            results.append((name, persons, elapsed, dblp_search_candidates.TELEMETRY, dict(config.counts)))
+        if "fetch" in args.stages:
+            config.counts.clear()
+            sys.argv = ["dblp_fetch_publications.py", "--workers", str(args.workers)]
+            name, persons, elapsed = run_stage(
+                f"dblp_fetch_publications x{args.workers}", dblp_fetch_publications.main, n_fetch)
+            results.append((name, persons, elapsed, dblp_fetch_publications.TELEMETRY, dict(config.counts)))
+    finally:
+        server.shutdown()
+
+    print()
+    for name, persons, elapsed, telemetry, counts in results:
+        report(name, persons, elapsed, telemetry, counts)
+    shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
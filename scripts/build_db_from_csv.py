@@ -1,7 +1,11 @@
+import argparse
 import csv
 import sqlite3
 from pathlib import Path
 
+from build_high_conf import refresh_role_flags
+from db_utils import enable_wal, person_tables
+
 DB_PATH = Path("database/chi_ac.db")
 CSV_PATH = Path("data/raw/committee_members_cleaned.csv")
 
@@ -50,6 +54,7 @@ def create_tables(conn):
     cur = conn.cursor()
 
     cur.execute("DROP TABLE IF EXISTS ac_roles;")
+    cur.execute("DROP TABLE IF EXISTS person_aliases;")
     cur.execute("DROP TABLE IF EXISTS persons;")
 
     # People
@@ -79,20 +84,41 @@ def create_tables(conn):
 
     conn.commit()
 
-def import_ac_roles(conn):
+def ensure_tables(conn):
+    """Upsert mode: create tables only if missing, keeping every existing row."""
     cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS persons (
+            person_id      INTEGER PRIMARY KEY,
+            canonical_name TEXT NOT NULL,
+            match_status   TEXT NOT NULL DEFAULT 'unmatched'
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ac_roles (
+            ac_role_id      INTEGER PRIMARY KEY,
+            year            INTEGER NOT NULL,
+            venue           TEXT NOT NULL,
+            committee       TEXT NOT NULL,
+            member_raw      TEXT NOT NULL,
+            name_clean      TEXT NOT NULL,
+            affiliation_raw TEXT,
+            country         TEXT,
+            person_id       INTEGER,
+            FOREIGN KEY(person_id) REFERENCES persons(person_id)
+        );
+    """)
+    conn.commit()
+
+def read_csv_rows():
+    """All CSV rows as ac_roles tuples (year, venue, committee, member_raw, name, affiliation, country)."""
+    rows = []
     with CSV_PATH.open(newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)   # year,venue,committee,member
         for row in reader:
             member = row["member"]
             name_clean, affiliation_raw, country = parse_member(member)
-
-            cur.execute("""
-                INSERT INTO ac_roles
-                    (year, venue, committee, member_raw,
-                     name_clean, affiliation_raw, country)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            rows.append((
                 int(row["year"]),
                 row["venue"],
                 row["committee"],
@@ -101,6 +127,16 @@ def import_ac_roles(conn):
                 affiliation_raw,
                 country
             ))
+    return rows
+
+def import_ac_roles(conn):
+    cur = conn.cursor()
+    cur.executemany("""
+        INSERT INTO ac_roles
+            (year, venue, committee, member_raw,
+             name_clean, affiliation_raw, country)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, read_csv_rows())
     conn.commit()
 
 def build_persons_and_link(conn):
@@ -113,7 +149,8 @@ def build_persons_and_link(conn):
         FROM ac_roles;
     """)
 
-    # person_id to ac_roles
+    # person_id to ac_roles; the index turns the correlated lookup into an index probe
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_persons_canonical_name ON persons(canonical_name);")
     cur.execute("""
         UPDATE ac_roles
         SET person_id = (
@@ -125,11 +162,125 @@ def build_persons_and_link(conn):
 
     conn.commit()
 
+def remove_orphan_persons(conn) -> int:
+    """
+    Delete persons left without any AC role (their roles vanished from the
+    CSV) and without a DBLP match, with their candidates and aliases, so
+    the DBLP stages never search for them. Matched persons are kept.
+    """
+    cur = conn.cursor()
+    cols = {r[1] for r in cur.execute("PRAGMA table_info(persons)")}
+    unmatched = "AND p.dblp_pid IS NULL" if "dblp_pid" in cols else ""
+    cur.execute("DROP TABLE IF EXISTS temp.orphan_persons;")
+    cur.execute(f"""
+        CREATE TEMP TABLE orphan_persons AS
+        SELECT p.person_id FROM persons p
+        WHERE NOT EXISTS (SELECT 1 FROM ac_roles r WHERE r.person_id = p.person_id)
+          {unmatched}
+    """)
+    n = cur.execute("SELECT COUNT(*) FROM temp.orphan_persons").fetchone()[0]
+    if n:
+        tables = person_tables(conn)
+        if cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'person_aliases'").fetchone():
+            tables.append("person_aliases")
+        for table in tables + ["persons"]:
+            cur.execute(f"""
+                DELETE FROM {table}
+                WHERE person_id IN (SELECT person_id FROM temp.orphan_persons)
+            """)
+    cur.execute("DROP TABLE temp.orphan_persons;")
+    return n
+
+def upsert_from_csv(conn):
+    """
+    Incremental, idempotent import:
+    - roles already in the DB (same year, venue, committee, member_raw) are kept as-is
+    - new roles are inserted; roles that vanished from a (year, venue) present in
+      the CSV are removed
+    - new names get new persons; existing person_ids (and their DBLP columns,
+      candidates and publications) are untouched
+    - persons left without roles and without a DBLP match are removed
+    """
+    ensure_tables(conn)
+    cur = conn.cursor()
+    csv_rows = read_csv_rows()
+
+    existing = {}
+    for role_id, year, venue, committee, member in cur.execute(
+            "SELECT ac_role_id, year, venue, committee, member_raw FROM ac_roles"):
+        existing[(year, venue, committee, member)] = role_id
+
+    csv_keys = set()
+    new_rows = []
+    for row in csv_rows:
+        key = row[:4]
+        if key in csv_keys:
+            continue
+        csv_keys.add(key)
+        if key not in existing:
+            new_rows.append(row)
+
+    csv_year_venues = {(k[0], k[1]) for k in csv_keys}
+    stale_ids = [
+        (role_id,) for key, role_id in existing.items()
+        if (key[0], key[1]) in csv_year_venues and key not in csv_keys
+    ]
+
+    # Hash join: name -> person_id, built once in memory
+    person_ids = {}
+    for person_id, name in cur.execute("SELECT person_id, canonical_name FROM persons ORDER BY person_id"):
+        person_ids.setdefault(name, person_id)
+    # Spellings merged away by dedup_persons.py keep resolving to their survivor
+    if cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'person_aliases'").fetchone():
+        for person_id, name in cur.execute(
+                "SELECT person_id, alias_name FROM person_aliases ORDER BY alias_person_id"):
+            person_ids.setdefault(name, person_id)
+
+    with conn:
+        new_names = sorted({row[4] for row in new_rows if row[4] not in person_ids})
+        for name in new_names:
+            cur.execute("INSERT INTO persons (canonical_name) VALUES (?)", (name,))
+            person_ids[name] = cur.lastrowid
+
+        cur.executemany("DELETE FROM ac_roles WHERE ac_role_id = ?", stale_ids)
+        cur.executemany("""
+            INSERT INTO ac_roles
+                (year, venue, committee, member_raw,
+                 name_clean, affiliation_raw, country, person_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [row + (person_ids[row[4]],) for row in new_rows])
+
+        # Relink any role left without a person (e.g. rows written by older builds)
+        unlinked = cur.execute(
+            "SELECT ac_role_id, name_clean FROM ac_roles WHERE person_id IS NULL").fetchall()
+        cur.executemany(
+            "UPDATE ac_roles SET person_id = ? WHERE ac_role_id = ?",
+            [(person_ids[name], role_id) for role_id, name in unlinked if name in person_ids],
+        )
+
+        n_orphans = remove_orphan_persons(conn)
+
+        # New roles of already-matched persons keep the high-conf flag current
+        if cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone():
+            refresh_role_flags(conn)
+
+    print(f"Upsert: {len(new_rows)} roles added, {len(stale_ids)} removed, "
+          f"{len(new_names)} new persons, {n_orphans} persons without roles removed")
+
 def main():
+    parser = argparse.ArgumentParser(description="Build ac_roles/persons from the committee CSV.")
+    parser.add_argument("--upsert", action="store_true",
+                        help="incremental import that keeps existing persons and DBLP data")
+    args = parser.parse_args()
+
     conn = sqlite3.connect(DB_PATH)
-    create_tables(conn)
-    import_ac_roles(conn)
-    build_persons_and_link(conn)
+    enable_wal(conn)
+    if args.upsert:
+        upsert_from_csv(conn)
+    else:
+        create_tables(conn)
+        import_ac_roles(conn)
+        build_persons_and_link(conn)
     conn.close()
     print("Finished, written into chi_ac.db")
 
@@ -0,0 +1,286 @@
+import sqlite3
+from pathlib import Path
+
+from build_institutions import institution_key
+
+DB_PATH = Path("database/chi_ac.db")
+
+# ISO 3166-1 alpha-2 code, name, region (UN M49 sub-region), continent
+COUNTRIES = [
+    ("US", "United States", "Northern America", "North America"),
+    ("CA", "Canada", "Northern America", "North America"),
+    ("MX", "Mexico", "Central America", "North America"),
+    ("BR", "Brazil", "South America", "South America"),
+    ("AR", "Argentina", "South America", "South America"),
+    ("CL", "Chile", "South America", "South America"),
+    ("CO", "Colombia", "South America", "South America"),
+    ("EC", "Ecuador", "South America", "South America"),
+    ("GB", "United Kingdom", "Northern Europe", "Europe"),
+    ("IE", "Ireland", "Northern Europe", "Europe"),
+    ("DK", "Denmark", "Northern Europe", "Europe"),
+    ("SE", "Sweden", "Northern Europe", "Europe"),
+    ("NO", "Norway", "Northern Europe", "Europe"),
+    ("FI", "Finland", "Northern Europe", "Europe"),
+    ("IS", "Iceland", "Northern Europe", "Europe"),
+    ("EE", "Estonia", "Northern Europe", "Europe"),
+    ("LV", "Latvia", "Northern Europe", "Europe"),
+    ("LT", "Lithuania", "Northern Europe", "Europe"),
+    ("DE", "Germany", "Western Europe", "Europe"),
+    ("FR", "France", "Western Europe", "Europe"),
+    ("NL", "Netherlands", "Western Europe", "Europe"),
+    ("BE", "Belgium", "Western Europe", "Europe"),
+    ("LU", "Luxembourg", "Western Europe", "Europe"),
+    ("CH", "Switzerland", "Western Europe", "Europe"),
+    ("AT", "Austria", "Western Europe", "Europe"),
+    ("IT", "Italy", "Southern Europe", "Europe"),
+    ("ES", "Spain", "Southern Europe", "Europe"),
+    ("PT", "Portugal", "Southern Europe", "Europe"),
+    ("GR", "Greece", "Southern Europe", "Europe"),
+    ("CY", "Cyprus", "Western Asia", "Asia"),
+    ("SI", "Slovenia", "Southern Europe", "Europe"),
+    ("HR", "Croatia", "Southern Europe", "Europe"),
+    ("RS", "Serbia", "Southern Europe", "Europe"),
+    ("PL", "Poland", "Eastern Europe", "Europe"),
+    ("CZ", "Czech Republic", "Eastern Europe", "Europe"),
+    ("SK", "Slovakia", "Eastern Europe", "Europe"),
+    ("HU", "Hungary", "Eastern Europe", "Europe"),
+    ("RO", "Romania", "Eastern Europe", "Europe"),
+    ("BG", "Bulgaria", "Eastern Europe", "Europe"),
+    ("UA", "Ukraine", "Eastern Europe", "Europe"),
+    ("RU", "Russia", "Eastern Europe", "Europe"),
+    ("TR", "Turkey", "Western Asia", "Asia"),
+    ("IL", "Israel", "Western Asia", "Asia"),
+    ("SA", "Saudi Arabia", "Western Asia", "Asia"),
+    ("AE", "United Arab Emirates", "Western Asia", "Asia"),
+    ("QA", "Qatar", "Western Asia", "Asia"),
+    ("IR", "Iran", "Southern Asia", "Asia"),
+    ("IN", "India", "Southern Asia", "Asia"),
+    ("PK", "Pakistan", "Southern Asia", "Asia"),
+    ("BD", "Bangladesh", "Southern Asia", "Asia"),
+    ("LK", "Sri Lanka", "Southern Asia", "Asia"),
+    ("CN", "China", "Eastern Asia", "Asia"),
+    ("HK", "Hong Kong", "Eastern Asia", "Asia"),
+    ("MO", "Macau", "Eastern Asia", "Asia"),
+    ("TW", "Taiwan", "Eastern Asia", "Asia"),
+    ("JP", "Japan", "Eastern Asia", "Asia"),
+    ("KR", "South Korea", "Eastern Asia", "Asia"),
+    ("SG", "Singapore", "South-eastern Asia", "Asia"),
+    ("MY", "Malaysia", "South-eastern Asia", "Asia"),
+    ("TH", "Thailand", "South-eastern Asia", "Asia"),
+    ("ID", "Indonesia", "South-eastern Asia", "Asia"),
+    ("VN", "Vietnam", "South-eastern Asia", "Asia"),
+    ("PH", "Philippines", "South-eastern Asia", "Asia"),
+    ("AU", "Australia", "Australia and New Zealand", "Oceania"),
+    ("NZ", "New Zealand", "Australia and New Zealand", "Oceania"),
+    ("ZA", "South Africa", "Southern Africa", "Africa"),
+    ("NA", "Namibia", "Southern Africa", "Africa"),
+    ("KE", "Kenya", "Eastern Africa", "Africa"),
+    ("NG", "Nigeria", "Western Africa", "Africa"),
+    ("GH", "Ghana", "Western Africa", "Africa"),
+    ("EG", "Egypt", "Northern Africa", "Africa"),
+]
+
+# Extra spellings; the name and the code itself are always aliases.
+COUNTRY_ALIASES = {
+    "US": ["USA", "U.S.A.", "U.S.", "United States of America", "America"],
+    "GB": ["UK", "U.K.", "Great Britain", "Britain", "England", "Scotland", "Wales",
+           "Northern Ireland"],
+    "NL": ["The Netherlands", "Netherland", "Holland"],
+    "KR": ["Korea", "Republic of Korea", "Korea Republic of"],
+    "HK": ["Hong Kong SAR", "Hong Kong SAR China", "Hong Kong China"],
+    "MO": ["Macao"],
+    "CN": ["PRC", "P.R. China", "People's Republic of China", "Mainland China"],
+    "DE": ["Deutschland"],
+    "CH": ["Schweiz", "Suisse"],
+    "CZ": ["Czechia"],
+    "TR": ["Turkiye"],
+    "AE": ["UAE"],
+    "RU": ["Russian Federation"],
+    "VN": ["Viet Nam"],
+}
+
+# parse_member() takes the last comma token as the country, so cities and
+# states ("Irvine", "College Park") end up there too. They are only tried
+# when no country alias matches, and only as the whole value: "London" is
+# the UK, "London Ontario" is not. Not in country_aliases (the gazetteer).
+CITY_ALIASES = {
+    "US": ["Irvine", "College Park", "Berkeley", "Chicago", "Baltimore County",
+           "Santa Barbara", "San Diego", "Santa Cruz", "Boulder", "Seattle", "Davis",
+           "Ann Arbor", "Merced", "Madison", "Los Angeles", "Bloomington", "Austin",
+           "Amherst", "Reno", "Pittsburgh", "New York", "Atlanta", "Cambridge MA"],
+    "GB": ["London"],
+    "NL": ["Amsterdam"],
+    "FR": ["Paris"],
+    "IE": ["Dublin"],
+    "AU": ["Melbourne", "Sydney"],
+}
+
+GEO_LEVELS = ["country", "region", "continent"]
+
+
+def _country_aliases():
+    """alias key -> country code."""
+    aliases = {}
+    for code, name, _, _ in COUNTRIES:
+        aliases[institution_key(name)] = code
+        aliases[code.lower()] = code
+    for code, spellings in COUNTRY_ALIASES.items():
+        for s in spellings:
+            aliases[institution_key(s)] = code
+    return aliases
+
+COUNTRY_ALIAS_KEYS = _country_aliases()
+CITY_ALIAS_KEYS = {
+    institution_key(s): code for code, cities in CITY_ALIASES.items() for s in cities
+}
+
+
+def normalize_country(raw):
+    """
+    ISO code for a raw country token, or None.
+    Exact alias first, then the longest alias the value starts with; codes
+    and other short aliases only match exactly ("IT University" is not
+    Italy). Cities last, as the whole value or its part before a "/"
+    ("College Park/HCIL", "Berkeley / ICSI").
+    """
+    key = institution_key(raw or "")
+    if not key:
+        return None
+    if key in COUNTRY_ALIAS_KEYS:
+        return COUNTRY_ALIAS_KEYS[key]
+    words = key.split()
+    for n in range(len(words) - 1, 0, -1):
+        prefix = " ".join(words[:n])
+        code = COUNTRY_ALIAS_KEYS.get(prefix)
+        if code and len(prefix) > 3:
+            return code
+    for part in (raw, raw.split("/")[0]):
+        code = CITY_ALIAS_KEYS.get(institution_key(part))
+        if code:
+            return code
+    return None
+
+
+def column_exists(cur, table, col):
+    cur.execute(f"PRAGMA table_info({table});")
+    return col in [r[1] for r in cur.fetchall()]
+
+def create_tables(conn):
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS country_aliases;")
+    cur.execute("DROP TABLE IF EXISTS countries;")
+    cur.execute("DROP TABLE IF EXISTS geo_year_counts;")
+    cur.execute("DROP TABLE IF EXISTS geo_total_counts;")
+
+    cur.execute("""
+        CREATE TABLE countries (
+            country_code TEXT PRIMARY KEY,   -- ISO 3166-1 alpha-2
+            name         TEXT NOT NULL,
+            region       TEXT NOT NULL,      -- UN M49 sub-region
+            continent    TEXT NOT NULL
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE country_aliases (
+            alias_key    TEXT PRIMARY KEY,
+            country_code TEXT NOT NULL,
+            FOREIGN KEY(country_code) REFERENCES countries(country_code)
+        );
+    """)
+
+    # Distinct ACs per year and geography; level is 'country' / 'region' / 'continent',
+    # geo_key the country code or region / continent name ('' = unknown)
+    cur.execute("""
+        CREATE TABLE geo_year_counts (
+            level     TEXT NOT NULL,
+            high_conf INTEGER NOT NULL,
+            year      INTEGER NOT NULL,
+            geo_key   TEXT NOT NULL,
+            name      TEXT NOT NULL,
+            ac_count  INTEGER NOT NULL,
+            PRIMARY KEY (level, high_conf, year, geo_key)
+        );
+    """)
+    # Same over all years (distinct persons, so not the sum of the yearly rows)
+    cur.execute("""
+        CREATE TABLE geo_total_counts (
+            level     TEXT NOT NULL,
+            high_conf INTEGER NOT NULL,
+            geo_key   TEXT NOT NULL,
+            name      TEXT NOT NULL,
+            ac_count  INTEGER NOT NULL,
+            PRIMARY KEY (level, high_conf, geo_key)
+        );
+    """)
+
+    if not column_exists(cur, "ac_roles", "country_code"):
+        cur.execute("ALTER TABLE ac_roles ADD COLUMN country_code TEXT;")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_ac_roles_country_code ON ac_roles(country_code, year);")
+    conn.commit()
+
+def build_rollups(conn):
+    """Fill geo_year_counts / geo_total_counts from ac_roles.country_code."""
+    cur = conn.cursor()
+    has_hc = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone()
+    if not has_hc:
+        print("[WARN] persons_high_conf not found, only all-AC rollups are built")
+
+    level_cols = {
+        "country": ("COALESCE(c.country_code, '')", "COALESCE(c.name, 'Unknown')"),
+        "region": ("COALESCE(c.region, '')", "COALESCE(c.region, 'Unknown')"),
+        "continent": ("COALESCE(c.continent, '')", "COALESCE(c.continent, 'Unknown')"),
+    }
+    for level, (key_sql, name_sql) in level_cols.items():
+        for high_conf in ([0, 1] if has_hc else [0]):
+            hc_join = "JOIN persons_high_conf phc ON phc.person_id = ar.person_id" if high_conf else ""
+            base = f"""
+                FROM ac_roles ar
+                {hc_join}
+                LEFT JOIN countries c
+                  ON c.country_code = ar.country_code
+            """
+            cur.execute(f"""
+                INSERT INTO geo_year_counts (level, high_conf, year, geo_key, name, ac_count)
+                SELECT ?, ?, ar.year, {key_sql}, {name_sql}, COUNT(DISTINCT ar.person_id)
+                {base}
+                GROUP BY ar.year, {key_sql}
+            """, (level, high_conf))
+            cur.execute(f"""
+                INSERT INTO geo_total_counts (level, high_conf, geo_key, name, ac_count)
+                SELECT ?, ?, {key_sql}, {name_sql}, COUNT(DISTINCT ar.person_id)
+                {base}
+                GROUP BY {key_sql}
+            """, (level, high_conf))
+    conn.commit()
+
+def build_geography(conn):
+    create_tables(conn)
+    cur = conn.cursor()
+    with conn:
+        cur.executemany("INSERT INTO countries VALUES (?, ?, ?, ?)", COUNTRIES)
+        cur.executemany("INSERT INTO country_aliases VALUES (?, ?)", sorted(COUNTRY_ALIAS_KEYS.items()))
+
+        raw_values = [r[0] for r in cur.execute("SELECT DISTINCT country FROM ac_roles")]
+        codes = {raw: normalize_country(raw) for raw in raw_values}
+        cur.executemany(
+            "UPDATE ac_roles SET country_code = ? WHERE country IS ?",
+            [(code, raw) for raw, code in codes.items()],
+        )
+
+    build_rollups(conn)
+
+    unmatched = sorted(raw for raw, code in codes.items() if code is None and raw and raw.strip())
+    n_codes = len({c for c in codes.values() if c})
+    print(f"{len(raw_values)} raw country values -> {n_codes} countries; "
+          f"{len(unmatched)} unrecognized (e.g. {', '.join(unmatched[:5])})")
+
+
+def main():
+    conn = sqlite3.connect(DB_PATH)
+    build_geography(conn)
+    conn.close()
+    print("Finished, written into chi_ac.db")
+
+if __name__ == "__main__":
+    main()
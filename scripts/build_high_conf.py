@@ -0,0 +1,72 @@
+import sqlite3
+from pathlib import Path
+
+DB_PATH = Path("database/chi_ac.db")
+
+# Persons whose DBLP match is trusted for analysis (see dblp_pick_best.py)
+HIGH_CONF_STATUSES = ("matched_exact", "matched_fuzzy", "matched_evidence")
+
+
+def column_exists(cur, table, col):
+    cur.execute(f"PRAGMA table_info({table});")
+    return col in [r[1] for r in cur.fetchall()]
+
+def refresh_role_flags(conn):
+    """ac_roles.high_conf = 1 for roles of persons in persons_high_conf."""
+    cur = conn.cursor()
+    if not column_exists(cur, "ac_roles", "high_conf"):
+        cur.execute("ALTER TABLE ac_roles ADD COLUMN high_conf INTEGER NOT NULL DEFAULT 0;")
+    cur.execute("""
+        UPDATE ac_roles
+        SET high_conf = (person_id IS NOT NULL
+                         AND person_id IN (SELECT person_id FROM persons_high_conf))
+        WHERE high_conf IS NOT (person_id IS NOT NULL
+                                AND person_id IN (SELECT person_id FROM persons_high_conf));
+    """)
+    # Covers the per-year high-conf aggregates without touching the table
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ac_roles_high_conf
+        ON ac_roles(high_conf, year, person_id);
+    """)
+
+def build_high_conf(conn):
+    """
+    persons_high_conf as a real WITHOUT ROWID table (it used to be a view in
+    shipped DBs), rebuilt from persons.match_status.
+    """
+    cur = conn.cursor()
+    kind = cur.execute(
+        "SELECT type FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone()
+    with conn:
+        if kind and kind[0] == "view":
+            cur.execute("DROP VIEW persons_high_conf;")
+        else:
+            cur.execute("DROP TABLE IF EXISTS persons_high_conf;")
+        cur.execute("""
+            CREATE TABLE persons_high_conf (
+                person_id INTEGER PRIMARY KEY
+            ) WITHOUT ROWID;
+        """)
+        placeholders = ", ".join("?" for _ in HIGH_CONF_STATUSES)
+        cur.execute(f"""
+            INSERT INTO persons_high_conf (person_id)
+            SELECT person_id
+            FROM persons
+            WHERE match_status IN ({placeholders})
+              AND dblp_pid IS NOT NULL
+        """, HIGH_CONF_STATUSES)
+        refresh_role_flags(conn)
+
+    n_persons = cur.execute("SELECT COUNT(*) FROM persons_high_conf").fetchone()[0]
+    n_roles = cur.execute("SELECT COUNT(*) FROM ac_roles WHERE high_conf = 1").fetchone()[0]
+    print(f"persons_high_conf: {n_persons} persons, {n_roles} flagged roles")
+
+
+def main():
+    conn = sqlite3.connect(DB_PATH)
+    build_high_conf(conn)
+    conn.close()
+    print("Finished, written into chi_ac.db")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import re
+import sqlite3
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+
+DB_PATH = Path("database/chi_ac.db")
+
+# Canonical name -> known spellings / abbreviations.
+# A seed alias also claims every affiliation that starts with it word-wise
+# ("Carnegie Mellon HCII", "KAIST - School of Computing", "ETH Zurich, Switzerland"),
+# the longest matching alias wins. Keep generic prefixes such as
+# "University of California" out of this list.
+INSTITUTION_SEEDS = {
+    "Carnegie Mellon University": ["CMU", "Carnegie Mellon", "Carnegie Melon University"],
+    "Massachusetts Institute of Technology": ["MIT"],
+    "Georgia Institute of Technology": ["Georgia Tech", "GaTech", "GA Tech"],
+    "Virginia Tech": ["Virginia Polytechnic Institute and State University"],
+    "Microsoft Research": ["Microsoft", "MSR"],
+    "Google": ["Google Research", "Google Inc"],
+    "IBM Research": ["IBM", "IBM T J Watson Research Center", "IBM Watson Research Center"],
+    "Adobe Research": ["Adobe"],
+    "Autodesk Research": ["Autodesk"],
+    "Apple": [],
+    "Meta": ["Facebook", "Meta Reality Labs"],
+    "Xerox PARC": ["PARC", "Palo Alto Research Center"],
+    "University of California, Berkeley": ["UC Berkeley", "Berkeley"],
+    "University of California, Los Angeles": ["UCLA"],
+    "University of California, San Diego": ["UCSD", "UC San Diego"],
+    "University of California, Irvine": ["UCI", "UC Irvine"],
+    "University of California, Santa Barbara": ["UCSB", "UC Santa Barbara"],
+    "University of California, Santa Cruz": ["UCSC", "UC Santa Cruz"],
+    "University of California, Davis": ["UC Davis"],
+    "University of Maryland, Baltimore County": ["UMBC"],
+    "Cornell University": ["Cornell"],
+    "Stanford University": ["Stanford"],
+    "University College London": ["UCL"],
+    "King's College London": ["Kings College London"],
+    "ETH Zurich": ["ETH"],
+    "KAIST": ["Korea Advanced Institute of Science and Technology"],
+    "Delft University of Technology": ["TU Delft", "Delft"],
+    "Eindhoven University of Technology": ["TU Eindhoven", "Eindhoven Unversity of Technology"],
+    "KTH Royal Institute of Technology": ["KTH", "Royal Institute of Technology"],
+    "Queensland University of Technology": ["QUT", "Qld University of Technology",
+                                            "Queensland Univeristy of Technology"],
+    "Rochester Institute of Technology": ["RIT"],
+    "Hong Kong University of Science and Technology": ["HKUST"],
+    "National University of Singapore": ["NUS"],
+    "Inria": ["National Institute for Research in Digital Science and Technology"],
+    "Polytechnique Montreal": [],
+}
+
+# Separators between several affiliations of one member ("CMU / Apple")
+MULTI_SPLIT_RE = re.compile(r"\s*/\s*|\s+\|\s+|\s+&\s+|\s*;\s*")
+
+
+def institution_key(text: str) -> str:
+    """
+    Lookup key of an affiliation or search keyword: accents folded, lowercase,
+    '&' -> 'and', apostrophes dropped, other punctuation -> space.
+    'ETH Zürich, Switzerland' -> 'eth zurich switzerland'
+    """
+    if not text:
+        return ""
+    s = unicodedata.normalize("NFKD", text)
+    s = "".join(c for c in s if not unicodedata.combining(c)).lower()
+    s = s.replace("&", " and ")
+    s = re.sub(r"[’'`]", "", s)
+    s = re.sub(r"[^a-z0-9]+", " ", s).strip()
+    if s.startswith("the "):
+        s = s[4:]
+    return s
+
+
+def _seed_aliases():
+    """alias key -> canonical name for every seed spelling (including the canonical one)."""
+    aliases = {}
+    for name, spellings in INSTITUTION_SEEDS.items():
+        for spelling in [name] + spellings:
+            aliases[institution_key(spelling)] = name
+    return aliases
+
+SEED_ALIASES = _seed_aliases()
+
+
+def seed_institution(key: str):
+    """Canonical seed name for a key: exact alias, else the longest alias it starts with."""
+    if key in SEED_ALIASES:
+        return SEED_ALIASES[key]
+    words = key.split()
+    for n in range(len(words) - 1, 0, -1):
+        name = SEED_ALIASES.get(" ".join(words[:n]))
+        if name:
+            return name
+    return None
+
+def split_affiliation(raw: str):
+    """
+    One raw affiliation -> list of institution spellings.
+    Split on '/', '|', ';' and ' & ' only if every part looks like an
+    institution on its own (a seed or 2+ words), so that
+    'Korea Advanced Institute of Science & Technology' stays whole.
+    """
+    raw = raw.strip().strip(".").strip()
+    parts = [p.strip(" ,.") for p in MULTI_SPLIT_RE.split(raw)]
+    parts = [p for p in parts if p]
+    if len(parts) > 1 and all(
+            seed_institution(institution_key(p)) or len(institution_key(p).split()) >= 2
+            for p in parts):
+        return parts
+    return [raw] if raw else []
+
+
+def create_tables(conn):
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS role_institutions;")
+    cur.execute("DROP TABLE IF EXISTS institution_aliases;")
+    cur.execute("DROP TABLE IF EXISTS institutions;")
+
+    cur.execute("""
+        CREATE TABLE institutions (
+            institution_id INTEGER PRIMARY KEY,
+            name           TEXT NOT NULL UNIQUE
+        );
+    """)
+
+    # Every spelling seen in ac_roles plus the seed aliases, by lookup key
+    cur.execute("""
+        CREATE TABLE institution_aliases (
+            alias_key      TEXT PRIMARY KEY,
+            alias          TEXT NOT NULL,
+            institution_id INTEGER NOT NULL,
+            FOREIGN KEY(institution_id) REFERENCES institutions(institution_id)
+        );
+    """)
+
+    # A role lists one or more institutions ("CMU / Apple")
+    cur.execute("""
+        CREATE TABLE role_institutions (
+            ac_role_id     INTEGER NOT NULL,
+            institution_id INTEGER NOT NULL,
+            PRIMARY KEY (ac_role_id, institution_id),
+            FOREIGN KEY(ac_role_id) REFERENCES ac_roles(ac_role_id),
+            FOREIGN KEY(institution_id) REFERENCES institutions(institution_id)
+        );
+    """)
+    cur.execute("""
+        CREATE INDEX idx_role_institutions_institution
+        ON role_institutions(institution_id, ac_role_id);
+    """)
+    conn.commit()
+
+def build_institutions(conn):
+    """
+    Canonicalize ac_roles.affiliation_raw. Spellings with the same lookup key
+    form one institution, named after a seed or after its most frequent
+    spelling; seed aliases merge abbreviations and sub-units.
+    """
+    rows = conn.execute("""
+        SELECT ac_role_id, affiliation_raw
+        FROM ac_roles
+        WHERE affiliation_raw IS NOT NULL AND TRIM(affiliation_raw) != ''
+    """).fetchall()
+
+    spellings = defaultdict(Counter)   # group -> Counter(spelling)
+    role_groups = []
+    for role_id, raw in rows:
+        for part in split_affiliation(raw):
+            key = institution_key(part)
+            if not key:
+                continue
+            group = seed_institution(key) or key
+            spellings[group][part] += 1
+            role_groups.append((role_id, group))
+
+    def display_name(group):
+        if group in INSTITUTION_SEEDS:
+            return group
+        # Most frequent spelling, ties broken alphabetically
+        return min(spellings[group].items(), key=lambda kv: (-kv[1], kv[0]))[0]
+
+    names = {group: display_name(group) for group in spellings}
+    ordered = sorted(set(names.values()))
+    inst_ids = {name: i for i, name in enumerate(ordered, start=1)}
+    group_ids = {group: inst_ids[name] for group, name in names.items()}
+
+    aliases = {}
+    for group, counter in spellings.items():
+        for spelling, _ in counter.most_common():
+            aliases.setdefault(institution_key(spelling), (spelling, group_ids[group]))
+    for key, name in SEED_ALIASES.items():
+        if name in inst_ids:
+            aliases.setdefault(key, (name, inst_ids[name]))
+
+    create_tables(conn)
+    with conn:
+        conn.executemany("INSERT INTO institutions (institution_id, name) VALUES (?, ?)",
+                         [(i, name) for name, i in inst_ids.items()])
+        conn.executemany(
+            "INSERT INTO institution_aliases (alias_key, alias, institution_id) VALUES (?, ?, ?)",
+            [(key, alias, inst_id) for key, (alias, inst_id) in aliases.items()])
+        conn.executemany(
+            "INSERT OR IGNORE INTO role_institutions (ac_role_id, institution_id) VALUES (?, ?)",
+            [(role_id, group_ids[group]) for role_id, group in role_groups])
+
+    n_raw = len({raw for _, raw in rows})
+    print(f"{n_raw} distinct affiliations -> {len(inst_ids)} institutions, "
+          f"{len(aliases)} aliases, {len(role_groups)} role links")
+
+
+def main():
+    conn = sqlite3.connect(DB_PATH)
+    build_institutions(conn)
+    conn.close()
+    print("Finished, written into chi_ac.db")
+
+if __name__ == "__main__":
+    main()
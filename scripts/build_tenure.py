@@ -0,0 +1,193 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+DB_PATH = Path("database/chi_ac.db")
+
+# Longest cohort retention curve kept (years after the first AC year)
+MAX_COHORT_YEARS = 20
+
+
+def create_tables(conn):
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS person_tenure;")
+    cur.execute("DROP TABLE IF EXISTS year_turnover;")
+    cur.execute("DROP TABLE IF EXISTS cohort_retention;")
+    # Streaks count consecutive AC years (years with AC data, so a year
+    # missing from the whole dataset does not break a streak)
+    cur.execute("""
+        CREATE TABLE person_tenure (
+            person_id            INTEGER PRIMARY KEY,
+            high_conf            INTEGER NOT NULL,
+            first_year           INTEGER NOT NULL,
+            last_year            INTEGER NOT NULL,
+            n_years              INTEGER NOT NULL,
+            n_roles              INTEGER NOT NULL,
+            longest_streak       INTEGER NOT NULL,
+            longest_streak_start INTEGER NOT NULL,
+            current_streak       INTEGER NOT NULL
+        );
+    """)
+    cur.execute("CREATE INDEX idx_person_tenure_n_years ON person_tenure(n_years DESC);")
+    # new: first AC year; retained: also AC the year before; returning: back
+    # after a break; departed: AC the year before but not this year
+    cur.execute("""
+        CREATE TABLE year_turnover (
+            high_conf       INTEGER NOT NULL,
+            year            INTEGER NOT NULL,
+            ac_count        INTEGER NOT NULL,
+            new_count       INTEGER NOT NULL,
+            retained_count  INTEGER NOT NULL,
+            returning_count INTEGER NOT NULL,
+            departed_count  INTEGER NOT NULL,
+            retention_rate  REAL,
+            PRIMARY KEY (high_conf, year)
+        ) WITHOUT ROWID;
+    """)
+    cur.execute("""
+        CREATE TABLE cohort_retention (
+            high_conf    INTEGER NOT NULL,
+            cohort_year  INTEGER NOT NULL,
+            years_since  INTEGER NOT NULL,
+            cohort_size  INTEGER NOT NULL,
+            active_count INTEGER NOT NULL,
+            share        REAL NOT NULL,
+            PRIMARY KEY (high_conf, cohort_year, years_since)
+        ) WITHOUT ROWID;
+    """)
+
+
+def load_presence(conn):
+    """
+    (person_ids, years, presence, n_roles, high_conf): presence[i, j] is True
+    if person i held an AC role in years[j].
+    """
+    rows = np.array(conn.execute("""
+        SELECT person_id, year, COUNT(*) FROM ac_roles
+        WHERE person_id IS NOT NULL
+        GROUP BY person_id, year
+    """).fetchall(), dtype=np.int64).reshape(-1, 3)
+    person_ids, p_idx = np.unique(rows[:, 0], return_inverse=True)
+    years, y_idx = np.unique(rows[:, 1], return_inverse=True)
+    presence = np.zeros((len(person_ids), len(years)), dtype=bool)
+    presence[p_idx, y_idx] = True
+    n_roles = np.bincount(p_idx, weights=rows[:, 2], minlength=len(person_ids)).astype(np.int64)
+
+    has_hc = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone()
+    hc_ids = (np.array([r[0] for r in conn.execute("SELECT person_id FROM persons_high_conf")],
+                       dtype=np.int64) if has_hc else np.array([], dtype=np.int64))
+    high_conf = np.isin(person_ids, hc_ids)
+    return person_ids, years, presence, n_roles, high_conf
+
+
+def tenure_columns(years, presence):
+    """Per-person first/last year, year count and streaks, computed column by column."""
+    n_persons, n_years = presence.shape
+    first = presence.argmax(axis=1)
+    last = n_years - 1 - presence[:, ::-1].argmax(axis=1)
+    streak = np.zeros(n_persons, dtype=np.int64)
+    longest = np.zeros(n_persons, dtype=np.int64)
+    longest_end = np.zeros(n_persons, dtype=np.int64)
+    for j in range(n_years):
+        streak = np.where(presence[:, j], streak + 1, 0)
+        better = streak > longest
+        longest = np.where(better, streak, longest)
+        longest_end = np.where(better, j, longest_end)
+    return {
+        "first_year": years[first],
+        "last_year": years[last],
+        "n_years": presence.sum(axis=1),
+        "longest_streak": longest,
+        "longest_streak_start": years[longest_end - longest + 1],
+        # `streak` is now the run ending in the latest data year
+        "current_streak": streak,
+    }
+
+def turnover_rows(years, presence):
+    """[(year, ac_count, new, retained, returning, departed, retention_rate), ...]"""
+    seen_before = np.logical_or.accumulate(presence, axis=1)
+    seen_before = np.hstack([np.zeros((presence.shape[0], 1), dtype=bool), seen_before[:, :-1]])
+    prev = np.hstack([np.zeros((presence.shape[0], 1), dtype=bool), presence[:, :-1]])
+
+    ac_count = presence.sum(axis=0)
+    new = (presence & ~seen_before).sum(axis=0)
+    retained = (presence & prev).sum(axis=0)
+    returning = (presence & ~prev & seen_before).sum(axis=0)
+    departed = (prev & ~presence).sum(axis=0)
+    prev_count = prev.sum(axis=0)
+    rows = []
+    for j, year in enumerate(years):
+        rate = round(float(retained[j] / prev_count[j]), 4) if prev_count[j] else None
+        rows.append((int(year), int(ac_count[j]), int(new[j]), int(retained[j]),
+                     int(returning[j]), int(departed[j]), rate))
+    return rows
+
+def cohort_rows(years, presence):
+    """[(cohort_year, years_since, cohort_size, active_count, share), ...]"""
+    if not len(presence):
+        return []
+    first = presence.argmax(axis=1)
+    # active[c, j]: members of cohort c (first AC year years[c]) who are AC in years[j]
+    cohort_onehot = np.zeros((presence.shape[0], len(years)), dtype=np.int64)
+    cohort_onehot[np.arange(presence.shape[0]), first] = 1
+    active = cohort_onehot.T @ presence.astype(np.int64)
+    size = cohort_onehot.sum(axis=0)
+    rows = []
+    for c in np.nonzero(size)[0]:
+        for j in range(c, len(years)):
+            since = int(years[j] - years[c])
+            if since > MAX_COHORT_YEARS:
+                break
+            rows.append((int(years[c]), since, int(size[c]), int(active[c, j]),
+                         round(float(active[c, j] / size[c]), 4)))
+    return rows
+
+
+def build_tenure(conn):
+    t0 = time.perf_counter()
+    person_ids, years, presence, n_roles, high_conf = load_presence(conn)
+    cols = tenure_columns(years, presence)
+    tenure = zip(person_ids.tolist(), high_conf.astype(int).tolist(),
+                 cols["first_year"].tolist(), cols["last_year"].tolist(), cols["n_years"].tolist(),
+                 n_roles.tolist(), cols["longest_streak"].tolist(),
+                 cols["longest_streak_start"].tolist(), cols["current_streak"].tolist())
+
+    with conn:
+        create_tables(conn)
+        conn.executemany("""
+            INSERT INTO person_tenure (person_id, high_conf, first_year, last_year, n_years,
+                                       n_roles, longest_streak, longest_streak_start, current_streak)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, tenure)
+        for hc, mask in ((0, slice(None)), (1, high_conf)):
+            conn.executemany("""
+                INSERT INTO year_turnover (high_conf, year, ac_count, new_count, retained_count,
+                                           returning_count, departed_count, retention_rate)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(hc,) + r for r in turnover_rows(years, presence[mask])])
+            conn.executemany("""
+                INSERT INTO cohort_retention (high_conf, cohort_year, years_since, cohort_size,
+                                              active_count, share)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(hc,) + r for r in cohort_rows(years, presence[mask])])
+
+    print(f"person_tenure: {len(person_ids)} persons over {len(years)} years "
+          f"in {time.perf_counter() - t0:.2f}s")
+
+
+def main():
+    conn = sqlite3.connect(DB_PATH)
+    build_tenure(conn)
+    for row in conn.execute("""
+        SELECT year, ac_count, new_count, retained_count, returning_count, departed_count, retention_rate
+        FROM year_turnover WHERE high_conf = 0 ORDER BY year
+    """):
+        print("  " + "  ".join(str(v) for v in row))
+    conn.close()
+    print("Finished, written into chi_ac.db")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+DB_PATH = Path("database/chi_ac.db")
+
+# unicode61 without stemming: porter would fold "accessibility" into "access"
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Curated FTS5 queries for the topics asked about most; their matches are
+# stored in topic_pubs so these topics never hit the full-text index at all
+TOPIC_QUERIES = {
+    "virtual reality": '"virtual reality" OR vr OR "virtual environment" * OR "head mounted" OR hmd',
+    "augmented reality": '"augmented reality" OR "mixed reality" OR ar OR xr',
+    "accessibility": 'accessib* OR blind OR "visually impaired" OR "visual impairment" * '
+                     'OR deaf OR disabilit* OR "screen reader" * OR assistive',
+    "large language models": '"large language model" * OR "language model" * OR llm* '
+                             'OR chatgpt OR gpt*',
+    "machine learning": '"machine learning" OR "deep learning" OR "neural network" *',
+    "privacy": "privacy",
+    "health": 'health* OR clinical OR patient* OR wellbeing OR "well being"',
+    "children": "child* OR kids OR teen* OR adolescen*",
+    "haptics": "haptic* OR tactile",
+    "crowdsourcing": "crowd*",
+    "visualization": "visuali*",
+    "social media": '"social media" OR twitter OR facebook OR reddit OR instagram',
+    "education": "educat* OR student* OR classroom* OR teacher*",
+    "games": "game* OR gaming",
+    "sustainability": "sustainab* OR climate OR energy",
+}
+
+# Other spellings of the curated topics
+TOPIC_ALIASES = {
+    "vr": "virtual reality",
+    "ar": "augmented reality",
+    "mixed reality": "augmented reality",
+    "xr": "augmented reality",
+    "llm": "large language models",
+    "llms": "large language models",
+    "large language model": "large language models",
+    "chatgpt": "large language models",
+    "ml": "machine learning",
+    "deep learning": "machine learning",
+    "ai": "machine learning",
+    "artificial intelligence": "machine learning",
+    "a11y": "accessibility",
+    "haptic": "haptics",
+    "visualisation": "visualization",
+    "infovis": "visualization",
+    "game": "games",
+    "gaming": "games",
+    "kids": "children",
+}
+
+
+def topic_key(topic: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", topic.lower()).split())
+
+def resolve_topic(topic: str):
+    """(curated topic name or None, FTS5 MATCH expression) for a user topic."""
+    key = topic_key(topic)
+    key = TOPIC_ALIASES.get(key, key)
+    if key in TOPIC_QUERIES:
+        return key, TOPIC_QUERIES[key]
+    if not key:
+        return None, None
+    # Ad-hoc topic: the words as one phrase, last word as a prefix ("haptic glove" -> gloves)
+    return None, f'"{key}" *'
+
+
+def create_tables(conn):
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS pub_titles_fts;")
+    cur.execute("DROP TABLE IF EXISTS topic_pubs;")
+    cur.execute("DROP TABLE IF EXISTS pub_year_totals;")
+    # Own copy of the titles (no external content): publications has no
+    # INTEGER PRIMARY KEY, so its rowids are not stable across VACUUM
+    cur.execute(f"""
+        CREATE VIRTUAL TABLE pub_titles_fts USING fts5(
+            title,
+            pub_key UNINDEXED,
+            tokenize = '{TOKENIZER}'
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE topic_pubs (
+            topic   TEXT NOT NULL,
+            pub_key TEXT NOT NULL,
+            PRIMARY KEY (topic, pub_key)
+        ) WITHOUT ROWID;
+    """)
+    # Denominator of the topic shares: AC publications per year
+    cur.execute("""
+        CREATE TABLE pub_year_totals (
+            high_conf   INTEGER NOT NULL,
+            year        INTEGER NOT NULL,
+            paper_count INTEGER NOT NULL,
+            PRIMARY KEY (high_conf, year)
+        ) WITHOUT ROWID;
+    """)
+
+def build_title_index(conn):
+    t0 = time.perf_counter()
+    with conn:
+        create_tables(conn)
+        conn.execute("""
+            INSERT INTO pub_titles_fts (title, pub_key)
+            SELECT title, pub_key FROM publications
+            WHERE title IS NOT NULL AND title != ''
+        """)
+        # Merge the b-tree segments written during the bulk load
+        conn.execute("INSERT INTO pub_titles_fts (pub_titles_fts) VALUES ('optimize');")
+
+        for topic, query in TOPIC_QUERIES.items():
+            conn.execute("""
+                INSERT OR IGNORE INTO topic_pubs (topic, pub_key)
+                SELECT ?, pub_key FROM pub_titles_fts WHERE pub_titles_fts MATCH ?
+            """, (topic, query))
+
+        for high_conf, join in ((0, ""),
+                                (1, "JOIN persons_high_conf phc ON phc.person_id = a.person_id")):
+            conn.execute(f"""
+                INSERT INTO pub_year_totals (high_conf, year, paper_count)
+                SELECT ?, pub.year, COUNT(DISTINCT pub.pub_key)
+                FROM authorships a
+                JOIN publications pub ON pub.pub_key = a.pub_key
+                {join}
+                WHERE pub.year IS NOT NULL
+                GROUP BY pub.year
+            """, (high_conf,))
+
+    n_titles = conn.execute("SELECT COUNT(*) FROM pub_titles_fts").fetchone()[0]
+    print(f"pub_titles_fts: {n_titles} titles indexed in {time.perf_counter() - t0:.2f}s")
+    for topic, n in conn.execute(
+            "SELECT topic, COUNT(*) FROM topic_pubs GROUP BY topic ORDER BY COUNT(*) DESC"):
+        print(f"  {topic:24s} {n}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text index over publication titles.")
+    parser.add_argument("--query", help="after building, show the top BM25 hits for a topic")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_PATH)
+    build_title_index(conn)
+    if args.query:
+        _, match = resolve_topic(args.query)
+        for title, rank in conn.execute("""
+            SELECT title, bm25(pub_titles_fts) FROM pub_titles_fts
+            WHERE pub_titles_fts MATCH ? ORDER BY rank LIMIT 10
+        """, (match,)):
+            print(f"  {rank:7.2f}  {title}")
+    conn.close()
+    print("Finished, written into chi_ac.db")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import argparse
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+DB_PATH = Path("database/chi_ac.db")
+
+N_TOPICS = 24
+NMF_ITERATIONS = 300
+FOLD_IN_ITERATIONS = 100
+SEED = 0
+
+# Vocabulary: terms in at least MIN_DF titles and at most MAX_DF of them
+MIN_DF = 5
+MAX_DF = 0.3
+
+# Per-publication topic weights are normalized to sum to 1; smaller ones are dropped
+MIN_PUB_WEIGHT = 0.1
+TOP_TERMS = 12
+
+EPS = 1e-9
+# Floor for W / H: multiplicative updates drive unused weights into float32
+# subnormals, which are an order of magnitude slower to multiply
+FLOOR = 1e-12
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+
+# English stop words plus words every HCI title uses
+STOP_WORDS = set("""
+a about above across after again against all along also am among an and any are as at
+be because been before being between both but by can could did do does doing down during
+each few for from further had has have having he her here hers how i if in into is it its
+itself just more most my no nor not now of off on once only or other our out over own same
+she should so some such than that the their them then there these they this those through
+to too under until up upon very via vs was we were what when where which while who whom
+why will with within without would you your
+towards toward using use based study studies case design designing designs understanding
+exploring explore investigating examining evaluating approach approaches new novel
+effects effect impact role through system systems user users human interaction
+interactive interfaces interface computer chi extended abstracts proceedings workshop
+""".split())
+
+
+def tokenize(title: str):
+    return [t for t in TOKEN_RE.findall(title.lower()) if t not in STOP_WORDS]
+
+
+# ---------------- TF-IDF ----------------
+
+def build_vocab(token_lists):
+    """{term: column} and idf vector from the document frequencies of token_lists."""
+    df = {}
+    for tokens in token_lists:
+        for t in set(tokens):
+            df[t] = df.get(t, 0) + 1
+    n_docs = len(token_lists)
+    terms = sorted(t for t, n in df.items() if n >= MIN_DF and n <= MAX_DF * n_docs)
+    vocab = {t: i for i, t in enumerate(terms)}
+    doc_freq = np.array([df[t] for t in terms], dtype=np.float64)
+    idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+    return vocab, idf
+
+def tfidf_matrix(token_lists, vocab, idf):
+    """L2-normalized sublinear TF-IDF rows (CSR, float32), one per token list."""
+    rows, cols = [], []
+    for r, tokens in enumerate(token_lists):
+        ids = [vocab[t] for t in tokens if t in vocab]
+        rows.extend([r] * len(ids))
+        cols.extend(ids)
+    data = np.ones(len(rows), dtype=np.float64)
+    X = sparse.csr_matrix((data, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+                          shape=(len(token_lists), len(vocab)))
+    X.sum_duplicates()
+    X.data = (1 + np.log(X.data)) * idf[X.indices]
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    X = sparse.diags(1 / norms) @ X
+    return X.astype(np.float32).tocsr()
+
+
+# ---------------- NMF ----------------
+
+def fit_nmf(X, k: int, iterations: int = NMF_ITERATIONS, seed: int = SEED):
+    """
+    X ~ W @ H with W, H >= 0 (Frobenius loss, multiplicative updates).
+    X is only touched through sparse-dense products, never densified.
+    """
+    rng = np.random.default_rng(seed)
+    Xt = X.T.tocsr()
+    scale = np.sqrt(X.mean() / k)
+    W = (rng.random((X.shape[0], k)) * scale).astype(np.float32)
+    H = (rng.random((k, X.shape[1])) * scale).astype(np.float32)
+    for _ in range(iterations):
+        H *= (Xt @ W).T / ((W.T @ W) @ H + EPS)
+        np.maximum(H, FLOOR, out=H)
+        W *= (X @ H.T) / (W @ (H @ H.T) + EPS)
+        np.maximum(W, FLOOR, out=W)
+    return W, H
+
+def fold_in(X, H, iterations: int = FOLD_IN_ITERATIONS):
+    """Topic weights W for new rows of X with the topics H held fixed."""
+    W = np.full((X.shape[0], H.shape[0]), 1.0 / H.shape[0], dtype=np.float32)
+    HHt = H @ H.T
+    XHt = X @ H.T
+    for _ in range(iterations):
+        W *= XHt / (W @ HHt + EPS)
+        np.maximum(W, FLOOR, out=W)
+    return W
+
+
+# ---------------- Tables ----------------
+
+def create_tables(conn):
+    cur = conn.cursor()
+    for table in ("topic_model_meta", "topic_model_vocab", "topic_model_topics", "pub_topics",
+                  "topic_model_docs", "topic_year_shares", "person_topic_shares"):
+        cur.execute(f"DROP TABLE IF EXISTS {table};")
+    cur.execute("""
+        CREATE TABLE topic_model_meta (
+            key   TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE topic_model_vocab (
+            term_id INTEGER PRIMARY KEY,
+            term    TEXT NOT NULL UNIQUE,
+            idf     REAL NOT NULL
+        );
+    """)
+    # components: float32 row of H over topic_model_vocab.term_id, for fold-in
+    cur.execute("""
+        CREATE TABLE topic_model_topics (
+            topic_id   INTEGER PRIMARY KEY,
+            label      TEXT NOT NULL,
+            top_terms  TEXT NOT NULL,
+            components BLOB NOT NULL
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE pub_topics (
+            pub_key  TEXT NOT NULL,
+            topic_id INTEGER NOT NULL,
+            weight   REAL NOT NULL,
+            PRIMARY KEY (pub_key, topic_id)
+        ) WITHOUT ROWID;
+    """)
+    cur.execute("CREATE INDEX idx_pub_topics_topic ON pub_topics(topic_id);")
+    # Every publication the model has seen, including titles with no known term
+    cur.execute("""
+        CREATE TABLE topic_model_docs (
+            pub_key TEXT PRIMARY KEY,
+            n_terms INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    create_share_tables(conn)
+
+def create_share_tables(conn):
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS topic_year_shares;")
+    cur.execute("DROP TABLE IF EXISTS person_topic_shares;")
+    cur.execute("""
+        CREATE TABLE topic_year_shares (
+            high_conf    INTEGER NOT NULL,
+            year         INTEGER NOT NULL,
+            topic_id     INTEGER NOT NULL,
+            paper_weight REAL NOT NULL,
+            share        REAL NOT NULL,
+            PRIMARY KEY (high_conf, topic_id, year)
+        ) WITHOUT ROWID;
+    """)
+    cur.execute("""
+        CREATE TABLE person_topic_shares (
+            person_id    INTEGER NOT NULL,
+            topic_id     INTEGER NOT NULL,
+            paper_weight REAL NOT NULL,
+            share        REAL NOT NULL,
+            PRIMARY KEY (person_id, topic_id)
+        ) WITHOUT ROWID;
+    """)
+
+def has_model(conn) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'topic_model_topics'"
+    ).fetchone() is not None and conn.execute(
+        "SELECT 1 FROM topic_model_topics LIMIT 1").fetchone() is not None
+
+def load_titles(conn, only_new: bool):
+    new_filter = "AND pub_key NOT IN (SELECT pub_key FROM topic_model_docs)" if only_new else ""
+    return conn.execute(f"""
+        SELECT pub_key, title FROM publications
+        WHERE title IS NOT NULL AND title != '' {new_filter}
+        ORDER BY pub_key
+    """).fetchall()
+
+def load_model(conn):
+    vocab, idf = {}, []
+    for term_id, term, term_idf in conn.execute(
+            "SELECT term_id, term, idf FROM topic_model_vocab ORDER BY term_id"):
+        vocab[term] = term_id
+        idf.append(term_idf)
+    H = np.vstack([np.frombuffer(blob, dtype=np.float32) for (blob,) in conn.execute(
+        "SELECT components FROM topic_model_topics ORDER BY topic_id")])
+    return vocab, np.array(idf), H
+
+
+def save_model(conn, vocab, idf, H, n_docs: int):
+    terms = sorted(vocab, key=vocab.get)
+    conn.executemany("INSERT INTO topic_model_vocab (term_id, term, idf) VALUES (?, ?, ?)",
+                     [(vocab[t], t, float(idf[vocab[t]])) for t in terms])
+    rows = []
+    for topic_id, h in enumerate(H):
+        top = [terms[i] for i in np.argsort(-h)[:TOP_TERMS] if h[i] > FLOOR]
+        rows.append((topic_id, " / ".join(top[:3]), json.dumps(top), h.astype(np.float32).tobytes()))
+    conn.executemany("""
+        INSERT INTO topic_model_topics (topic_id, label, top_terms, components)
+        VALUES (?, ?, ?, ?)
+    """, rows)
+    conn.executemany("INSERT INTO topic_model_meta (key, value) VALUES (?, ?)", [
+        ("n_topics", str(H.shape[0])),
+        ("n_docs_fit", str(n_docs)),
+        ("fitted_at", time.strftime("%Y-%m-%d %H:%M:%S")),
+    ])
+
+def save_pub_topics(conn, pub_keys, X, W):
+    """Normalized per-publication weights >= MIN_PUB_WEIGHT, and the seen-docs marker."""
+    totals = W.sum(axis=1, keepdims=True)
+    shares = np.divide(W, totals, out=np.zeros_like(W), where=totals > 0)
+    r, c = np.nonzero(shares >= MIN_PUB_WEIGHT)
+    conn.executemany(
+        "INSERT OR REPLACE INTO pub_topics (pub_key, topic_id, weight) VALUES (?, ?, ?)",
+        [(pub_keys[i], int(t), round(float(shares[i, t]), 4)) for i, t in zip(r, c)])
+    n_terms = np.diff(X.indptr)
+    conn.executemany(
+        "INSERT OR REPLACE INTO topic_model_docs (pub_key, n_terms) VALUES (?, ?)",
+        [(k, int(n)) for k, n in zip(pub_keys, n_terms)])
+
+def refresh_shares(conn):
+    """topic_year_shares (all / high-conf ACs) and person_topic_shares from pub_topics."""
+    create_share_tables(conn)
+    for high_conf, join in ((0, ""),
+                            (1, "JOIN persons_high_conf phc ON phc.person_id = a.person_id")):
+        conn.execute(f"""
+            INSERT INTO topic_year_shares (high_conf, year, topic_id, paper_weight, share)
+            WITH ac_pubs AS (
+                SELECT DISTINCT a.pub_key
+                FROM authorships a
+                {join}
+            ),
+            weights AS (
+                SELECT pub.year AS year, pt.topic_id AS topic_id, SUM(pt.weight) AS w
+                FROM ac_pubs ap
+                JOIN publications pub ON pub.pub_key = ap.pub_key
+                JOIN pub_topics pt ON pt.pub_key = ap.pub_key
+                WHERE pub.year IS NOT NULL
+                GROUP BY pub.year, pt.topic_id
+            )
+            SELECT ?, year, topic_id, ROUND(w, 3),
+                   ROUND(w / SUM(w) OVER (PARTITION BY year), 4)
+            FROM weights
+        """, (high_conf,))
+    conn.execute("""
+        INSERT INTO person_topic_shares (person_id, topic_id, paper_weight, share)
+        WITH weights AS (
+            SELECT a.person_id AS person_id, pt.topic_id AS topic_id, SUM(pt.weight) AS w
+            FROM authorships a
+            JOIN pub_topics pt ON pt.pub_key = a.pub_key
+            GROUP BY a.person_id, pt.topic_id
+        )
+        SELECT person_id, topic_id, ROUND(w, 3),
+               ROUND(w / SUM(w) OVER (PARTITION BY person_id), 4)
+        FROM weights
+    """)
+
+
+def build_topic_model(conn, refit: bool = False, n_topics: int = N_TOPICS):
+    t0 = time.perf_counter()
+    refit = refit or not has_model(conn)
+    with conn:
+        if refit:
+            rows = load_titles(conn, only_new=False)
+            pub_keys = [r[0] for r in rows]
+            token_lists = [tokenize(r[1]) for r in rows]
+            vocab, idf = build_vocab(token_lists)
+            X = tfidf_matrix(token_lists, vocab, idf)
+            print(f"TF-IDF: {X.shape[0]} titles x {X.shape[1]} terms, {X.nnz} non-zeros")
+            n_topics = min(n_topics, X.shape[1])
+            W, H = fit_nmf(X, n_topics)
+            create_tables(conn)
+            save_model(conn, vocab, idf, H, len(pub_keys))
+            print(f"NMF: {n_topics} topics fitted in {time.perf_counter() - t0:.2f}s")
+        else:
+            rows = load_titles(conn, only_new=True)
+            pub_keys = [r[0] for r in rows]
+            vocab, idf, H = load_model(conn)
+            X = tfidf_matrix([tokenize(r[1]) for r in rows], vocab, idf)
+            W = fold_in(X, H)
+            print(f"Assigned {len(pub_keys)} new titles to the existing {H.shape[0]} topics")
+        save_pub_topics(conn, pub_keys, X, W)
+        refresh_shares(conn)
+    print(f"Done in {time.perf_counter() - t0:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="NMF topic model over publication titles with per-year / per-AC topic shares.")
+    parser.add_argument("--refit", action="store_true",
+                        help="refit vocabulary and topics on all titles (default: only "
+                             "assign titles not seen yet, fitting if there is no model)")
+    parser.add_argument("--topics", type=int, default=N_TOPICS)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_PATH)
+    build_topic_model(conn, refit=args.refit, n_topics=args.topics)
+    for topic_id, top_terms in conn.execute(
+            "SELECT topic_id, top_terms FROM topic_model_topics ORDER BY topic_id"):
+        print(f"  {topic_id:3d}  {', '.join(json.loads(top_terms)[:8])}")
+    conn.close()
+    print("Finished, written into chi_ac.db")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,122 @@
 # scripts/db_queries.py
 import json
+import os
+import sqlite3
 from typing import List, Dict, Any, Optional
 from db_utils import run_sql
+from build_institutions import institution_key
+from build_title_index import resolve_topic
+
+# Backend for the aggregate tools:
+#   "sqlite"   (default) SQL on every call
+#   "parquet"  columnar data written by export_parquet.py, aggregated with pandas
+#   "snapshot" ac_roles / high-conf set loaded from the DB into memory once,
+#              reloaded when the DB changes; repeated calls are served from cache
+ANALYTICS_BACKEND = os.getenv("CHIPULSE_ANALYTICS_BACKEND", "sqlite")
+
+# In-memory person registry (person_registry.py) for find_persons_by_name; "0" = SQL
+USE_PERSON_REGISTRY = os.getenv("CHIPULSE_PERSON_REGISTRY", "1") != "0"
+
+_frames = None
+_snapshot = None
+_registry = None
+_gazetteer = None
+_similarity = None
+_schema = None
+
+
+def _analytics_frames():
+    """AnalyticsFrames for the columnar backends, or None to use SQL."""
+    global _frames, _snapshot
+    if ANALYTICS_BACKEND == "parquet":
+        if _frames is None:
+            from analytics import load_parquet_frames
+            _frames = load_parquet_frames()
+        return _frames
+    if ANALYTICS_BACKEND == "snapshot":
+        if _snapshot is None:
+            from analytics import AnalyticsSnapshot
+            from db_utils import DB_PATH
+            _snapshot = AnalyticsSnapshot(DB_PATH)
+        return _snapshot.get()
+    return None
+
+def preload_analytics():
+    """Load the analytics backend up front (server start) instead of on the first query."""
+    _analytics_frames()
+
+def person_registry():
+    """PersonRegistry kept in sync with the DB, or None to use SQL."""
+    global _registry
+    if not USE_PERSON_REGISTRY:
+        return None
+    if _registry is None:
+        from db_utils import DB_PATH, DbSnapshot
+        from person_registry import PersonRegistry
+        _registry = DbSnapshot(PersonRegistry.from_db, DB_PATH, name="person_registry")
+    return _registry.get()
+
+def gazetteer():
+    """Entity gazetteer (gazetteer.py) kept in sync with the DB."""
+    global _gazetteer
+    if _gazetteer is None:
+        from db_utils import DB_PATH, DbSnapshot
+        from gazetteer import Gazetteer
+        _gazetteer = DbSnapshot(Gazetteer.from_db, DB_PATH, name="gazetteer")
+    return _gazetteer.get()
+
+def similarity_index():
+    """
+    Memory-mapped similar-ACs index (similar_acs.py) of the DB's current
+    version; empty until similar_acs.py has been run on it.
+    """
+    global _similarity
+    if _similarity is None:
+        from db_utils import DB_PATH, DbSnapshot
+        from similar_acs import INDEX_DIR, SimilarityIndex
+        # Rebuilds record themselves in the DB; the directory catches removed files
+        _similarity = DbSnapshot(SimilarityIndex.open, DB_PATH, name="similar_acs",
+                                 watch=[INDEX_DIR])
+    return _similarity.get()
+
+def _load_schema(db_path) -> Dict[str, Any]:
+    """Object names of the DB and the columns of ac_roles."""
+    conn = sqlite3.connect(db_path)
+    try:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        ac_roles_cols = {r[1] for r in conn.execute("PRAGMA table_info(ac_roles)")}
+    finally:
+        conn.close()
+    return {"names": names, "ac_roles_cols": ac_roles_cols}
+
+def schema():
+    """Schema facts behind _has_table / _hc_filter, re-read only when the DB changes."""
+    global _schema
+    if _schema is None:
+        from db_utils import DB_PATH, DbSnapshot
+        _schema = DbSnapshot(_load_schema, DB_PATH, name="schema")
+    return _schema.get()
+
+def _has_table(name: str) -> bool:
+    return name in schema()["names"]
+
+def _hc_filter(alias: str = "ar") -> str:
+    """
+    WHERE predicate keeping high-confidence roles of ac_roles `alias`: the
+    ac_roles.high_conf flag written by build_high_conf.py, or a lookup in
+    persons_high_conf on DBs built before it.
+    """
+    if "high_conf" in schema()["ac_roles_cols"]:
+        return f"{alias}.high_conf = 1"
+    return f"{alias}.person_id IN (SELECT person_id FROM persons_high_conf)"
+
+def _institution_pattern(keyword: str) -> Optional[str]:
+    """
+    LIKE pattern matching the keyword as whole words of an alias key
+    (institution_aliases.alias_key), so 'mit' hits 'MIT CSAIL' but not 'Smith'.
+    """
+    key = institution_key(keyword)
+    return f"% {key} %" if key else None
 
 # ======================
 # 1. Yearly / Affiliation Statistics
@@ -12,6 +127,10 @@ def get_ac_year_stats_all() -> List[Dict[str, Any]]:
     Yearly total number of ACs (all persons, regardless of DBLP matching).
     Returns: [{year, ac_count}, ...]
     """
+    frames = _analytics_frames()
+    if frames is not None:
+        return frames.cached("ac_year_stats_all")
+
     rows = run_sql(
         """
         SELECT
@@ -30,14 +149,17 @@ def get_ac_year_stats_high_conf() -> List[Dict[str, Any]]:
     Yearly number of ACs in persons_high_conf (high-confidence DBLP matches).
     Returns: [{year, ac_count_high_conf}, ...]
     """
+    frames = _analytics_frames()
+    if frames is not None:
+        return frames.cached("ac_year_stats_high_conf")
+
     rows = run_sql(
-        """
+        f"""
         SELECT
             ar.year AS year,
             COUNT(DISTINCT ar.person_id) AS ac_count_high_conf
         FROM ac_roles ar
-        JOIN persons_high_conf phc
-          ON phc.person_id = ar.person_id
+        WHERE {_hc_filter()}
         GROUP BY ar.year
         ORDER BY ar.year
         """
@@ -50,22 +172,49 @@ def get_ac_year_stats_high_conf() -> List[Dict[str, Any]]:
 
 def get_top_affiliations_high_conf(limit: int = 20) -> List[Dict[str, Any]]:
     """
-    Counts high-confidence AC appearances by affiliation (ac_roles.affiliation_raw).
+    Counts high-confidence AC appearances by institution (role_institutions,
+    built by build_institutions.py; raw ac_roles.affiliation_raw on older DBs).
     Each “person-year-committee” record counts as 1.
     Returns: [{affiliation, ac_roles_count}, ...]
     """
+    frames = _analytics_frames()
+    if frames is not None:
+        return frames.cached("top_affiliations_high_conf", limit)
+
+    if _has_table("role_institutions"):
+        rows = run_sql(
+            f"""
+            SELECT
+                i.name AS affiliation,
+                COUNT(*) AS ac_roles_count
+            FROM role_institutions ri
+            JOIN ac_roles ar
+              ON ar.ac_role_id = ri.ac_role_id
+            JOIN institutions i
+              ON i.institution_id = ri.institution_id
+            WHERE {_hc_filter()}
+            GROUP BY ri.institution_id
+            ORDER BY ac_roles_count DESC, affiliation
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return [
+            {"affiliation": r["affiliation"], "ac_roles_count": r["ac_roles_count"]}
+            for r in rows
+        ]
+
     rows = run_sql(
-        """
+        f"""
         SELECT
             ar.affiliation_raw AS affiliation,
             COUNT(*) AS ac_roles_count
         FROM ac_roles ar
-        JOIN persons_high_conf phc
-          ON phc.person_id = ar.person_id
         WHERE ar.affiliation_raw IS NOT NULL
           AND ar.affiliation_raw != ''
+          AND {_hc_filter()}
         GROUP BY ar.affiliation_raw
-        ORDER BY ac_roles_count DESC
+        ORDER BY ac_roles_count DESC, affiliation
         LIMIT ?
         """,
         (limit,),
@@ -86,7 +235,7 @@ def get_ac_list_by_year(
     """
     if high_conf_only:
         rows = run_sql(
-            """
+            f"""
             SELECT
                 ar.person_id,
                 p.canonical_name AS name,
@@ -96,11 +245,10 @@ def get_ac_list_by_year(
                 ar.affiliation_raw AS affiliation,
                 ar.country
             FROM ac_roles ar
-            JOIN persons_high_conf phc
-              ON phc.person_id = ar.person_id
             LEFT JOIN persons p
               ON p.person_id = ar.person_id
             WHERE ar.year = ?
+              AND {_hc_filter()}
             ORDER BY ar.venue, ar.committee, name
             """,
             (year,),
@@ -132,22 +280,53 @@ def get_affiliation_trend(
     high_conf_only: bool = True,
 ) -> List[Dict[str, Any]]:
     """
-    Query yearly trend for an institution (fuzzy keyword match).
+    Query yearly trend for an institution. The keyword is matched as whole
+    words against institution aliases (e.g. 'cmu' -> Carnegie Mellon), then
+    roles are looked up by institution_id.
     Example keywords: 'microsoft', 'toronto', 'google'
     Returns: [{year, ac_count}, ...]
     """
+    frames = _analytics_frames()
+    if frames is not None:
+        return frames.cached("affiliation_trend", keyword, high_conf_only)
+
+    if _has_table("role_institutions"):
+        pattern = _institution_pattern(keyword)
+        if pattern is None:
+            return []
+        hc = f"AND {_hc_filter()}" if high_conf_only else ""
+        rows = run_sql(
+            f"""
+            SELECT
+                ar.year AS year,
+                COUNT(DISTINCT ar.person_id) AS ac_count
+            FROM role_institutions ri
+            JOIN ac_roles ar
+              ON ar.ac_role_id = ri.ac_role_id
+            WHERE ri.institution_id IN (
+                SELECT institution_id
+                FROM institution_aliases
+                WHERE ' ' || alias_key || ' ' LIKE ?
+            )
+              {hc}
+            GROUP BY ar.year
+            ORDER BY ar.year
+            """,
+            (pattern,),
+        )
+        return [{"year": r["year"], "ac_count": r["ac_count"]} for r in rows]
+
     pattern = f"%{keyword.lower()}%"
     if high_conf_only:
         rows = run_sql(
-            """
+            f"""
             SELECT
                 ar.year AS year,
                 COUNT(DISTINCT ar.person_id) AS ac_count
             FROM ac_roles ar
-            JOIN persons_high_conf phc
-              ON phc.person_id = ar.person_id
             WHERE ar.affiliation_raw IS NOT NULL
               AND LOWER(ar.affiliation_raw) LIKE ?
+              AND {_hc_filter()}
             GROUP BY ar.year
             ORDER BY ar.year
             """,
@@ -191,6 +370,14 @@ def get_person_full_profile(person_id: int) -> Optional[Dict[str, Any]]:
         (person_id,),
     )
     if not person_rows:
+        # A person_id merged away by dedup_persons.py resolves to its survivor
+        if _has_table("person_aliases"):
+            alias = run_sql(
+                "SELECT person_id FROM person_aliases WHERE alias_person_id = ?",
+                (person_id,),
+            )
+            if alias:
+                return get_person_full_profile(alias[0]["person_id"])
         return None
     person = dict(person_rows[0])
 
@@ -200,7 +387,7 @@ def get_person_full_profile(person_id: int) -> Optional[Dict[str, Any]]:
         SELECT year, venue, committee, affiliation_raw, country
         FROM ac_roles
         WHERE person_id = ?
-        ORDER BY year, venue, committee
+        ORDER BY year, venue, committee, ac_role_id
         """,
         (person_id,),
     )
@@ -222,7 +409,7 @@ def get_person_full_profile(person_id: int) -> Optional[Dict[str, Any]]:
         JOIN publications pub
           ON pub.pub_key = a.pub_key
         WHERE a.person_id = ?
-        ORDER BY pub.year, pub.venue
+        ORDER BY pub.year, pub.venue, pub.pub_key
         """,
         (person_id,),
     )
@@ -241,6 +428,10 @@ def find_persons_by_name(
     Useful when browsing in notebook.
     Returns: [{person_id, canonical_name, match_status, dblp_pid}, ...]
     """
+    registry = person_registry()
+    if registry is not None:
+        return registry.find(name_substring, high_conf_only, limit)
+
     pattern = f"%{name_substring.lower()}%"
     if high_conf_only:
         rows = run_sql(
@@ -287,6 +478,10 @@ def get_hci_ac_publication_stats() -> List[Dict[str, Any]]:
     across years and venues.
     Returns: [{year, venue, paper_count, unique_ac_authors}, ...]
     """
+    frames = _analytics_frames()
+    if frames is not None:
+        return frames.cached("hci_ac_publication_stats")
+
     rows = run_sql(
         """
         SELECT
@@ -401,19 +596,36 @@ def get_top_countries_overall(
 ) -> List[Dict[str, Any]]:
     """
     Global distribution of ACs by country (counting unique persons).
+    Uses the precomputed, ISO-normalized rollups of build_geography.py when present.
     Returns: [{country, ac_count}, ...], sorted by ac_count desc.
     """
-    if high_conf_only:
+    frames = _analytics_frames()
+    if frames is not None:
+        return frames.cached("top_countries_overall", limit, high_conf_only)
+
+    if _has_table("geo_total_counts"):
         rows = run_sql(
             """
+            SELECT name AS country, ac_count
+            FROM geo_total_counts
+            WHERE level = 'country' AND high_conf = ?
+            ORDER BY ac_count DESC, country
+            LIMIT ?
+            """,
+            (int(high_conf_only), limit),
+        )
+        return [{"country": r["country"], "ac_count": r["ac_count"]} for r in rows]
+
+    if high_conf_only:
+        rows = run_sql(
+            f"""
             SELECT
                 COALESCE(NULLIF(TRIM(ar.country), ''), 'Unknown') AS country,
                 COUNT(DISTINCT ar.person_id) AS ac_count
             FROM ac_roles ar
-            JOIN persons_high_conf phc
-              ON phc.person_id = ar.person_id
+            WHERE {_hc_filter()}
             GROUP BY country
-            ORDER BY ac_count DESC
+            ORDER BY ac_count DESC, country
             LIMIT ?
             """,
             (limit,),
@@ -426,7 +638,7 @@ def get_top_countries_overall(
                 COUNT(DISTINCT person_id) AS ac_count
             FROM ac_roles
             GROUP BY country
-            ORDER BY ac_count DESC
+            ORDER BY ac_count DESC, country
             LIMIT ?
             """,
             (limit,),
@@ -450,15 +662,18 @@ def get_ac_year_overview(
     - Country distribution with percentages
     - Committee distribution with percentages
     """
+    frames = _analytics_frames()
+    if frames is not None:
+        return frames.cached("ac_year_overview", year, high_conf_only, max_countries, max_committees)
+
     # Total AC count
     if high_conf_only:
         total_rows = run_sql(
-            """
+            f"""
             SELECT COUNT(DISTINCT ar.person_id) AS total_ac
             FROM ac_roles ar
-            JOIN persons_high_conf phc
-              ON phc.person_id = ar.person_id
             WHERE ar.year = ?
+              AND {_hc_filter()}
             """,
             (year,),
         )
@@ -491,18 +706,27 @@ def get_ac_year_overview(
         return out
 
     # Country distribution
-    if high_conf_only:
+    if _has_table("geo_year_counts"):
         country_rows = run_sql(
             """
+            SELECT name AS country, ac_count
+            FROM geo_year_counts
+            WHERE level = 'country' AND high_conf = ? AND year = ?
+            ORDER BY ac_count DESC, country
+            """,
+            (int(high_conf_only), year),
+        )
+    elif high_conf_only:
+        country_rows = run_sql(
+            f"""
             SELECT
                 COALESCE(NULLIF(TRIM(ar.country), ''), 'Unknown') AS country,
                 COUNT(DISTINCT ar.person_id) AS ac_count
             FROM ac_roles ar
-            JOIN persons_high_conf phc
-              ON phc.person_id = ar.person_id
             WHERE ar.year = ?
+              AND {_hc_filter()}
             GROUP BY country
-            ORDER BY ac_count DESC
+            ORDER BY ac_count DESC, country
             """,
             (year,),
         )
@@ -515,7 +739,7 @@ def get_ac_year_overview(
             FROM ac_roles
             WHERE year = ?
             GROUP BY country
-            ORDER BY ac_count DESC
+            ORDER BY ac_count DESC, country
             """,
             (year,),
         )
@@ -525,16 +749,15 @@ def get_ac_year_overview(
     # Committee distribution
     if high_conf_only:
         committee_rows = run_sql(
-            """
+            f"""
             SELECT
                 COALESCE(NULLIF(TRIM(ar.committee), ''), 'Unknown') AS committee,
                 COUNT(DISTINCT ar.person_id) AS ac_count
             FROM ac_roles ar
-            JOIN persons_high_conf phc
-              ON phc.person_id = ar.person_id
             WHERE ar.year = ?
+              AND {_hc_filter()}
             GROUP BY committee
-            ORDER BY ac_count DESC
+            ORDER BY ac_count DESC, committee
             """,
             (year,),
         )
@@ -547,7 +770,7 @@ def get_ac_year_overview(
             FROM ac_roles
             WHERE year = ?
             GROUP BY committee
-            ORDER BY ac_count DESC
+            ORDER BY ac_count DESC, committee
             """,
             (year,),
         )
@@ -563,6 +786,47 @@ def get_ac_year_overview(
     }
 
 
+def get_geo_distribution(
+    level: str = "region",
+    year: Optional[int] = None,
+    high_conf_only: bool = True,
+    limit: int = 30,
+) -> List[Dict[str, Any]]:
+    """
+    Distinct ACs per country / region / continent, for one year or all years,
+    read from the geo_*_counts rollups built by build_geography.py.
+    Returns: [{name, ac_count}, ...], sorted by ac_count desc.
+    """
+    if level not in ("country", "region", "continent"):
+        raise ValueError(f"Unknown geography level: {level}")
+    if not _has_table("geo_year_counts"):
+        return []
+
+    if year is None:
+        rows = run_sql(
+            """
+            SELECT name, ac_count
+            FROM geo_total_counts
+            WHERE level = ? AND high_conf = ?
+            ORDER BY ac_count DESC, name
+            LIMIT ?
+            """,
+            (level, int(high_conf_only), limit),
+        )
+    else:
+        rows = run_sql(
+            """
+            SELECT name, ac_count
+            FROM geo_year_counts
+            WHERE level = ? AND high_conf = ? AND year = ?
+            ORDER BY ac_count DESC, name
+            LIMIT ?
+            """,
+            (level, int(high_conf_only), year, limit),
+        )
+    return [{"name": r["name"], "ac_count": r["ac_count"]} for r in rows]
+
+
 def get_trend_overview(
     high_conf_only: bool = True,
 ) -> Dict[str, Any]:
@@ -589,3 +853,424 @@ def get_trend_overview(
         "top_affiliations": top_affs,
         "top_countries": top_countries,
     }
+
+
+# ===================== Topics (publication titles) =====================
+
+def _topic_hits(topic: str):
+    """
+    (SQL selecting the pub_keys of a topic, params, curated topic name) from
+    build_title_index.py: the precomputed topic_pubs posting list for curated
+    topics, else a MATCH on the pub_titles_fts index. None if not indexed.
+    """
+    curated, match = resolve_topic(topic)
+    if match is None or not _has_table("pub_titles_fts"):
+        return None
+    if curated is not None and _has_table("topic_pubs"):
+        return "SELECT pub_key FROM topic_pubs WHERE topic = ?", (curated,), curated
+    return ("SELECT pub_key FROM pub_titles_fts WHERE pub_titles_fts MATCH ?",
+            (match,), None)
+
+def _topic_author_join(high_conf_only: bool) -> str:
+    if high_conf_only:
+        return "JOIN persons_high_conf phc ON phc.person_id = a.person_id"
+    return ""
+
+
+def get_topic_trend(
+    topic: str,
+    high_conf_only: bool = True,
+) -> Dict[str, Any]:
+    """
+    Yearly publications of ACs whose title matches a topic ("VR",
+    "accessibility", "LLM", or any phrase), with the share of all AC
+    publications of that year.
+    Returns: {topic, matched_topic, total_papers,
+              by_year: [{year, paper_count, ac_authors, share}, ...]}
+    """
+    hits = _topic_hits(topic)
+    if hits is None:
+        return {"topic": topic, "matched_topic": None, "total_papers": 0, "by_year": []}
+    hits_sql, params, curated = hits
+    join = _topic_author_join(high_conf_only)
+
+    rows = run_sql(
+        f"""
+        WITH hits AS ({hits_sql})
+        SELECT
+            pub.year AS year,
+            COUNT(DISTINCT pub.pub_key) AS paper_count,
+            COUNT(DISTINCT a.person_id) AS ac_authors
+        FROM hits h
+        JOIN publications pub ON pub.pub_key = h.pub_key
+        JOIN authorships a ON a.pub_key = h.pub_key
+        {join}
+        GROUP BY pub.year
+        ORDER BY pub.year
+        """,
+        params,
+    )
+    if _has_table("pub_year_totals"):
+        total_rows = run_sql(
+            "SELECT year, paper_count FROM pub_year_totals WHERE high_conf = ?",
+            (int(high_conf_only),),
+        )
+    else:
+        total_rows = run_sql(
+            f"""
+            SELECT pub.year AS year, COUNT(DISTINCT pub.pub_key) AS paper_count
+            FROM authorships a
+            JOIN publications pub ON pub.pub_key = a.pub_key
+            {join}
+            GROUP BY pub.year
+            """
+        )
+    totals = {r["year"]: r["paper_count"] for r in total_rows}
+    by_year = []
+    for r in rows:
+        total = totals.get(r["year"]) or 0
+        by_year.append({
+            "year": r["year"],
+            "paper_count": r["paper_count"],
+            "ac_authors": r["ac_authors"],
+            "share": round(r["paper_count"] / total, 4) if total else None,
+        })
+    return {
+        "topic": topic,
+        "matched_topic": curated,
+        "total_papers": sum(r["paper_count"] for r in by_year),
+        "by_year": by_year,
+    }
+
+
+def get_topic_top_acs(
+    topic: str,
+    limit: int = 20,
+    high_conf_only: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    ACs with the most publications on a topic.
+    Returns: [{person_id, name, paper_count, first_year, last_year}, ...]
+    """
+    hits = _topic_hits(topic)
+    if hits is None:
+        return []
+    hits_sql, params, _ = hits
+    rows = run_sql(
+        f"""
+        WITH hits AS ({hits_sql})
+        SELECT
+            a.person_id AS person_id,
+            p.canonical_name AS name,
+            COUNT(DISTINCT a.pub_key) AS paper_count,
+            MIN(pub.year) AS first_year,
+            MAX(pub.year) AS last_year
+        FROM hits h
+        JOIN authorships a ON a.pub_key = h.pub_key
+        {_topic_author_join(high_conf_only)}
+        JOIN persons p ON p.person_id = a.person_id
+        JOIN publications pub ON pub.pub_key = h.pub_key
+        GROUP BY a.person_id
+        ORDER BY paper_count DESC, name
+        LIMIT ?
+        """,
+        params + (limit,),
+    )
+    return [dict(r) for r in rows]
+
+
+def get_topic_top_venues(
+    topic: str,
+    limit: int = 20,
+    high_conf_only: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Venues where ACs publish the most on a topic.
+    Returns: [{venue, paper_count, first_year, last_year}, ...]
+    """
+    hits = _topic_hits(topic)
+    if hits is None:
+        return []
+    hits_sql, params, _ = hits
+    rows = run_sql(
+        f"""
+        WITH hits AS ({hits_sql})
+        SELECT
+            pub.venue AS venue,
+            COUNT(*) AS paper_count,
+            MIN(pub.year) AS first_year,
+            MAX(pub.year) AS last_year
+        FROM hits h
+        JOIN publications pub ON pub.pub_key = h.pub_key
+        WHERE EXISTS (
+            SELECT 1 FROM authorships a
+            {_topic_author_join(high_conf_only)}
+            WHERE a.pub_key = h.pub_key
+        )
+        GROUP BY pub.venue
+        ORDER BY paper_count DESC, venue
+        LIMIT ?
+        """,
+        params + (limit,),
+    )
+    return [dict(r) for r in rows]
+
+
+def search_publication_titles(
+    query: str,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    AC publications whose title matches a topic, best BM25 match first.
+    Returns: [{pub_key, title, year, venue}, ...]
+    """
+    _, match = resolve_topic(query)
+    if match is None or not _has_table("pub_titles_fts"):
+        return []
+    rows = run_sql(
+        """
+        SELECT f.pub_key AS pub_key, f.title AS title, pub.year AS year, pub.venue AS venue
+        FROM pub_titles_fts f
+        JOIN publications pub ON pub.pub_key = f.pub_key
+        WHERE pub_titles_fts MATCH ?
+        ORDER BY f.rank, pub.year DESC, f.pub_key
+        LIMIT ?
+        """,
+        (match, limit),
+    )
+    return [dict(r) for r in rows]
+
+
+# ===================== Topic model (build_topic_model.py) =====================
+
+RECENT_YEARS = 5
+
+
+def get_topic_model_topics(high_conf_only: bool = True) -> List[Dict[str, Any]]:
+    """
+    Topics of the NMF topic model over AC publication titles, with their
+    overall share and the change of their share in the last RECENT_YEARS years.
+    Returns: [{topic_id, label, top_terms, paper_weight, share,
+               recent_share, earlier_share, share_change}, ...]
+    """
+    if not _has_table("topic_year_shares"):
+        return []
+    rows = run_sql(
+        """
+        WITH bounds AS (
+            SELECT MAX(year) - ? AS cutoff
+            FROM topic_year_shares WHERE high_conf = ?
+        ),
+        per_topic AS (
+            SELECT
+                s.topic_id AS topic_id,
+                SUM(s.paper_weight) AS paper_weight,
+                SUM(CASE WHEN s.year > b.cutoff THEN s.paper_weight ELSE 0 END) AS recent_weight,
+                SUM(CASE WHEN s.year <= b.cutoff THEN s.paper_weight ELSE 0 END) AS earlier_weight
+            FROM topic_year_shares s, bounds b
+            WHERE s.high_conf = ?
+            GROUP BY s.topic_id
+        )
+        SELECT
+            t.topic_id AS topic_id,
+            t.label AS label,
+            t.top_terms AS top_terms,
+            ROUND(pt.paper_weight, 1) AS paper_weight,
+            ROUND(pt.paper_weight / SUM(pt.paper_weight) OVER (), 4) AS share,
+            ROUND(pt.recent_weight / NULLIF(SUM(pt.recent_weight) OVER (), 0), 4) AS recent_share,
+            ROUND(pt.earlier_weight / NULLIF(SUM(pt.earlier_weight) OVER (), 0), 4) AS earlier_share
+        FROM per_topic pt
+        JOIN topic_model_topics t ON t.topic_id = pt.topic_id
+        ORDER BY paper_weight DESC, t.topic_id
+        """,
+        (RECENT_YEARS - 1, int(high_conf_only), int(high_conf_only)),
+    )
+    result = []
+    for r in rows:
+        d = dict(r)
+        d["top_terms"] = json.loads(d["top_terms"])[:8]
+        if d["recent_share"] is not None and d["earlier_share"] is not None:
+            d["share_change"] = round(d["recent_share"] - d["earlier_share"], 4)
+        else:
+            d["share_change"] = None
+        result.append(d)
+    return result
+
+
+def get_topic_model_trend(
+    topic_id: int,
+    high_conf_only: bool = True,
+) -> Dict[str, Any]:
+    """
+    Yearly share of one topic-model topic among AC publications.
+    Returns: {topic_id, label, top_terms, by_year: [{year, paper_weight, share}, ...]}
+    """
+    if not _has_table("topic_year_shares"):
+        return {"topic_id": topic_id, "label": None, "top_terms": [], "by_year": []}
+    topic = run_sql(
+        "SELECT label, top_terms FROM topic_model_topics WHERE topic_id = ?",
+        (topic_id,),
+    )
+    if not topic:
+        return {"topic_id": topic_id, "label": None, "top_terms": [], "by_year": []}
+    rows = run_sql(
+        """
+        SELECT year, paper_weight, share
+        FROM topic_year_shares
+        WHERE high_conf = ? AND topic_id = ?
+        ORDER BY year
+        """,
+        (int(high_conf_only), topic_id),
+    )
+    return {
+        "topic_id": topic_id,
+        "label": topic[0]["label"],
+        "top_terms": json.loads(topic[0]["top_terms"])[:8],
+        "by_year": [dict(r) for r in rows],
+    }
+
+
+def get_person_topic_profile(
+    person_id: int,
+    limit: int = 5,
+) -> List[Dict[str, Any]]:
+    """
+    Main topic-model topics of one AC's publications.
+    Returns: [{topic_id, label, paper_weight, share}, ...]
+    """
+    if not _has_table("person_topic_shares"):
+        return []
+    rows = run_sql(
+        """
+        SELECT s.topic_id AS topic_id, t.label AS label, s.paper_weight AS paper_weight, s.share AS share
+        FROM person_topic_shares s
+        JOIN topic_model_topics t ON t.topic_id = s.topic_id
+        WHERE s.person_id = ?
+        ORDER BY s.share DESC, s.topic_id
+        LIMIT ?
+        """,
+        (person_id, limit),
+    )
+    return [dict(r) for r in rows]
+
+
+def get_similar_acs(
+    person_id: int,
+    k: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    ACs whose publication profile (venues, title terms, co-authors) is most
+    similar to the given AC's, by cosine similarity.
+    Returns: [{person_id, name, similarity}, ...]
+    """
+    if not (_has_table("authorships") and _has_table("publications")):
+        return []
+    hits = similarity_index().similar(person_id, k)
+    if not hits:
+        return []
+    ids = [pid for pid, _ in hits]
+    placeholders = ", ".join("?" for _ in ids)
+    names = {
+        r["person_id"]: r["canonical_name"]
+        for r in run_sql(
+            f"SELECT person_id, canonical_name FROM persons WHERE person_id IN ({placeholders})",
+            tuple(ids),
+        )
+    }
+    return [
+        {"person_id": pid, "name": names.get(pid), "similarity": round(score, 4)}
+        for pid, score in hits
+    ]
+
+
+# ===================== Tenure and turnover (build_tenure.py) =====================
+
+def get_ac_turnover(high_conf_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    Year-over-year turnover of the AC pool: new ACs (first year), retained
+    (also AC the year before), returning (back after a break) and departed
+    (AC the year before, not this year).
+    Returns: [{year, ac_count, new_count, retained_count, returning_count,
+               departed_count, retention_rate}, ...]
+    """
+    if not _has_table("year_turnover"):
+        return []
+    rows = run_sql(
+        """
+        SELECT year, ac_count, new_count, retained_count, returning_count,
+               departed_count, retention_rate
+        FROM year_turnover
+        WHERE high_conf = ?
+        ORDER BY year
+        """,
+        (int(high_conf_only),),
+    )
+    return [dict(r) for r in rows]
+
+
+def get_longest_serving_acs(
+    limit: int = 20,
+    high_conf_only: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    ACs with the most years of service, then the longest consecutive streak.
+    Returns: [{person_id, name, n_years, first_year, last_year,
+               longest_streak, longest_streak_start, current_streak}, ...]
+    """
+    if not _has_table("person_tenure"):
+        return []
+    hc = "WHERE t.high_conf = 1" if high_conf_only else ""
+    rows = run_sql(
+        f"""
+        SELECT
+            t.person_id AS person_id,
+            p.canonical_name AS name,
+            t.n_years AS n_years,
+            t.first_year AS first_year,
+            t.last_year AS last_year,
+            t.longest_streak AS longest_streak,
+            t.longest_streak_start AS longest_streak_start,
+            t.current_streak AS current_streak
+        FROM person_tenure t
+        JOIN persons p ON p.person_id = t.person_id
+        {hc}
+        ORDER BY t.n_years DESC, t.longest_streak DESC, t.first_year, name
+        LIMIT ?
+        """,
+        (limit,),
+    )
+    return [dict(r) for r in rows]
+
+
+def get_cohort_retention(
+    cohort_year: Optional[int] = None,
+    max_years: int = 10,
+    high_conf_only: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Retention curves of AC cohorts (ACs grouped by their first AC year):
+    share of the cohort serving again 0, 1, 2, ... years later.
+    One cohort if cohort_year is given, else all of them.
+    Returns: [{cohort_year, cohort_size, retention: [share at year 0, 1, ...]}, ...]
+    """
+    if not _has_table("cohort_retention"):
+        return []
+    cohort_filter = "AND cohort_year = ?" if cohort_year is not None else ""
+    params = (int(high_conf_only), max_years) + ((cohort_year,) if cohort_year is not None else ())
+    rows = run_sql(
+        f"""
+        SELECT cohort_year, years_since, cohort_size, share
+        FROM cohort_retention
+        WHERE high_conf = ? AND years_since <= ? {cohort_filter}
+        ORDER BY cohort_year, years_since
+        """,
+        params,
+    )
+    cohorts: Dict[int, Dict[str, Any]] = {}
+    for r in rows:
+        c = cohorts.setdefault(
+            r["cohort_year"],
+            {"cohort_year": r["cohort_year"], "cohort_size": r["cohort_size"], "retention": []},
+        )
+        c["retention"].append(r["share"])
+    return list(cohorts.values())
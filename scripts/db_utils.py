@@ -1,4 +1,8 @@
+import os
+import queue
 import sqlite3
+import threading
+import time
 from pathlib import Path
 
 DB_PATH = Path("database/chi_ac.db")
@@ -21,3 +25,207 @@ def run_sql(sql: str, params=()):
         conn.close()
 
 
+def enable_wal(conn: sqlite3.Connection):
+    """
+    Switch the DB to write-ahead logging (persistent in the file), so readers
+    such as the API server never block on pipeline writers and vice versa.
+    synchronous=NORMAL drops the fsync per commit; WAL stays crash-consistent.
+    """
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+
+def person_tables(conn):
+    """Tables (not views) with a person_id column, other than persons and person_aliases."""
+    out = []
+    for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name").fetchall():
+        if name in ("persons", "person_aliases"):
+            continue
+        if "person_id" in {r[1] for r in conn.execute(f"PRAGMA table_info({name})")}:
+            out.append(name)
+    return out
+
+def db_version(db_path: Path):
+    """
+    Cheap change marker for a SQLite file: (inode, mtime, size) of the DB and
+    its -wal file. Commits in WAL mode touch the -wal file, checkpoints and
+    rebuilds (even an os.replace of the whole file) touch the DB itself.
+    """
+    return tuple(file_version(p) for p in (db_path, Path(f"{db_path}-wal")))
+
+def file_version(path: Path):
+    """(inode, mtime, size) of a file or directory, None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+
+class DbSnapshot:
+    """
+    In-memory object built from the DB by `loader(db_path)` and kept for the
+    API server. get() re-checks db_version() at most every check_interval
+    seconds; on a change the new object is built completely before the
+    reference is swapped, so concurrent readers see either the old or the
+    new snapshot, never a half-loaded one. `watch` adds files or directories
+    outside the DB that the loader reads to the change check.
+    """
+
+    def __init__(self, loader, db_path=None, check_interval: float = 1.0, name: str = "snapshot",
+                 watch=()):
+        self.loader = loader
+        self.db_path = Path(db_path or DB_PATH)
+        self.watch = [Path(p) for p in watch]
+        self.check_interval = check_interval
+        self.name = name
+        self._value = None
+        self._version = None
+        self._checked = 0.0
+        self._reload_lock = threading.Lock()
+
+    def get(self):
+        value = self._value
+        now = time.monotonic()
+        if value is not None and now - self._checked < self.check_interval:
+            return value
+        self._checked = now
+        version = self.version()
+        if value is not None and version == self._version:
+            return value
+        return self.reload(version)
+
+    def version(self):
+        return db_version(self.db_path) + tuple(file_version(p) for p in self.watch)
+
+    def reload(self, version=None):
+        with self._reload_lock:
+            if version is None:
+                version = self.version()
+            # Another thread may have finished the same reload while we waited
+            if self._value is None or version != self._version:
+                t0 = time.perf_counter()
+                value = self.loader(self.db_path)
+                self._value, self._version = value, version
+                print(f"[{self.name}] snapshot loaded in {time.perf_counter() - t0:.2f}s")
+            return self._value
+
+
+class BatchWriter:
+    """
+    Single writer thread for the pipeline. Fetch workers hand over statements
+    with execute()/executemany() from any thread; the writer applies them in
+    order on its own connection and commits once `max_rows` rows are pending
+    or `max_delay` seconds after the first uncommitted write.
+    """
+
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, db_path=None, max_rows: int = 500, max_delay: float = 2.0,
+                 telemetry=None):
+        self.db_path = db_path or DB_PATH
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.telemetry = telemetry
+        self.error = None
+        self.commits = 0
+        self._queue = queue.Queue(maxsize=10_000)
+        # Opened here so connection errors surface in the caller; only the writer thread uses it
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        enable_wal(self._conn)
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    # ----- producer side -----
+
+    def _put(self, item):
+        if self.error is not None:
+            raise RuntimeError("DB writer failed") from self.error
+        self._queue.put(item)
+
+    def execute(self, sql: str, params=()):
+        self._put((sql, [tuple(params)]))
+
+    def executemany(self, sql: str, rows):
+        rows = [tuple(r) for r in rows]
+        if rows:
+            self._put((sql, rows))
+
+    def flush(self):
+        """Block until everything queued so far is committed."""
+        done = threading.Event()
+        self._put((self._FLUSH, done))
+        done.wait()
+        if self.error is not None:
+            raise RuntimeError("DB writer failed") from self.error
+
+    def close(self):
+        self._queue.put((self._STOP, None))
+        self._thread.join()
+        if self.error is not None:
+            raise RuntimeError("DB writer failed") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----- writer thread -----
+
+    def _commit(self, conn):
+        t0 = time.perf_counter()
+        try:
+            conn.commit()
+        except sqlite3.Error as e:
+            self.error = e
+            conn.rollback()
+            return
+        self.commits += 1
+        if self.telemetry is not None:
+            self.telemetry.observe("db_commit_s", time.perf_counter() - t0)
+
+    def _run(self):
+        conn = self._conn
+        pending = 0
+        first_pending = None
+        try:
+            while True:
+                timeout = None
+                if first_pending is not None:
+                    timeout = max(0.0, first_pending + self.max_delay - time.monotonic())
+                try:
+                    sql, rows = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    sql, rows = None, None
+
+                if sql is self._STOP:
+                    break
+                if sql is self._FLUSH:
+                    if pending:
+                        self._commit(conn)
+                        pending, first_pending = 0, None
+                    rows.set()
+                    continue
+                if sql is not None and self.error is None:
+                    try:
+                        conn.executemany(sql, rows)
+                    except sqlite3.Error as e:
+                        self.error = e
+                        conn.rollback()
+                        pending, first_pending = 0, None
+                        continue
+                    pending += len(rows)
+                    if first_pending is None:
+                        first_pending = time.monotonic()
+
+                if pending and (pending >= self.max_rows
+                                or time.monotonic() - first_pending >= self.max_delay):
+                    self._commit(conn)
+                    pending, first_pending = 0, None
+            if pending:
+                self._commit(conn)
+        finally:
+            conn.close()
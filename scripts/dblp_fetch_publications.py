@@ -1,58 +1,132 @@
+import argparse
+import hashlib
+import json
 import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import requests
 import xml.etree.ElementTree as ET
 
+import http_client
+from db_utils import BatchWriter, enable_wal
+from telemetry import Telemetry
+
 DB_PATH = Path("database/chi_ac.db")
+XML_CACHE_DIR = Path("data/dblp_xml")
 
 BASE_SLEEP = 2       
 MAX_RETRIES = 5
 
+# Backoff from 5s doubling up to 60s
+FETCH_RETRY = http_client.RetryPolicy(max_retries=MAX_RETRIES, base=5, max_backoff=60)
+
 MIN_YEAR = 2005
 MAX_YEAR = 2025
 
 
 MAX_PERSONS_PER_RUN = 400
 
-def fetch_author_xml(pid: str) -> str | None:
-
-    url = f"https://dblp.org/pid/{pid}.xml"
-    backoff = 5
+# Replaced by a live Telemetry (JSONL log + progress bar) in main()
+TELEMETRY = Telemetry.disabled("dblp_fetch_publications")
+
+# Refresh mode: persons whose ledger entry is older than this are re-fetched
+STALE_DAYS = 30
+
+
+def ensure_fetch_log(conn):
+    """Per-person fetch ledger used for incremental refreshes."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dblp_fetch_log (
+            person_id     INTEGER PRIMARY KEY,
+            dblp_pid      TEXT NOT NULL,
+            last_fetched  TEXT NOT NULL,         -- UTC, datetime('now')
+            etag          TEXT,
+            last_modified TEXT,
+            xml_hash      TEXT,                  -- sha1 of the XML body
+            record_count  INTEGER,               -- records within MIN_YEAR..MAX_YEAR
+            FOREIGN KEY(person_id) REFERENCES persons(person_id)
+        );
+    """)
+    conn.commit()
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            resp = requests.get(url, timeout=20)
-        except requests.RequestException as e:
-            print(f"  Internet Erro({e}), Wait {backoff}s then retry")
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 60)
-            continue
 
-        if resp.status_code == 429:
-            print(f"  429 Too Many Requests, Wait {backoff}s then retry")
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 60)
-            continue
+def xml_cache_path(pid: str) -> Path:
+    return XML_CACHE_DIR / (pid.replace("/", "_") + ".xml")
 
-        if 500 <= resp.status_code < 600:
-            print(f"  Server {resp.status_code}, Wait {backoff}s then retry")
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 60)
-            continue
 
-        if not resp.ok:
-            print(f"  HTTP {resp.status_code}, skip")
-            return None
+def load_cached_xml(pid: str) -> str | None:
+    path = xml_cache_path(pid)
+    if not path.exists():
+        return None
+    return path.read_text(encoding="utf-8")
 
-        return resp.text
 
-    print("  Error multiple times, skip")
+def _get_with_retry(url: str, headers: dict | None = None):
+    """
+    GET through the shared HTTP session with FETCH_RETRY.
+    Returns the response (2xx or 304), or None after an HTTP error / repeated failures.
+    """
+    resp = http_client.get(url, headers=headers, policy=FETCH_RETRY, telemetry=TELEMETRY)
+    if resp is None:
+        return None
+    if resp.status_code == 304 or http_client.is_success(resp):
+        return resp
+    TELEMETRY.write(f"  HTTP {resp.status_code}, skip")
     return None
 
-def parse_and_store_person_pubs(conn, person_id: int, pid: str, xml_text: str):
-    cur = conn.cursor()
+
+def fetch_author_xml(pid: str) -> str | None:
+    resp = _get_with_retry(f"{http_client.DBLP_BASE_URL}/pid/{pid}.xml")
+    if resp is None:
+        return None
+    return resp.text
+
+
+def fetch_author_xml_conditional(pid: str, etag: str | None, last_modified: str | None):
+    """
+    Conditional GET against the fetch ledger.
+    Returns (xml_text, etag, last_modified); xml_text is None when DBLP answers
+    304 Not Modified, and the whole result is None on failure.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    resp = _get_with_retry(f"{http_client.DBLP_BASE_URL}/pid/{pid}.xml", headers=headers or None)
+    if resp is None:
+        return None
+    new_etag = resp.headers.get("ETag") or etag
+    new_modified = resp.headers.get("Last-Modified") or last_modified
+    if resp.status_code == 304:
+        return None, new_etag, new_modified
+    return resp.text, new_etag, new_modified
+
+
+def record_fetch(db, person_id: int, pid: str, etag, last_modified,
+                 xml_hash, record_count):
+    """
+    db: a BatchWriter. Queued after the person's records, so the ledger row is
+    never committed before them (they may land in an earlier commit).
+    """
+    db.execute("""
+        INSERT INTO dblp_fetch_log
+            (person_id, dblp_pid, last_fetched, etag, last_modified, xml_hash, record_count)
+        VALUES (?, ?, datetime('now'), ?, ?, ?, ?)
+        ON CONFLICT(person_id) DO UPDATE SET
+            dblp_pid      = excluded.dblp_pid,
+            last_fetched  = excluded.last_fetched,
+            etag          = excluded.etag,
+            last_modified = excluded.last_modified,
+            xml_hash      = COALESCE(excluded.xml_hash, dblp_fetch_log.xml_hash),
+            record_count  = COALESCE(excluded.record_count, dblp_fetch_log.record_count)
+    """, (person_id, pid, etag, last_modified, xml_hash, record_count))
+
+def parse_person_pubs(xml_text: str):
+    """In-range records of a person as (pub_key, title, year, venue, pub_type, doi, ee) tuples."""
     root = ET.fromstring(xml_text)
+    pubs = []
 
     # dblpperson / r / <inproceedings|article|...>
     for r in root.findall("./r"):
@@ -96,31 +170,204 @@ def parse_and_store_person_pubs(conn, person_id: int, pid: str, xml_text: str):
                 if "doi.org" in ee or ee.startswith("10."):
                     doi = ee
 
+        pubs.append((key, title, year, venue, pub_type, doi, ee))
+
+    return pubs
+
+def parse_and_store_person_pubs(db, person_id: int, pid: str, xml_text: str,
+                                replace: bool = False) -> int:
+    """
+    Queue all in-range records of a person on the BatchWriter `db`.
+    Publications are upserted, and only rows whose fields actually changed are rewritten.
+    replace: the profile changed (or belongs to a new pid), so the person's
+    authorships that are no longer in it are removed.
+    Returns the number of in-range records.
+    """
+    pubs = parse_person_pubs(xml_text)
+    if replace:
+        db.execute("""
+            DELETE FROM authorships
+            WHERE person_id = ? AND pub_key NOT IN (SELECT value FROM json_each(?))
+        """, (person_id, json.dumps([pub[0] for pub in pubs])))
+    db.executemany("""
+        INSERT INTO publications (pub_key, title, year, venue, pub_type, doi, ee)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(pub_key) DO UPDATE SET
+            title    = excluded.title,
+            year     = excluded.year,
+            venue    = excluded.venue,
+            pub_type = excluded.pub_type,
+            doi      = excluded.doi,
+            ee       = excluded.ee
+        WHERE publications.title    IS NOT excluded.title
+           OR publications.year     IS NOT excluded.year
+           OR publications.venue    IS NOT excluded.venue
+           OR publications.pub_type IS NOT excluded.pub_type
+           OR publications.doi      IS NOT excluded.doi
+           OR publications.ee       IS NOT excluded.ee
+    """, pubs)
+
+    # authorship
+    db.executemany("""
+        INSERT OR IGNORE INTO authorships (pub_key, person_id, author_pos)
+        VALUES (?, ?, ?)
+    """, [(pub[0], person_id, -1) for pub in pubs])
+
+    TELEMETRY.rows(len(pubs))
+    return len(pubs)
+
+
+def fetch_and_store(db, person_id: int, pid: str) -> bool:
+    """Unconditional fetch of one person (first-time fetch)."""
+    res = fetch_author_xml_conditional(pid, None, None)
+    if res is None or not res[0]:
+        return False
+
+    xml_text, etag, last_modified = res
+
+    n_records = parse_and_store_person_pubs(db, person_id, pid, xml_text)
+    XML_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    xml_cache_path(pid).write_text(xml_text, encoding="utf-8")
+    xml_hash = hashlib.sha1(xml_text.encode("utf-8")).hexdigest()
+    record_fetch(db, person_id, pid, etag, last_modified, xml_hash, n_records)
+    return True
+
+
+def refresh_person(db, person_id: int, pid: str, ledger, pid_changed: bool = False) -> str:
+    """
+    Re-fetch one person using the ledger.
+    pid_changed: the ledger belongs to another pid, so the request is
+    unconditional. A changed profile replaces the person's authorships.
+    Returns 'not_modified', 'unchanged', 'updated' or 'failed'.
+    """
+    if pid_changed:
+        ledger = None
+    etag, last_modified, old_hash = ledger if ledger else (None, None, None)
+    res = fetch_author_xml_conditional(pid, etag, last_modified)
+    if res is None:
+        return "failed"
+
+    xml_text, etag, last_modified = res
+    if xml_text is None:
+        record_fetch(db, person_id, pid, etag, last_modified, None, None)
+        return "not_modified"
+
+    xml_hash = hashlib.sha1(xml_text.encode("utf-8")).hexdigest()
+    if xml_hash == old_hash:
+        record_fetch(db, person_id, pid, etag, last_modified, xml_hash, None)
+        return "unchanged"
+
+    n_records = parse_and_store_person_pubs(db, person_id, pid, xml_text, replace=True)
+    XML_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    xml_cache_path(pid).write_text(xml_text, encoding="utf-8")
+    record_fetch(db, person_id, pid, etag, last_modified, xml_hash, n_records)
+    return "updated"
+
+
+def run_persons(persons_to_run, work, workers: int = 1):
+    """
+    Run work(idx, row) for every person, on `workers` threads. Each worker
+    keeps its own BASE_SLEEP pacing; all DB writes go through the BatchWriter.
+    """
+    def one(item):
+        idx, row = item
+        try:
+            return work(idx, row)
+        finally:
+            TELEMETRY.step()
+            time.sleep(BASE_SLEEP)
+
+    items = list(enumerate(persons_to_run, start=1))
+    if workers <= 1:
+        return [one(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(one, items))
+
+
+def refresh(conn, stale_days: int = STALE_DAYS, workers: int = 1):
+    """
+    Refresh mode: re-fetch matched persons whose ledger entry is older than
+    `stale_days` (or whose pid changed since the last fetch), using conditional
+    requests so unchanged profiles cost a 304 and no DB writes.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT p.person_id, p.canonical_name, p.dblp_pid,
+               l.dblp_pid, l.etag, l.last_modified, l.xml_hash
+        FROM persons p
+        LEFT JOIN dblp_fetch_log l
+          ON l.person_id = p.person_id
+        WHERE p.match_status IN ('matched_exact', 'matched_fuzzy', 'matched_evidence')
+          AND p.dblp_pid IS NOT NULL
+          AND (l.person_id IS NULL
+               OR l.dblp_pid != p.dblp_pid
+               OR l.last_fetched < datetime('now', ?))
+        ORDER BY l.last_fetched IS NOT NULL, l.last_fetched, p.person_id
+    """, (f"-{stale_days} days",))
+    stale = cur.fetchall()
+    print(f" {len(stale)} AC stale (older than {stale_days} days)")
+
+    persons_to_run = stale[:MAX_PERSONS_PER_RUN]
+    start_telemetry("dblp_refresh", len(persons_to_run))
+
+    with BatchWriter(DB_PATH, telemetry=TELEMETRY) as writer:
+        def work(idx, row):
+            person_id, name, pid, old_pid, etag, last_modified, old_hash = row
+            TELEMETRY.write(f"[{idx}/{len(persons_to_run)}] {name} ({pid}) ...")
+            ledger = (etag, last_modified, old_hash) if old_hash or etag else None
+            pid_changed = old_pid is not None and old_pid != pid
+            try:
+                status = refresh_person(writer, person_id, pid, ledger, pid_changed)
+            except Exception as e:
+                TELEMETRY.write(f"  Written Error: {e}")
+                status = "failed"
+            TELEMETRY.incr(f"refresh_{status}")
+            if status != "failed":
+                TELEMETRY.write(f"  {status}")
+            return status
+
+        statuses = run_persons(persons_to_run, work, workers)
+    TELEMETRY.close()
+
+    counts = {}
+    for status in statuses:
+        counts[status] = counts.get(status, 0) + 1
+    print("Refresh summary:", ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+
+def start_telemetry(stage: str, total: int):
+    global TELEMETRY
+    TELEMETRY = Telemetry(stage, total=total)
 
-        cur.execute("""
-            INSERT OR IGNORE INTO publications (pub_key, title, year, venue, pub_type, doi, ee)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (key, title, year, venue, pub_type, doi, ee))
-
-        # authorship
-        cur.execute("""
-            INSERT OR IGNORE INTO authorships (pub_key, person_id, author_pos)
-            VALUES (?, ?, ?)
-        """, (key, person_id, -1))
-
-    conn.commit()
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch DBLP publications for matched ACs.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-fetch stale persons with conditional requests")
+    parser.add_argument("--stale-days", type=int, default=STALE_DAYS)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="concurrent fetch workers, each paced by BASE_SLEEP")
+    args = parser.parse_args()
+
     conn = sqlite3.connect(DB_PATH)
+    enable_wal(conn)
+    ensure_fetch_log(conn)
     cur = conn.cursor()
 
+    if args.refresh:
+        refresh(conn, args.stale_days, args.workers)
+        conn.close()
+        print("Finished")
+        return
+
     cur.execute("""
         SELECT p.person_id, p.canonical_name, p.dblp_pid, 
                COUNT(a.pub_key) AS n_pubs
         FROM persons p
         LEFT JOIN authorships a
           ON p.person_id = a.person_id
-        WHERE p.match_status IN ('matched_exact', 'matched_fuzzy')
+        WHERE p.match_status IN ('matched_exact', 'matched_fuzzy', 'matched_evidence')
+          AND p.person_id NOT IN (SELECT person_id FROM dblp_fetch_log)
         GROUP BY p.person_id
         HAVING n_pubs = 0
         ORDER BY p.person_id
@@ -135,25 +382,21 @@ def main():
         print("no need re-run")
         return
 
-    persons_to_run = persons_missing[:MAX_PERSONS_PER_RUN]
+    persons_to_run = [r for r in persons_missing if r[2]][:MAX_PERSONS_PER_RUN]
     print(f" Got{len(persons_to_run)} AC with 2005–{MAX_YEAR}")
 
-    for idx, (person_id, name, pid, n_pubs) in enumerate(persons_to_run, start=1):
-        if not pid:
-            continue
-
-        print(f"[{idx}/{len(persons_to_run)}] {name} ({pid}) ...")
-        xml_text = fetch_author_xml(pid)
-        if not xml_text:
-            continue
-
-        try:
-            parse_and_store_person_pubs(conn, person_id, pid, xml_text)
-        except Exception as e:
-            print(f"  Written Error: {e}")
-
-        time.sleep(BASE_SLEEP)
-
+    start_telemetry("dblp_fetch_publications", len(persons_to_run))
+    with BatchWriter(DB_PATH, telemetry=TELEMETRY) as writer:
+        def work(idx, row):
+            person_id, name, pid, n_pubs = row
+            TELEMETRY.write(f"[{idx}/{len(persons_to_run)}] {name} ({pid}) ...")
+            try:
+                fetch_and_store(writer, person_id, pid)
+            except Exception as e:
+                TELEMETRY.write(f"  Written Error: {e}")
+
+        run_persons(persons_to_run, work, args.workers)
+    TELEMETRY.close()
     conn.close()
     print("Finished")
 
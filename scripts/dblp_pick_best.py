@@ -1,8 +1,16 @@
+import argparse
+import hashlib
+import json
 import sqlite3
+import time
 import unicodedata
 import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from dblp_fetch_publications import BASE_SLEEP, fetch_author_xml, load_cached_xml, xml_cache_path
+
 DB_PATH = Path("database/chi_ac.db")
 
 def name_tokens(s: str):
@@ -30,8 +38,10 @@ def name_similarity(canon: str, author: str) -> float:
     - same last name: +0.2
     - exactly same token list → 1.0
     """
-    t1 = name_tokens(canon)
-    t2 = name_tokens(author)
+    return token_similarity(name_tokens(canon), name_tokens(author))
+
+def token_similarity(t1, t2) -> float:
+    """name_similarity on already-tokenized names."""
     if not t1 or not t2:
         return 0.0
 
@@ -50,7 +60,323 @@ def name_similarity(canon: str, author: str) -> float:
 
     return sim
 
+# Above this many candidates, scoring is spread over a process pool
+PARALLEL_MIN_CANDIDATES = 50_000
+CHUNK_SIZE = 2_000
+
+def decide(canon_toks, cands):
+    """
+    Pick the best candidate for one person.
+    cands: [(candidate_id, dblp_pid, dblp_url, author_tokens), ...] in candidate_id order.
+    Returns (status, candidate_id, dblp_pid, dblp_url); the last three are None
+    when nothing is chosen.
+    """
+    if not cands:
+        return "no_candidate", None, None, None
+
+    # First look for candidates whose normalized name key exactly matches
+    exact_key_cands = []
+    sims = []
+
+    for cand_id, pid, url, author_toks in cands:
+        sim = token_similarity(canon_toks, author_toks)
+        sims.append((sim, cand_id, pid, url))
+        if author_toks == canon_toks:
+            exact_key_cands.append((sim, cand_id, pid, url))
+
+    if exact_key_cands:
+        # At least one candidate has exactly the same key → pick the one with highest similarity
+        exact_key_cands.sort(reverse=True, key=lambda x: x[0])
+        _, best_cid, best_pid, best_url = exact_key_cands[0]
+        return "matched_exact", best_cid, best_pid, best_url
+
+    # Otherwise fall back to the old best_sim / second_sim heuristic
+    sims.sort(reverse=True, key=lambda x: x[0])
+    best_sim, best_cid, best_pid, best_url = sims[0]
+    second_sim = sims[1][0] if len(sims) > 1 else 0.0
+
+    status = None
+    if len(sims) == 1:
+        if best_sim >= 0.80:
+            status = "matched_fuzzy"
+        elif best_sim >= 0.70:
+            status = "matched_loose"
+    else:
+        diff = best_sim - second_sim
+        if best_sim >= 0.90 and diff >= 0.05:
+            status = "matched_exact"
+        elif best_sim >= 0.80 and diff >= 0.10:
+            status = "matched_fuzzy"
+
+    if status is None:
+        return "ambiguous", None, None, None
+    return status, best_cid, best_pid, best_url
+
+def _decide_chunk(chunk):
+    return [(person_id, decide(canon_toks, cands)) for person_id, canon_toks, cands in chunk]
+
+def load_work(cur):
+    """
+    Load persons and all candidates in two queries, tokenizing every distinct
+    name exactly once.
+    Returns [(person_id, canon_tokens, cands), ...] and the candidate count.
+    """
+    token_cache = {}
+
+    def toks(name):
+        t = token_cache.get(name)
+        if t is None:
+            t = token_cache[name] = tuple(name_tokens(name))
+        return t
+
+    cands_by_person = {}
+    n_cands = 0
+    cur.execute("""
+        SELECT person_id, candidate_id, dblp_pid, dblp_url, author_name
+        FROM person_dblp_candidates
+        ORDER BY person_id, candidate_id
+    """)
+    for person_id, cand_id, pid, url, author in cur:
+        cands_by_person.setdefault(person_id, []).append((cand_id, pid, url, toks(author)))
+        n_cands += 1
+
+    cur.execute("SELECT person_id, canonical_name FROM persons ORDER BY person_id")
+    work = [
+        (person_id, toks(canon), cands_by_person.get(person_id, []))
+        for person_id, canon in cur.fetchall()
+    ]
+    return work, n_cands
+
+def match_all(work, n_cands, workers=None):
+    """Score every person; uses a process pool for large inputs. Order is preserved."""
+    if n_cands < PARALLEL_MIN_CANDIDATES:
+        return _decide_chunk(work)
+
+    chunks = [work[i:i + CHUNK_SIZE] for i in range(0, len(work), CHUNK_SIZE)]
+    out = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_decide_chunk, chunks):
+            out.extend(part)
+    return out
+
+# ---------------- Second stage: evidence for ambiguous persons ----------------
+
+# CHI papers within [first AC year - window, last AC year + window] count as evidence
+EVIDENCE_WINDOW = 3
+MIN_EVIDENCE = 0.5
+MIN_EVIDENCE_MARGIN = 0.2
+# Uncached candidate XMLs downloaded per run; the rest wait for the next run
+MAX_FETCH_PER_RUN = 200
+
+WEIGHT_VENUE = 0.4
+WEIGHT_COAUTHOR = 0.35
+WEIGHT_AFFILIATION = 0.25
+
+AFFILIATION_STOPWORDS = {
+    "university", "of", "the", "and", "at", "for", "de", "institute", "college",
+    "department", "school", "inc", "lab", "labs", "laboratory", "research", "center", "centre",
+}
+
+def affiliation_tokens(s: str) -> set:
+    return {t for t in name_tokens(s or "") if t not in AFFILIATION_STOPWORDS}
+
+def parse_profile(pid: str, xml_text: str) -> dict:
+    """
+    Compact publication profile from a dblp person XML:
+    CHI paper years, co-author pids and affiliation notes.
+    """
+    root = ET.fromstring(xml_text)
+    affiliations = [
+        n.text.strip()
+        for n in root.findall("./person/note")
+        if n.get("type") == "affiliation" and n.text
+    ]
+    chi_years = []
+    coauthors = set()
+    for r in root.findall("./r"):
+        for pub in r:
+            key = pub.get("key") or ""
+            year_el = pub.find("year")
+            if key.startswith("conf/chi/") and year_el is not None and year_el.text:
+                try:
+                    chi_years.append(int(year_el.text.strip()))
+                except ValueError:
+                    pass
+            for a in pub.findall("author"):
+                a_pid = a.get("pid")
+                if a_pid and a_pid != pid:
+                    coauthors.add(a_pid)
+            break
+    return {
+        "chi_years": sorted(chi_years),
+        "coauthors": sorted(coauthors),
+        "affiliations": affiliations,
+    }
+
+def load_profiles(conn, pids, fetch: bool = True) -> dict:
+    """
+    Profiles for many pids at once. Parsed profiles are cached in dblp_profiles
+    keyed by the XML hash, so re-runs only parse XML that changed; uncached
+    XML is downloaded (up to MAX_FETCH_PER_RUN) into the shared XML cache.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dblp_profiles (
+            dblp_pid     TEXT PRIMARY KEY,
+            xml_hash     TEXT NOT NULL,
+            profile_json TEXT NOT NULL
+        );
+    """)
+    cached = {
+        pid: (h, js)
+        for pid, h, js in conn.execute("SELECT dblp_pid, xml_hash, profile_json FROM dblp_profiles")
+    }
+
+    profiles = {}
+    to_store = []
+    fetched = 0
+    for pid in pids:
+        xml_text = load_cached_xml(pid)
+        if xml_text is None:
+            if not fetch or fetched >= MAX_FETCH_PER_RUN:
+                continue
+            print(f"  fetching {pid} ...")
+            xml_text = fetch_author_xml(pid)
+            fetched += 1
+            time.sleep(BASE_SLEEP)
+            if not xml_text:
+                continue
+            path = xml_cache_path(pid)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(xml_text, encoding="utf-8")
+
+        h = hashlib.sha1(xml_text.encode("utf-8")).hexdigest()
+        if pid in cached and cached[pid][0] == h:
+            profiles[pid] = json.loads(cached[pid][1])
+            continue
+        try:
+            prof = parse_profile(pid, xml_text)
+        except ET.ParseError as e:
+            print(f"  bad XML for {pid}: {e}")
+            continue
+        profiles[pid] = prof
+        to_store.append((pid, h, json.dumps(prof)))
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO dblp_profiles (dblp_pid, xml_hash, profile_json)
+            VALUES (?, ?, ?)
+            ON CONFLICT(dblp_pid) DO UPDATE SET
+                xml_hash = excluded.xml_hash,
+                profile_json = excluded.profile_json
+        """, to_store)
+    return profiles
+
+def evidence_score(profile: dict, ac_years, aff_tokens: set, matched_pids: set) -> float:
+    """
+    Weighted evidence in [0, 1]:
+    - CHI papers around the person's AC years (3+ papers → full score)
+    - co-authors that are already-matched ACs (3+ → full score)
+    - best token overlap between AC affiliations and dblp affiliation notes
+    """
+    lo, hi = min(ac_years) - EVIDENCE_WINDOW, max(ac_years) + EVIDENCE_WINDOW
+    n_chi = sum(1 for y in profile["chi_years"] if lo <= y <= hi)
+    venue = min(1.0, n_chi / 3)
+
+    n_shared = sum(1 for p in profile["coauthors"] if p in matched_pids)
+    coauthor = min(1.0, n_shared / 3)
+
+    affiliation = 0.0
+    if aff_tokens:
+        for note in profile["affiliations"]:
+            toks = affiliation_tokens(note)
+            if toks:
+                affiliation = max(affiliation, len(aff_tokens & toks) / min(len(aff_tokens), len(toks)))
+
+    return WEIGHT_VENUE * venue + WEIGHT_COAUTHOR * coauthor + WEIGHT_AFFILIATION * affiliation
+
+def resolve_ambiguous(conn, fetch: bool = True):
+    """
+    Second stage: re-decide 'ambiguous' persons on publication evidence
+    instead of name similarity. Winners become 'matched_evidence'.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT c.person_id, c.candidate_id, c.dblp_pid, c.dblp_url
+        FROM person_dblp_candidates c
+        JOIN persons p ON p.person_id = c.person_id
+        WHERE p.match_status = 'ambiguous'
+        ORDER BY c.person_id, c.candidate_id
+    """)
+    cands_by_person = {}
+    for person_id, cand_id, pid, url in cur.fetchall():
+        cands_by_person.setdefault(person_id, []).append((cand_id, pid, url))
+    if not cands_by_person:
+        print("No ambiguous persons.")
+        return
+
+    years_by_person = {}
+    affs_by_person = {}
+    cur.execute("""
+        SELECT ar.person_id, ar.year, ar.affiliation_raw
+        FROM ac_roles ar
+        JOIN persons p ON p.person_id = ar.person_id
+        WHERE p.match_status = 'ambiguous'
+    """)
+    for person_id, year, aff in cur.fetchall():
+        years_by_person.setdefault(person_id, []).append(year)
+        affs_by_person.setdefault(person_id, set()).update(affiliation_tokens(aff))
+
+    cur.execute("""
+        SELECT dblp_pid FROM persons
+        WHERE match_status IN ('matched_exact', 'matched_fuzzy') AND dblp_pid IS NOT NULL
+    """)
+    matched_pids = {r[0] for r in cur.fetchall()}
+
+    all_pids = sorted({pid for cands in cands_by_person.values() for _, pid, _ in cands})
+    print(f"{len(cands_by_person)} ambiguous persons, {len(all_pids)} candidate pids")
+    profiles = load_profiles(conn, all_pids, fetch=fetch)
+
+    matched_rows = []
+    chosen_rows = []
+    for person_id, cands in cands_by_person.items():
+        ac_years = years_by_person.get(person_id)
+        if not ac_years:
+            continue
+        # A candidate without a profile is unknown, not negative evidence: skip the person
+        if any(pid not in profiles for _, pid, _ in cands):
+            continue
+        scored = sorted(
+            ((evidence_score(profiles[pid], ac_years, affs_by_person.get(person_id, set()), matched_pids),
+              cand_id, pid, url) for cand_id, pid, url in cands),
+            key=lambda x: -x[0],
+        )
+        best = scored[0]
+        second = scored[1][0] if len(scored) > 1 else 0.0
+        if best[0] >= MIN_EVIDENCE and best[0] - second >= MIN_EVIDENCE_MARGIN:
+            matched_rows.append((best[2], best[3], "matched_evidence", person_id))
+            chosen_rows.append((best[1],))
+
+    with conn:
+        cur.executemany("""
+            UPDATE persons
+            SET dblp_pid = ?, dblp_url = ?, match_status = ?
+            WHERE person_id = ?
+        """, matched_rows)
+        cur.executemany("""
+            UPDATE person_dblp_candidates
+            SET chosen = 1
+            WHERE candidate_id = ?
+        """, chosen_rows)
+    print(f"Resolved {len(matched_rows)}/{len(cands_by_person)} ambiguous persons on evidence")
+
 def main():
+    parser = argparse.ArgumentParser(description="Pick the best DBLP candidate for every person.")
+    parser.add_argument("--evidence", action="store_true",
+                        help="second stage: resolve ambiguous persons on CHI/co-author/affiliation evidence")
+    parser.add_argument("--no-fetch", action="store_true",
+                        help="evidence stage uses cached XML only")
+    args = parser.parse_args()
+
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
 
@@ -64,105 +390,69 @@ def main():
         cur.execute("ALTER TABLE persons ADD COLUMN match_status TEXT NOT NULL DEFAULT 'unknown';")
     conn.commit()
 
-    cur.execute("UPDATE person_dblp_candidates SET chosen = 0;")
+    t0 = time.perf_counter()
+    work, n_cands = load_work(cur)
+    print(f"Total {len(work)} persons, {n_cands} candidates, start matching DBLP pid...")
+
+    decisions = match_all(work, n_cands)
+
+    # Evidence-stage matches are kept while the names alone are still
+    # ambiguous and the chosen candidate is still there
     cur.execute("""
-        UPDATE persons
-        SET dblp_pid = NULL,
-            dblp_url = NULL,
-            match_status = 'unknown';
+        SELECT p.person_id, MIN(c.candidate_id), p.dblp_pid, p.dblp_url
+        FROM persons p
+        JOIN person_dblp_candidates c ON c.person_id = p.person_id AND c.dblp_pid = p.dblp_pid
+        WHERE p.match_status = 'matched_evidence'
+        GROUP BY p.person_id
     """)
-    conn.commit()
+    evidence = {person_id: (cand_id, pid, url) for person_id, cand_id, pid, url in cur.fetchall()}
 
-    cur.execute("SELECT person_id, canonical_name FROM persons")
-    persons = cur.fetchall()
-    print(f"Total {len(persons)} persons, start matching DBLP pid...")
+    matched_rows = []
+    status_rows = []
+    chosen_rows = []
+    for person_id, (status, cand_id, pid, url) in decisions:
+        if status == "ambiguous" and person_id in evidence:
+            status = "matched_evidence"
+            cand_id, pid, url = evidence[person_id]
+        if cand_id is not None:
+            matched_rows.append((pid, url, status, person_id))
+            chosen_rows.append((cand_id,))
+        else:
+            status_rows.append((status, person_id))
 
-    for idx, (person_id, canon) in enumerate(persons, start=1):
+    # Single transaction: reset, then write all decisions
+    with conn:
+        cur.execute("UPDATE person_dblp_candidates SET chosen = 0;")
         cur.execute("""
-            SELECT candidate_id, dblp_pid, dblp_url, author_name
-            FROM person_dblp_candidates
+            UPDATE persons
+            SET dblp_pid = NULL,
+                dblp_url = NULL,
+                match_status = 'unknown';
+        """)
+        cur.executemany("""
+            UPDATE persons
+            SET dblp_pid = ?, dblp_url = ?, match_status = ?
             WHERE person_id = ?
-        """, (person_id,))
-        cands = cur.fetchall()
-
-        if not cands:
-            cur.execute("""
-                UPDATE persons
-                SET match_status = 'no_candidate'
-                WHERE person_id = ?
-            """, (person_id,))
-            continue
-
-        canon_k = name_key(canon)
-
-        # First look for candidates whose normalized name key exactly matches
-        exact_key_cands = []
-        sims = []
-
-        for cand_id, pid, url, author in cands:
-            ak = name_key(author)
-            sim = name_similarity(canon, author)
-            sims.append((sim, cand_id, pid, url, author, ak))
-            if ak == canon_k:
-                exact_key_cands.append((sim, cand_id, pid, url, author, ak))
+        """, matched_rows)
+        cur.executemany("""
+            UPDATE persons
+            SET match_status = ?
+            WHERE person_id = ?
+        """, status_rows)
+        cur.executemany("""
+            UPDATE person_dblp_candidates
+            SET chosen = 1
+            WHERE candidate_id = ?
+        """, chosen_rows)
 
-        if exact_key_cands:
-            # At least one candidate has exactly the same key → pick the one with highest similarity
-            exact_key_cands.sort(reverse=True, key=lambda x: x[0])
-            best_sim, best_cid, best_pid, best_url, best_name, _ = exact_key_cands[0]
-            status = "matched_exact"
-            choose = True
-        else:
-            # Otherwise fall back to the old best_sim / second_sim heuristic
-            sims.sort(reverse=True, key=lambda x: x[0])
-            best_sim, best_cid, best_pid, best_url, best_name, _ = sims[0]
-            second_sim = sims[1][0] if len(sims) > 1 else 0.0
-            cand_count = len(sims)
-
-            status = "ambiguous"
-            choose = False
-
-            if cand_count == 1:
-                if best_sim >= 0.80:
-                    status = "matched_fuzzy"
-                    choose = True
-                elif best_sim >= 0.70:
-                    status = "matched_loose"
-                    choose = True
-            else:
-                diff = best_sim - second_sim
-                if best_sim >= 0.90 and diff >= 0.05:
-                    status = "matched_exact"
-                    choose = True
-                elif best_sim >= 0.80 and diff >= 0.10:
-                    status = "matched_fuzzy"
-                    choose = True
-
-        if choose:
-            cur.execute("""
-                UPDATE persons
-                SET dblp_pid = ?, dblp_url = ?, match_status = ?
-                WHERE person_id = ?
-            """, (best_pid, best_url, status, person_id))
-            cur.execute("""
-                UPDATE person_dblp_candidates
-                SET chosen = 1
-                WHERE candidate_id = ?
-            """, (best_cid,))
-        else:
-            cur.execute("""
-                UPDATE persons
-                SET match_status = ?
-                WHERE person_id = ?
-            """, (status, person_id))
+    print(f"Matched {len(matched_rows)}/{len(work)} persons in {time.perf_counter() - t0:.2f}s "
+          f"({sum(r[2] == 'matched_evidence' for r in matched_rows)} kept from the evidence stage)")
+    print("v2-key matching finished.")
 
-        if idx % 100 == 0:
-            conn.commit()
-            print(f"Processed {idx}/{len(persons)}")
+    if args.evidence:
+        resolve_ambiguous(conn, fetch=not args.no_fetch)
 
-    conn.commit()
     conn.close()
-    print("v2-key matching finished.")
 
 if __name__ == "__main__":
     main()
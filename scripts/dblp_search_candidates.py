@@ -1,130 +1,165 @@
+import json
 import sqlite3
 from pathlib import Path
-import requests
 import time
 import unicodedata
 
+import http_client
+from db_utils import BatchWriter, enable_wal
+from telemetry import Telemetry
+
 DB_PATH = Path("database/chi_ac.db")
-DBLP_SEARCH_URL = "https://dblp.org/search/author/api"
+DBLP_SEARCH_URL = http_client.DBLP_BASE_URL + "/search/author/api"
+# URL of cached hits recorded before the search URL was kept
+DBLP_PID_URL = "https://dblp.org/pid/"
 
 MAX_SUCCESS_PER_RUN = 500
 
 # Base sleep time (seconds) between each request
 BASE_SLEEP = 8
 
+# 6 attempts, backoff from 10s doubling up to 40s
+SEARCH_RETRY = http_client.RetryPolicy(max_retries=6, base=10, max_backoff=40)
+
+# Replaced by a live Telemetry (JSONL log + progress bar) in main()
+TELEMETRY = Telemetry.disabled("dblp_search_candidates")
+
 def normalize_name(s: str) -> str:
     """Remove accents + lowercase; used for simple scoring."""
     s = unicodedata.normalize("NFKD", s)
     s = "".join(c for c in s if not unicodedata.combining(c))
     return s.lower().strip()
 
-def search_dblp(name: str, max_retries: int = 6):
+def query_key(name: str) -> str:
+    """Persons sharing this key share one DBLP search (dblp_search_results)."""
+    return " ".join(normalize_name(name).split())
+
+def search_dblp(name: str):
     """
-    DBLP search with retry + exponential backoff:
-    - 429 / 5xx / network errors → retry with backoff
+    DBLP author search through the shared HTTP session (http_client):
+    - 429 / 5xx / network errors → retried with backoff (SEARCH_RETRY)
     - Success → return list of hits
-    - After repeated failures → return []
+    - Other HTTP errors or repeated failures → return None (not cached, retried next run)
     """
-    params = {"q": name, "format": "json"}
-    backoff = 10  # initial backoff (seconds), doubling up to 40
-
-    for attempt in range(max_retries):
-        try:
-            resp = requests.get(DBLP_SEARCH_URL, params=params, timeout=20)
-        except requests.RequestException as e:
-            print(f"  Network error ({e}), retrying in {backoff}s...")
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 40)
-            continue
-
-        # Rate limit
-        if resp.status_code == 429:
-            print(f"  429 Too Many Requests, retrying in {backoff}s...")
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 40)
+    resp = http_client.get(DBLP_SEARCH_URL, params={"q": name, "format": "json"},
+                           policy=SEARCH_RETRY, telemetry=TELEMETRY)
+    if not http_client.is_success(resp):
+        if resp is not None:
+            TELEMETRY.write(f"  HTTP {resp.status_code}, skipping this person")
+        return None
+
+    data = resp.json()
+    hits = data.get("result", {}).get("hits", {}).get("hit", [])
+    if isinstance(hits, dict):
+        hits = [hits]
+    return hits
+
+def compact_hits(hits):
+    """API hits -> [[pid, author_name, url], ...] (one per pid), the form kept in dblp_search_results."""
+    out = []
+    seen = set()
+    for h in hits:
+        info = h.get("info", {})
+        author_name = info.get("author")
+        url = info.get("url")
+        if not author_name or not url:
             continue
-
-        # Server-side error
-        if 500 <= resp.status_code < 600:
-            print(f"  Server error {resp.status_code}, retrying in {backoff}s...")
-            time.sleep(backoff)
-            backoff = min(backoff * 2, 40)
-            continue
-
-        try:
-            resp.raise_for_status()
-        except requests.RequestException as e:
-            print(f"  Other HTTP error ({e}), skipping this person")
-            return []
-
-        data = resp.json()
-        hits = data.get("result", {}).get("hits", {}).get("hit", [])
-        if isinstance(hits, dict):
-            hits = [hits]
-        return hits
-
-    print("  Failed after repeated retries, skipping this person")
-    return []
+        # URL like: https://dblp.org/pid/12/1234 → pid = "12/1234"
+        pid = url.split("pid/")[-1]
+        if pid not in seen:
+            seen.add(pid)
+            out.append([pid, author_name, url])
+    return out
+
+def candidate_rows(person_id, key, hits):
+    rows = []
+    for pid, author_name, *url in hits:
+        score = 1.0 if query_key(author_name) == key else 0.0
+        # The URL DBLP returned; older cached hits only have the pid
+        rows.append((person_id, pid, url[0] if url else DBLP_PID_URL + pid, author_name, score))
+    return rows
 
 def main():
+    global TELEMETRY
     conn = sqlite3.connect(DB_PATH)
+    enable_wal(conn)
     cur = conn.cursor()
 
-    # Resume support: only process persons not yet in person_dblp_candidates
+    # Resume support: only persons with neither candidates nor a finished search
     cur.execute("""
         SELECT person_id, canonical_name
         FROM persons
-        WHERE person_id NOT IN (
+        WHERE dblp_query_key IS NULL
+          AND person_id NOT IN (
             SELECT DISTINCT person_id FROM person_dblp_candidates
         )
         ORDER BY person_id
     """)
     persons = cur.fetchall()
-    total = len(persons)
-    print(f"{total} names need DBLP search")
 
-    success = 0 
-
-    for idx, (person_id, name) in enumerate(persons, start=1):
-        if success >= MAX_SUCCESS_PER_RUN:
-            print(f"Reached {success} successful persons for this run, stopping for now.")
-            break
-
-        print(f"[{idx}/{total}] Searching {name} ...")
-
-        hits = search_dblp(name)
-        base = normalize_name(name)
-
-        inserted = 0
-        for h in hits:
-            info = h.get("info", {})
-            author_name = info.get("author")
-            url = info.get("url")
-            if not author_name or not url:
+    # Identical normalized names are searched once, under the first person's spelling
+    groups = {}
+    for person_id, name in persons:
+        groups.setdefault(query_key(name), []).append((person_id, name))
+    cached = {}
+    for key, hits_json in cur.execute("SELECT query_key, hits FROM dblp_search_results"):
+        if key in groups:
+            cached[key] = json.loads(hits_json)
+    total = len(groups)
+    print(f"{len(persons)} persons need DBLP candidates: {total} distinct names, "
+          f"{len(cached)} already searched")
+
+    success = 0
+    TELEMETRY = Telemetry("dblp_search_candidates", total=total)
+    # Candidates are committed in batches; a person only counts as searched once
+    # its dblp_query_key is committed, so an interrupted run re-searches at most one batch
+    writer = BatchWriter(DB_PATH, telemetry=TELEMETRY)
+
+    for idx, (key, members) in enumerate(groups.items(), start=1):
+        hits = cached.get(key)
+        if hits is None:
+            if success >= MAX_SUCCESS_PER_RUN:
+                TELEMETRY.write(f"Reached {success} successful searches for this run, stopping for now.")
+                break
+
+            TELEMETRY.write(f"[{idx}/{total}] Searching {members[0][1]} ...")
+            raw = search_dblp(members[0][1])
+            # Base pacing: always sleep a bit after each request
+            time.sleep(BASE_SLEEP)
+            if raw is None:
+                TELEMETRY.step()
                 continue
-
-            # URL like: https://dblp.org/pid/12/1234 → pid = "12/1234"
-            pid = url.split("pid/")[-1]
-
-            score = 1.0 if normalize_name(author_name) == base else 0.0
-
-            cur.execute("""
-                INSERT INTO person_dblp_candidates
-                    (person_id, dblp_pid, dblp_url, author_name, score)
-                VALUES (?, ?, ?, ?, ?)
-            """, (person_id, pid, url, author_name, score))
-            inserted += 1
-
-        conn.commit()
-
-        if inserted > 0:
-            success += 1
-
-        # Base pacing: always sleep a bit after each person
-        time.sleep(BASE_SLEEP)
-
+            hits = compact_hits(raw)
+            writer.execute("""
+                INSERT INTO dblp_search_results (query_key, hits) VALUES (?, ?)
+                ON CONFLICT(query_key) DO UPDATE SET
+                    hits = excluded.hits, searched_at = datetime('now')
+            """, (key, json.dumps(hits, ensure_ascii=False, separators=(",", ":"))))
+            if hits:
+                success += 1
+
+        rows = []
+        for person_id, _ in members:
+            rows.extend(candidate_rows(person_id, key, hits))
+        writer.executemany("""
+            INSERT INTO person_dblp_candidates
+                (person_id, dblp_pid, dblp_url, author_name, score)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(person_id, dblp_pid) DO UPDATE SET
+                dblp_url = excluded.dblp_url,
+                author_name = excluded.author_name,
+                score = excluded.score
+        """, rows)
+        writer.executemany(
+            "UPDATE persons SET dblp_query_key = ? WHERE person_id = ?",
+            [(key, person_id) for person_id, _ in members])
+        TELEMETRY.rows(len(rows))
+        TELEMETRY.step()
+
+    writer.close()
+    TELEMETRY.close()
     conn.close()
-    print(f"DBLP search finished, successfully processed {success} persons in this run")
+    print(f"DBLP search finished, {success} successful searches in this run")
 
 if __name__ == "__main__":
     main()
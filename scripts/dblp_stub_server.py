@@ -0,0 +1,185 @@
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+from dblp_search_candidates import query_key
+
+DB_PATH = Path("database/chi_ac.db")
+XML_CACHE_DIR = Path("data/dblp_xml")
+
+# Synthetic profiles: records per person, spread over these years
+SYNTHETIC_RECORDS = 20
+SYNTHETIC_YEARS = (2005, 2025)
+
+
+class StubData:
+    """
+    Responses of the stub DBLP: recorded fixtures first (dblp_search_results
+    rows of the DB and the XML cache of dblp_fetch_publications), else
+    deterministic synthetic data derived from the query / pid.
+    """
+
+    def __init__(self, db_path: Path | None = DB_PATH, xml_dir: Path | None = XML_CACHE_DIR):
+        self.search_hits = {}
+        self.xml_dir = xml_dir
+        if db_path is not None and Path(db_path).exists():
+            conn = sqlite3.connect(db_path)
+            try:
+                if conn.execute(
+                        "SELECT 1 FROM sqlite_master WHERE name = 'dblp_search_results'").fetchone():
+                    for key, hits in conn.execute("SELECT query_key, hits FROM dblp_search_results"):
+                        self.search_hits[key] = json.loads(hits)
+            finally:
+                conn.close()
+
+    @staticmethod
+    def synthetic_pid(name: str) -> str:
+        h = int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:8], 16)
+        return f"{h % 400}/{h % 100000}"
+
+    def search(self, query: str) -> list:
+        """[[pid, author_name(, url)], ...] for a query."""
+        key = query_key(query)
+        if key in self.search_hits:
+            return self.search_hits[key]
+        return [[self.synthetic_pid(query), query],
+                [self.synthetic_pid(query + " 0001"), query + " 0001"]]
+
+    def search_json(self, query: str) -> bytes:
+        hits = [{"info": {"author": name, "url": url[0] if url else f"https://dblp.org/pid/{pid}"}}
+                for pid, name, *url in self.search(query)]
+        body = {"result": {"hits": {"@total": str(len(hits)), "hit": hits}}}
+        return json.dumps(body).encode("utf-8")
+
+    def person_xml(self, pid: str) -> bytes:
+        if self.xml_dir is not None:
+            path = self.xml_dir / (pid.replace("/", "_") + ".xml")
+            if path.exists():
+                return path.read_bytes()
+        rng = random.Random(pid)
+        lo, hi = SYNTHETIC_YEARS
+        records = []
+        for i in range(SYNTHETIC_RECORDS):
+            year = rng.randint(lo, hi)
+            records.append(
+                f'<r><inproceedings key="conf/stub/{escape(pid)}/{i}">'
+                f"<title>Synthetic paper {i} of {escape(pid)}</title>"
+                f"<year>{year}</year><booktitle>CHI</booktitle>"
+                f"<ee>https://doi.org/10.0000/stub.{i}</ee>"
+                f"</inproceedings></r>")
+        return (f'<?xml version="1.0"?><dblpperson pid="{escape(pid)}">'
+                + "".join(records) + "</dblpperson>").encode("utf-8")
+
+
+class StubConfig:
+    """Injected behaviour: per-request latency and 429 / 5xx probabilities."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, p429: float = 0.0,
+                 p5xx: float = 0.0, retry_after: int | None = 1, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.p429 = p429
+        self.p5xx = p5xx
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def count(self, key: str):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+
+def make_handler(data: StubData, config: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like dblp.org
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes = b"", content_type: str = "text/plain",
+                  headers: dict | None = None):
+            if body and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+            config.count(f"status_{status}")
+
+        def do_GET(self):
+            config.count("requests")
+            if config.latency or config.jitter:
+                time.sleep(config.latency + config.jitter * config.roll())
+
+            r = config.roll()
+            if r < config.p429:
+                headers = {}
+                if config.retry_after is not None:
+                    headers["Retry-After"] = str(config.retry_after)
+                return self._send(429, b"Too Many Requests", headers=headers)
+            if r < config.p429 + config.p5xx:
+                return self._send(503, b"Service Unavailable")
+
+            url = urlparse(self.path)
+            if url.path == "/search/author/api":
+                query = parse_qs(url.query).get("q", [""])[0]
+                return self._send(200, data.search_json(query), "application/json")
+            if url.path.startswith("/pid/") and url.path.endswith(".xml"):
+                pid = url.path[len("/pid/"):-len(".xml")]
+                return self._send(200, data.person_xml(pid), "application/xml")
+            return self._send(404, b"Not Found")
+
+    return Handler
+
+
+def start_server(data: StubData, config: StubConfig, host: str = "127.0.0.1", port: int = 0):
+    """Serve in a daemon thread; returns (server, base_url). Stop with server.shutdown()."""
+    server = ThreadingHTTPServer((host, port), make_handler(data, config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="dblp-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the DBLP search and pid XML API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, seconds")
+    parser.add_argument("--p429", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--p5xx", type=float, default=0.0, help="share of requests answered 503")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    args = parser.parse_args()
+
+    data = StubData(None, None) if args.synthetic else StubData()
+    config = StubConfig(args.latency, args.jitter, args.p429, args.p5xx, args.retry_after)
+    server, url = start_server(data, config, port=args.port)
+    print(f"DBLP stub on {url} ({len(data.search_hits)} recorded searches); "
+          f"run the fetchers with CHIPULSE_DBLP_URL={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(config.counts)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import sqlite3
+from pathlib import Path
+
+from build_high_conf import refresh_role_flags
+from build_institutions import institution_key, seed_institution, split_affiliation
+from db_utils import person_tables
+from dblp_pick_best import name_key, name_tokens, token_similarity
+from name_blocking import build_index
+
+DB_PATH = Path("database/chi_ac.db")
+
+# Blocked pairs at least this similar are merged if they also share an affiliation
+FUZZY_MIN_SIM = 0.85
+
+# Survivor preference: a DBLP-matched person keeps its id (and its DBLP data)
+STATUS_RANK = {"matched_exact": 0, "matched_fuzzy": 1, "matched_evidence": 2, "matched_loose": 3}
+
+
+def affiliation_keys(raw):
+    """Institution keys of one raw affiliation (seed name where known)."""
+    keys = set()
+    for part in split_affiliation(raw or ""):
+        key = institution_key(part)
+        if key:
+            keys.add(seed_institution(key) or key)
+    return keys
+
+def same_person_name(t1, t2) -> bool:
+    """
+    Token lists that differ only by middle names / initials:
+    same first and last token, one side's middle a subset of the other's,
+    initials matching a full middle name ("scott e hudson" ~ "scott hudson").
+    """
+    if len(t1) < 2 or len(t2) < 2 or t1[0] != t2[0] or t1[-1] != t2[-1]:
+        return False
+    short, long_ = sorted((t1[1:-1], t2[1:-1]), key=len)
+    rest = list(long_)
+    for tok in short:
+        hit = next((t for t in rest if t == tok or (len(tok) == 1 and t[0] == tok)), None)
+        if hit is None:
+            return False
+        rest.remove(hit)
+    return True
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def groups(self):
+        out = {}
+        for x in self.parent:
+            out.setdefault(self.find(x), []).append(x)
+        return [sorted(g) for g in out.values() if len(g) > 1]
+
+
+def ensure_alias_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS person_aliases (
+            alias_person_id INTEGER PRIMARY KEY,
+            person_id       INTEGER NOT NULL,
+            alias_name      TEXT NOT NULL,
+            reason          TEXT NOT NULL,
+            FOREIGN KEY(person_id) REFERENCES persons(person_id)
+        );
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_person_aliases_person ON person_aliases(person_id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_person_aliases_name ON person_aliases(alias_name);")
+
+def find_clusters(conn):
+    """
+    [(person_ids, reason), ...] of persons that are the same researcher:
+    - 'name_key': identical dblp_pick_best.name_key (case, accents, punctuation)
+    - 'squashed': identical once spaces are removed ("Hao-Chuan" ~ "Haochuan")
+    - 'fuzzy':    blocked pair, same_person_name() and token similarity
+                  >= FUZZY_MIN_SIM, and at least one shared affiliation
+    Persons matched to two different DBLP pids are never merged.
+    """
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(persons)")}
+    pid_col = "dblp_pid" if "dblp_pid" in cols else "NULL"
+    persons = conn.execute(
+        f"SELECT person_id, canonical_name, {pid_col} FROM persons ORDER BY person_id").fetchall()
+    dblp_pid = {p: d for p, _, d in persons}
+
+    affs = {}
+    for person_id, raw in conn.execute(
+            "SELECT person_id, affiliation_raw FROM ac_roles WHERE person_id IS NOT NULL"):
+        affs.setdefault(person_id, set()).update(affiliation_keys(raw))
+
+    uf = UnionFind()
+    reason = {}
+    pids = {}  # root -> set of dblp pids in the cluster
+
+    def merge(a, b, why):
+        ra, rb = uf.find(a), uf.find(b)
+        if ra == rb:
+            return
+        pa = pids.get(ra, {dblp_pid[a]} - {None})
+        pb = pids.get(rb, {dblp_pid[b]} - {None})
+        if pa and pb and pa != pb:
+            return
+        uf.union(a, b)
+        pids[uf.find(a)] = pa | pb
+        reason[uf.find(a)] = max(reason.get(ra, why), reason.get(rb, why), why,
+                                 key=["name_key", "squashed", "fuzzy"].index)
+
+    first_by_key = {}
+    first_by_squashed = {}
+    for person_id, name, _ in persons:
+        key = name_key(name)
+        if not key:
+            continue
+        if key in first_by_key:
+            merge(first_by_key[key], person_id, "name_key")
+        else:
+            first_by_key[key] = person_id
+        squashed = key.replace(" ", "")
+        if squashed in first_by_squashed:
+            merge(first_by_squashed[squashed], person_id, "squashed")
+        else:
+            first_by_squashed[squashed] = person_id
+
+    index = build_index((pid, name) for pid, name, _ in persons)
+    for person_id, name, _ in persons:
+        toks = tuple(name_tokens(name))
+        for other in index.candidates(name):
+            if other <= person_id:
+                continue
+            other_toks = index.tokens[other]
+            if (same_person_name(toks, other_toks)
+                    and token_similarity(toks, other_toks) >= FUZZY_MIN_SIM
+                    and affs.get(person_id, set()) & affs.get(other, set())):
+                merge(person_id, other, "fuzzy")
+
+    return [(g, reason[uf.find(g[0])]) for g in uf.groups()]
+
+def pick_survivor(conn, ids):
+    """(survivor_id, display name) for one cluster."""
+    placeholders = ", ".join("?" for _ in ids)
+    stats = conn.execute(f"""
+        SELECT p.person_id, p.canonical_name, p.match_status,
+               (SELECT COUNT(*) FROM ac_roles ar WHERE ar.person_id = p.person_id)
+        FROM persons p
+        WHERE p.person_id IN ({placeholders})
+    """, ids).fetchall()
+    survivor = min(stats, key=lambda r: (STATUS_RANK.get(r[2], 9), -r[3], r[0]))[0]
+    # The spelling used most often; prefer proper case and intact characters
+    display = max(stats, key=lambda r: (r[3], "�" not in r[1],
+                                        r[1] != r[1].upper() and r[1] != r[1].lower(),
+                                        len(r[1].encode("utf-8")), -r[0]))[1]
+    return survivor, display
+
+def merge_persons(conn, survivor, merged, display, why):
+    """Move every row of `merged` persons onto `survivor` and record the aliases."""
+    cur = conn.cursor()
+    placeholders = ", ".join("?" for _ in merged)
+    for table in person_tables(conn):
+        # Rows the survivor already has (same key) are dropped, not duplicated
+        cur.execute(f"UPDATE OR IGNORE {table} SET person_id = ? WHERE person_id IN ({placeholders})",
+                    [survivor] + merged)
+        cur.execute(f"DELETE FROM {table} WHERE person_id IN ({placeholders})", merged)
+    cur.execute(f"""
+        INSERT OR REPLACE INTO person_aliases (alias_person_id, person_id, alias_name, reason)
+        SELECT person_id, ?, canonical_name, ? FROM persons WHERE person_id IN ({placeholders})
+    """, [survivor, why] + merged)
+    # Earlier aliases of a merged person follow it
+    cur.execute(f"UPDATE person_aliases SET person_id = ? WHERE person_id IN ({placeholders})",
+                [survivor] + merged)
+    # A survivor without a DBLP match takes the best-ranked one of the merged persons
+    if "dblp_pid" in {r[1] for r in cur.execute("PRAGMA table_info(persons)")}:
+        donors = cur.execute(f"""
+            SELECT person_id, dblp_pid, dblp_url, match_status FROM persons
+            WHERE person_id IN ({placeholders}) AND dblp_pid IS NOT NULL
+        """, merged).fetchall()
+        if donors:
+            _, pid, url, status = min(donors, key=lambda r: (STATUS_RANK.get(r[3], 9), r[0]))
+            cur.execute("""
+                UPDATE persons SET dblp_pid = ?, dblp_url = ?, match_status = ?
+                WHERE person_id = ? AND dblp_pid IS NULL
+            """, (pid, url, status, survivor))
+    cur.execute(f"DELETE FROM persons WHERE person_id IN ({placeholders})", merged)
+    # The survivor's own spelling keeps resolving to it once renamed (the
+    # oldest spelling wins if it was renamed by an earlier merge)
+    cur.execute("""
+        INSERT OR IGNORE INTO person_aliases (alias_person_id, person_id, alias_name, reason)
+        SELECT person_id, person_id, canonical_name, ? FROM persons
+        WHERE person_id = ? AND canonical_name != ?
+    """, (why, survivor, display))
+    cur.execute("UPDATE persons SET canonical_name = ? WHERE person_id = ?", (display, survivor))
+
+def dedup_persons(conn, dry_run: bool = False):
+    ensure_alias_table(conn)
+    clusters = find_clusters(conn)
+    n_merged = sum(len(ids) - 1 for ids, _ in clusters)
+    with conn:
+        for ids, why in clusters:
+            survivor, display = pick_survivor(conn, ids)
+            merged = [i for i in ids if i != survivor]
+            if dry_run:
+                names = [r[0] for r in conn.execute(
+                    f"SELECT canonical_name FROM persons WHERE person_id IN ({', '.join('?' for _ in ids)})",
+                    ids)]
+                print(f"  [{why}] {survivor} <- {merged}: {names}")
+                continue
+            merge_persons(conn, survivor, merged, display, why)
+        if not dry_run and n_merged and conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone():
+            refresh_role_flags(conn)
+    print(f"{len(clusters)} clusters, {n_merged} persons "
+          f"{'would be ' if dry_run else ''}merged into their survivors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge persons whose names are variants of each other.")
+    parser.add_argument("--dry-run", action="store_true", help="print the clusters without merging")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_PATH)
+    dedup_persons(conn, args.dry_run)
+    conn.close()
+    print("Finished, written into chi_ac.db")
+
+if __name__ == "__main__":
+    main()
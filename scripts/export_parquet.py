@@ -0,0 +1,81 @@
+import argparse
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DB_PATH = Path("database/chi_ac.db")
+PARQUET_DIR = Path("data/parquet")
+
+TABLES = [
+    "ac_roles", "persons", "persons_high_conf", "publications", "authorships",
+    "institutions", "institution_aliases", "role_institutions",
+    "countries", "geo_year_counts", "geo_total_counts",
+]
+
+# Joined fact table: one row per (high-confidence AC, publication)
+HC_PUB_FACT = "hc_ac_publications"
+HC_PUB_FACT_SQL = """
+    SELECT
+        a.person_id,
+        a.pub_key,
+        pub.year,
+        pub.venue,
+        pub.pub_type,
+        pub.title
+    FROM authorships a
+    JOIN persons_high_conf phc
+      ON phc.person_id = a.person_id
+    JOIN publications pub
+      ON pub.pub_key = a.pub_key
+"""
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Arrow table with every string column dictionary-encoded."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    cols = []
+    for name, col in zip(table.column_names, table.columns):
+        if pa.types.is_string(col.type) or pa.types.is_large_string(col.type):
+            col = col.dictionary_encode()
+        cols.append(col)
+    return pa.table(cols, names=table.column_names)
+
+def export_query(conn, sql: str, out_path: Path) -> int:
+    df = pd.read_sql_query(sql, conn)
+    pq.write_table(to_arrow(df), out_path, compression="zstd", use_dictionary=True)
+    return len(df)
+
+def read_table(name: str, parquet_dir: Path = PARQUET_DIR) -> pa.Table:
+    """Memory-mapped Arrow table for notebooks (no copy until columns are touched)."""
+    return pq.read_table(parquet_dir / f"{name}.parquet", memory_map=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export CHIPulse tables to compressed Parquet.")
+    parser.add_argument("--out", type=Path, default=PARQUET_DIR)
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    existing = {
+        r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
+    }
+
+    for table in TABLES:
+        if table not in existing:
+            print(f"[WARN] {table} not found, skipped")
+            continue
+        n = export_query(conn, f"SELECT * FROM {table}", args.out / f"{table}.parquet")
+        print(f"{table}: {n} rows")
+
+    if {"authorships", "persons_high_conf", "publications"} <= existing:
+        n = export_query(conn, HC_PUB_FACT_SQL, args.out / f"{HC_PUB_FACT}.parquet")
+        print(f"{HC_PUB_FACT}: {n} rows")
+
+    conn.close()
+    print("Finished, written into", args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import sqlite3
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Tuple
+
+from build_institutions import INSTITUTION_SEEDS, institution_key
+
+DB_PATH = Path("database/chi_ac.db")
+
+# Aliases this short ("us", "in", "it") are ordinary words in a question
+MIN_ALIAS_CHARS = 3
+SHORT_ALIAS_ALLOW = {"uk"}
+
+# Unseeded institutions need this many roles (or several alias spellings) to
+# become patterns; scraping artifacts such as first names ("Scott") have 1-2
+MIN_INSTITUTION_ROLES = 3
+
+# Same span, several kinds (an affiliation literally written "USA"): first wins
+KIND_PRIORITY = {"person": 0, "country": 1, "institution": 2}
+
+
+class Mention:
+    __slots__ = ("kind", "ids", "start", "end", "text")
+
+    def __init__(self, kind, ids, start, end, text):
+        self.kind = kind
+        self.ids = ids
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"Mention({self.kind}, {self.text!r}, {self.ids})"
+
+    def as_dict(self):
+        return {"kind": self.kind, "text": self.text, "ids": self.ids}
+
+
+class Gazetteer:
+    """
+    Aho–Corasick automaton over word tokens (institution_key() normalization),
+    so a pattern only matches whole words: "mit" is found in "MIT's lab",
+    not in "Smith". One pass over the query finds every person name,
+    institution alias and country alias it mentions.
+    Patterns are (kind, key) with kind 'person' / 'institution' / 'country'.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]      # state -> [(kind, n_tokens, ids)]
+        self._payload = {}   # (kind, key) -> ids
+        self._built = False
+
+    def add(self, kind: str, text: str, item_id):
+        key = institution_key(text)
+        if len(key) < MIN_ALIAS_CHARS and key not in SHORT_ALIAS_ALLOW:
+            return
+        ids = self._payload.get((kind, key))
+        if ids is not None:
+            if item_id not in ids:
+                ids.append(item_id)
+            return
+        ids = [item_id]
+        self._payload[(kind, key)] = ids
+        toks = key.split()
+        state = 0
+        for tok in toks:
+            nxt = self.goto[state].get(tok)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][tok] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((kind, len(toks), ids))
+        self._built = False
+
+    def build(self):
+        """Failure links (BFS); outputs of the fail state are merged in."""
+        queue = deque(self.goto[0].values())
+        for s in queue:
+            self.fail[s] = 0
+        while queue:
+            s = queue.popleft()
+            for tok, nxt in self.goto[s].items():
+                queue.append(nxt)
+                f = self.fail[s]
+                while f and tok not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(tok, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+        self._built = True
+        return self
+
+    def spot(self, text: str) -> List[Mention]:
+        """
+        Entity mentions in `text`, leftmost-longest and non-overlapping
+        ("Carnegie Mellon University" wins over "Carnegie Mellon"); on the
+        same span KIND_PRIORITY decides.
+        """
+        if not self._built:
+            self.build()
+        toks = institution_key(text).split()
+        found: List[Tuple[int, int, str, list]] = []
+        state = 0
+        for i, tok in enumerate(toks):
+            while state and tok not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(tok, 0)
+            for kind, n, ids in self.out[state]:
+                found.append((i + 1 - n, i + 1, kind, ids))
+
+        found.sort(key=lambda m: (m[0], -(m[1] - m[0]), KIND_PRIORITY[m[2]]))
+        mentions = []
+        end = 0
+        for start, stop, kind, ids in found:
+            if start < end:
+                continue
+            mentions.append(Mention(kind, list(ids), start, stop, " ".join(toks[start:stop])))
+            end = stop
+        return mentions
+
+    @classmethod
+    def from_db(cls, db_path: Path = DB_PATH):
+        """
+        Persons (high-confidence when available), institutions (seeded or
+        with enough support) and countries.
+        """
+        g = cls()
+        conn = sqlite3.connect(db_path)
+        try:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+            person_sql = "SELECT person_id, canonical_name FROM persons"
+            if "persons_high_conf" in tables:
+                person_sql += " WHERE person_id IN (SELECT person_id FROM persons_high_conf)"
+            for pid, name in conn.execute(person_sql + " ORDER BY person_id"):
+                g.add("person", name, pid)
+            if "institution_aliases" in tables:
+                seeds = ", ".join("?" for _ in INSTITUTION_SEEDS)
+                for alias, inst_id in conn.execute(f"""
+                    SELECT a.alias, a.institution_id
+                    FROM institution_aliases a
+                    JOIN institutions i ON i.institution_id = a.institution_id
+                    WHERE i.name IN ({seeds})
+                       OR a.institution_id IN (
+                           SELECT institution_id FROM role_institutions
+                           GROUP BY institution_id HAVING COUNT(*) >= ?)
+                       OR a.institution_id IN (
+                           SELECT institution_id FROM institution_aliases
+                           GROUP BY institution_id HAVING COUNT(*) >= 2)
+                    ORDER BY a.institution_id
+                """, [*INSTITUTION_SEEDS, MIN_INSTITUTION_ROLES]):
+                    g.add("institution", alias, inst_id)
+            if "country_aliases" in tables:
+                for key, code in conn.execute("SELECT alias_key, country_code FROM country_aliases"):
+                    g.add("country", key, code)
+        finally:
+            conn.close()
+        return g.build()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spot persons / institutions / countries in a question.")
+    parser.add_argument("query")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    g = Gazetteer.from_db(DB_PATH)
+    print(f"{len(g._payload)} patterns, {len(g.goto)} states, built in {time.perf_counter() - t0:.2f}s")
+
+    n = 1000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        mentions = g.spot(args.query)
+    print(f"spot: {(time.perf_counter() - t0) / n * 1e6:.1f} us")
+    for m in mentions:
+        print(m)
+
+if __name__ == "__main__":
+    main()
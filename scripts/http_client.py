@@ -0,0 +1,155 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # optional: only needed for CHIPULSE_HTTP2=1
+    httpx = None
+
+USER_AGENT = "CHIPulse/1.0 (+https://github.com/B3n31/CHIPulse)"
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Encoding": "gzip, deflate",
+}
+DEFAULT_TIMEOUT = 20
+
+# DBLP endpoint; point at scripts/dblp_stub_server.py for local tests and benchmarks
+DBLP_BASE_URL = os.environ.get("CHIPULSE_DBLP_URL", "https://dblp.org").rstrip("/")
+
+# Keep-alive connections kept per host and thread
+POOL_MAXSIZE = 8
+
+# HTTP/2 needs httpx with the h2 extra (pip install "httpx[http2]")
+USE_HTTP2 = os.environ.get("CHIPULSE_HTTP2", "0") == "1"
+
+
+
+def is_retryable(status: int) -> bool:
+    """429 Too Many Requests and every 5xx are retried."""
+    return status == 429 or 500 <= status < 600
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter: attempt n waits
+    min(base * 2**n, max_backoff) scaled by a random factor in [1 - jitter, 1].
+    A Retry-After header (seconds or HTTP date) on a retried response
+    replaces the computed wait, capped at max_retry_after.
+    """
+
+    def __init__(self, max_retries: int = 5, base: float = 5.0, max_backoff: float = 60.0,
+                 jitter: float = 0.5, max_retry_after: float = 300.0):
+        self.max_retries = max_retries
+        self.base = base
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        wait = min(self.base * 2 ** attempt, self.max_backoff)
+        return wait * (1 - self.jitter * random.random())
+
+    def delay(self, attempt: int, resp=None) -> float:
+        retry_after = parse_retry_after(resp.headers.get("Retry-After")) if resp is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return self.backoff(attempt)
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header value, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+# ---------------- Sessions ----------------
+
+_local = threading.local()
+
+def _new_session():
+    if USE_HTTP2 and httpx is not None:
+        try:
+            return httpx.Client(http2=True, headers=DEFAULT_HEADERS, follow_redirects=True)
+        except ImportError:
+            print("[http_client] h2 not installed, falling back to HTTP/1.1")
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+def get_session():
+    """
+    This thread's pooled keep-alive session. Fetch workers each get their own
+    (requests.Session is not thread-safe); one thread reuses its TCP/TLS
+    connections for every request to the same host.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = _new_session()
+    return session
+
+def _network_errors():
+    if httpx is not None:
+        return (requests.RequestException, httpx.TransportError)
+    return (requests.RequestException,)
+
+
+def get(url: str, params=None, headers=None, timeout: float = DEFAULT_TIMEOUT,
+        policy: RetryPolicy = DEFAULT_POLICY, telemetry=None):
+    """
+    GET through the shared session with the unified retry policy:
+    network errors and is_retryable() statuses are retried, any other response
+    (2xx, 304, 4xx) is returned for the caller to judge.
+    Returns None after max_retries failed attempts.
+    Every attempt and retry is recorded on `telemetry` when given.
+    """
+    session = get_session()
+    errors = _network_errors()
+    for attempt in range(policy.max_retries):
+        t0 = time.perf_counter()
+        try:
+            resp = session.get(url, params=params, headers=headers, timeout=timeout)
+        except errors as e:
+            wait = policy.delay(attempt)
+            if telemetry is not None:
+                telemetry.request(url, "error", time.perf_counter() - t0)
+                telemetry.write(f"  Network error ({e}), retrying in {wait:.1f}s...")
+                telemetry.retry("network", wait)
+            time.sleep(wait)
+            continue
+        if telemetry is not None:
+            telemetry.request(url, resp.status_code, time.perf_counter() - t0, len(resp.content))
+
+        if not is_retryable(resp.status_code):
+            return resp
+
+        wait = policy.delay(attempt, resp)
+        if telemetry is not None:
+            telemetry.write(f"  HTTP {resp.status_code}, retrying in {wait:.1f}s...")
+            telemetry.retry(resp.status_code, wait)
+        time.sleep(wait)
+
+    if telemetry is not None:
+        telemetry.write(f"  Failed after {policy.max_retries} attempts: {url}")
+    return None
+
+def is_success(resp) -> bool:
+    return resp is not None and 200 <= resp.status_code < 300
@@ -17,6 +17,19 @@ from db_queries import (
     get_ac_year_overview,
     get_trend_overview,
     get_top_countries_overall,
+    get_geo_distribution,
+    get_topic_trend,
+    get_topic_top_acs,
+    get_topic_top_venues,
+    search_publication_titles,
+    get_topic_model_topics,
+    get_topic_model_trend,
+    get_person_topic_profile,
+    get_similar_acs,
+    get_ac_turnover,
+    get_longest_serving_acs,
+    get_cohort_retention,
+    gazetteer,
 )
 load_dotenv(override=True)
 API_KEY = os.getenv("OPENAI_API_KEY")
@@ -127,6 +140,36 @@ TOOLS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_geo_distribution",
+            "description": "Distinct ACs per country, region (e.g. 'Northern Europe') or continent, for one year or all years.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "level": {
+                        "type": "string",
+                        "enum": ["country", "region", "continent"],
+                        "default": "region",
+                    },
+                    "year": {
+                        "type": "integer",
+                        "description": "Omit for all years combined.",
+                    },
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": True,
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 30,
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
     {
         "type": "function",
         "function": {
@@ -147,7 +190,7 @@ TOOLS = [
         "type": "function",
         "function": {
             "name": "get_top_affiliations_high_conf",
-            "description": "Top affiliations among DBLP-matched ACs, by AC-role count.",
+            "description": "Top institutions among DBLP-matched ACs, by AC-role count (spelling variants merged).",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -184,7 +227,7 @@ TOOLS = [
         "type": "function",
         "function": {
             "name": "get_affiliation_trend",
-            "description": "AC counts per year for a given affiliation keyword.",
+            "description": "AC counts per year for an institution name or abbreviation (e.g. 'CMU', 'Microsoft'), matched as whole words.",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -258,6 +301,238 @@ TOOLS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_topic_trend",
+            "description": "Yearly number of AC publications whose titles match a research topic, with the share of all AC publications that year. Use for 'how has <topic> research grown' questions.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "topic": {
+                        "type": "string",
+                        "description": "Research topic as the user says it, e.g. 'VR', 'accessibility', 'LLMs', 'haptic feedback'.",
+                    },
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": True,
+                    },
+                },
+                "required": ["topic"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_topic_top_acs",
+            "description": "ACs with the most publications on a research topic (matched on paper titles).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "topic": {
+                        "type": "string",
+                        "description": "Research topic as the user says it, e.g. 'VR', 'accessibility', 'LLMs', 'haptic feedback'.",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 20,
+                    },
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": True,
+                    },
+                },
+                "required": ["topic"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_topic_top_venues",
+            "description": "Venues where ACs publish the most on a research topic (matched on paper titles).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "topic": {
+                        "type": "string",
+                        "description": "Research topic as the user says it, e.g. 'VR', 'accessibility', 'LLMs', 'haptic feedback'.",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 20,
+                    },
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": True,
+                    },
+                },
+                "required": ["topic"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_publication_titles",
+            "description": "Full-text search over AC paper titles, best matches first. Use to cite example papers on a topic.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Topic or phrase to search for in titles.",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 20,
+                    },
+                },
+                "required": ["query"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_topic_model_topics",
+            "description": "Research themes of AC publications learned by a topic model over paper titles: top terms, overall share and share change in the last 5 years. Use for 'what do ACs work on' or 'which themes are rising'.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": True,
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_topic_model_trend",
+            "description": "Yearly share of one topic-model theme (topic_id from get_topic_model_topics) among AC publications.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "topic_id": {
+                        "type": "integer",
+                    },
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": True,
+                    },
+                },
+                "required": ["topic_id"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_person_topic_profile",
+            "description": "Main topic-model themes of one AC's publications, with their share of that person's work.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "person_id": {
+                        "type": "integer",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 5,
+                    },
+                },
+                "required": ["person_id"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_similar_acs",
+            "description": "ACs most similar to a given AC, by publication venues, paper title terms and co-authors. Use for 'who is most similar to X?' after resolving X to a person_id.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "person_id": {
+                        "type": "integer",
+                    },
+                    "k": {
+                        "type": "integer",
+                        "default": 10,
+                    },
+                },
+                "required": ["person_id"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_ac_turnover",
+            "description": "Per-year turnover of the AC pool: AC count, new, retained, returning and departed ACs, and the retention rate from the previous year. Use for 'how much does the AC pool turn over'.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": False,
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_longest_serving_acs",
+            "description": "ACs who served the most years, with first/last year and longest consecutive streak.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "limit": {
+                        "type": "integer",
+                        "default": 20,
+                    },
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": False,
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_cohort_retention",
+            "description": "Retention curves of AC cohorts (grouped by first AC year): share of each cohort serving again 0, 1, 2, ... years later.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "cohort_year": {
+                        "type": "integer",
+                        "description": "Only this cohort; omit for all cohorts.",
+                    },
+                    "max_years": {
+                        "type": "integer",
+                        "default": 10,
+                    },
+                    "high_conf_only": {
+                        "type": "boolean",
+                        "default": False,
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
     {
     "type": "function",
     "function": {
@@ -294,6 +569,8 @@ def _call_local_tool(name: str, arguments: dict):
         return get_ac_year_overview(**arguments)
     if name == "get_top_countries_overall":
         return get_top_countries_overall(**arguments)
+    if name == "get_geo_distribution":
+        return get_geo_distribution(**arguments)
     if name == "get_ac_year_stats_all":
         return get_ac_year_stats_all()
     if name == "get_ac_year_stats_high_conf":
@@ -314,15 +591,83 @@ def _call_local_tool(name: str, arguments: dict):
         return get_coauthors_for_person(**arguments)
     if name == "smart_person_lookup":
         return smart_person_lookup(**arguments)
+    if name == "get_topic_trend":
+        return get_topic_trend(**arguments)
+    if name == "get_topic_top_acs":
+        return get_topic_top_acs(**arguments)
+    if name == "get_topic_top_venues":
+        return get_topic_top_venues(**arguments)
+    if name == "search_publication_titles":
+        return search_publication_titles(**arguments)
+    if name == "get_topic_model_topics":
+        return get_topic_model_topics(**arguments)
+    if name == "get_topic_model_trend":
+        return get_topic_model_trend(**arguments)
+    if name == "get_person_topic_profile":
+        return get_person_topic_profile(**arguments)
+    if name == "get_similar_acs":
+        return get_similar_acs(**arguments)
+    if name == "get_ac_turnover":
+        return get_ac_turnover(**arguments)
+    if name == "get_longest_serving_acs":
+        return get_longest_serving_acs(**arguments)
+    if name == "get_cohort_retention":
+        return get_cohort_retention(**arguments)
     raise ValueError(f"Unknown tool {name}")
 
 # ===================== Main entry =====================
 
+# Persons spotted in the question whose profiles are fetched before planning
+MAX_PREFETCH_PERSONS = 3
+
+
+def _mentions_hint(mentions) -> str:
+    """One line for the planner listing the entities found in the question."""
+    if not mentions:
+        return ""
+    spotted = ", ".join(f"{m.text} ({m.kind})" for m in mentions)
+    loaded = " Person profiles are already loaded." if any(m.kind == "person" for m in mentions) else ""
+    return f"Entities recognized in the question: {spotted}.{loaded}\n"
+
+
 def answer_with_db_tools(user_query: str) -> str:
     collected: dict[str, list[dict]] = {}
 
     # ---------- preprocessing ----------
-    person_hits = find_persons_by_name(
+    # One pass over the question spots every known person / institution / country
+    mentions = gazetteer().spot(user_query)
+    if mentions:
+        collected["spotted_entities"] = [
+            {
+                "args": {"query": user_query},
+                "result": [m.as_dict() for m in mentions],
+            }
+        ]
+
+    spotted_ids = []
+    for m in mentions:
+        if m.kind == "person":
+            for pid in m.ids:
+                if pid not in spotted_ids:
+                    spotted_ids.append(pid)
+    spotted_ids = spotted_ids[:MAX_PREFETCH_PERSONS]
+
+    for pid in spotted_ids:
+        collected.setdefault("get_person_full_profile", []).append(
+            {
+                "args": {"person_id": pid},
+                "result": get_person_full_profile(pid) or {},
+            }
+        )
+        collected.setdefault("get_person_pub_venues", []).append(
+            {
+                "args": {"person_id": pid},
+                "result": get_person_pub_venues(pid) or [],
+            }
+        )
+
+    # Questions that are just a (partial) name, e.g. "Hudson"
+    person_hits = [] if spotted_ids else find_persons_by_name(
         name_substring=user_query,
         high_conf_only=True,
         limit=5,
@@ -367,6 +712,13 @@ def answer_with_db_tools(user_query: str) -> str:
                 "Your only job is to return tool_calls with appropriate arguments.\n"
                 "Prefer aggregated tools like get_trend_overview and get_ac_year_overview "
                 "over very detailed lists to keep outputs small.\n"
+                "For research-topic questions (e.g. VR, accessibility, LLMs), use "
+                "get_topic_trend, get_topic_top_acs and get_topic_top_venues.\n"
+                "For what ACs work on overall, or which research themes are rising, "
+                "use get_topic_model_topics.\n"
+                "For AC pool turnover, tenure or retention, use get_ac_turnover, "
+                "get_longest_serving_acs and get_cohort_retention instead of "
+                "get_ac_list_by_year.\n"
                 "If the user query mentions a specific person (e.g., “tell me papers of…”, “interesting paper of …”),"
                 "ALWAYS use the tool smart_person_lookup(name=...) to retrieve both identity and publications."
                 "Never stop after finding the name only."
@@ -380,6 +732,7 @@ def answer_with_db_tools(user_query: str) -> str:
                 "Decide which additional tools to call to gather data needed to answer this question.\n"
                 "Note: person search may have already been run in Python; you can still call "
                 "other tools for trends, years, or affiliations.\n"
+                f"{_mentions_hint(mentions)}"
                 "Return ONLY tool_calls, no natural language explanation."
             ),
         },
@@ -407,7 +760,7 @@ def answer_with_db_tools(user_query: str) -> str:
                 }
             )
 
-    if not collected:
+    if not collected.keys() - {"spotted_entities"}:
         collected["get_trend_overview"] = [
             {
                 "args": {"high_conf_only": True},
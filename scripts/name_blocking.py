@@ -0,0 +1,139 @@
+import argparse
+import csv
+import sqlite3
+import sys
+from pathlib import Path
+
+from dblp_pick_best import name_tokens, token_similarity
+
+DB_PATH = Path("database/chi_ac.db")
+
+# Minimum similarity for a pair to be reported
+MIN_SIM = 0.70
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+def soundex(token: str) -> str:
+    """American Soundex of a lowercase a-z token (e.g. 'robert' -> 'r163')."""
+    if not token:
+        return ""
+    out = token[0]
+    prev = _SOUNDEX_CODES.get(token[0], "")
+    for c in token[1:]:
+        code = _SOUNDEX_CODES.get(c, "")
+        if code and code != prev:
+            out += code
+            if len(out) == 4:
+                break
+        if c not in "hw":
+            prev = code
+    return out.ljust(4, "0")
+
+def blocking_keys(toks, query: bool = False) -> set:
+    """
+    Block keys for one tokenized name:
+    - last name + initial of each given name  ("yang x", "yang d")
+    - first name + last initial (swapped order, e.g. family name written first)
+    - Soundex(last name) + first initial      (spelling variants)
+    - bare last name ("=yang"), only looked up by surname-only queries
+      such as "Gergle", so multi-token queries never scan these wide blocks
+    """
+    if not toks:
+        return set()
+    last = toks[-1]
+    if len(toks) == 1:
+        return {f"={last}"}
+    first = toks[0]
+    keys = {f"{last} {t[0]}" for t in toks[:-1]}
+    keys.add(f"{first} {last[0]}")
+    keys.add(f"#{soundex(last)} {first[0]}")
+    if not query:
+        keys.add(f"={last}")
+    return keys
+
+
+class BlockingIndex:
+    """
+    Inverted index from blocking key to the ids of the names that produced it.
+    Candidate generation only looks inside the query's blocks, so matching N
+    names against M indexed names costs O(N + M + pairs within blocks) instead
+    of O(N * M).
+    """
+
+    def __init__(self):
+        self.blocks = {}
+        self.tokens = {}
+
+    def add(self, item_id, name: str):
+        toks = tuple(name_tokens(name))
+        self.tokens[item_id] = toks
+        for k in blocking_keys(toks):
+            self.blocks.setdefault(k, []).append(item_id)
+
+    def candidates(self, name: str):
+        """Ids sharing at least one block with `name`, in insertion order."""
+        seen = set()
+        out = []
+        for k in sorted(blocking_keys(tuple(name_tokens(name)), query=True)):
+            for item_id in self.blocks.get(k, ()):
+                if item_id not in seen:
+                    seen.add(item_id)
+                    out.append(item_id)
+        return out
+
+    def match(self, name: str, min_sim: float = MIN_SIM):
+        """[(item_id, sim), ...] for blocked candidates, best first."""
+        toks = tuple(name_tokens(name))
+        scored = []
+        for item_id in self.candidates(name):
+            sim = token_similarity(toks, self.tokens[item_id])
+            if sim >= min_sim:
+                scored.append((item_id, sim))
+        scored.sort(key=lambda x: -x[1])
+        return scored
+
+
+def build_index(names) -> BlockingIndex:
+    """names: iterable of (item_id, name)."""
+    index = BlockingIndex()
+    for item_id, name in names:
+        index.add(item_id, name)
+    return index
+
+def match_persons(persons, index: BlockingIndex, min_sim: float = MIN_SIM):
+    """Yield (person_id, item_id, sim) for every blocked pair above min_sim."""
+    for person_id, name in persons:
+        for item_id, sim in index.match(name, min_sim):
+            yield person_id, item_id, sim
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Match all persons against a local author list (TSV: id<TAB>name).")
+    parser.add_argument("authors_tsv", type=Path)
+    parser.add_argument("--min-sim", type=float, default=MIN_SIM)
+    args = parser.parse_args()
+
+    with args.authors_tsv.open(encoding="utf-8") as f:
+        authors = (line.rstrip("\n").split("\t", 1) for line in f if "\t" in line)
+        index = build_index(authors)
+    print(f"Indexed {len(index.tokens)} authors into {len(index.blocks)} blocks", file=sys.stderr)
+
+    conn = sqlite3.connect(DB_PATH)
+    persons = conn.execute("SELECT person_id, canonical_name FROM persons ORDER BY person_id").fetchall()
+    conn.close()
+
+    w = csv.writer(sys.stdout)
+    w.writerow(["person_id", "author_id", "sim"])
+    for person_id, author_id, sim in match_persons(persons, index, args.min_sim):
+        w.writerow([person_id, author_id, f"{sim:.3f}"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import os
+import sqlite3
+from pathlib import Path
+
+DB_PATH = Path("database/chi_ac.db")
+
+PAGE_SIZE = 8192
+
+# Repeated strings moved into dict_<name>(id, value) tables
+ROLE_DICT_COLUMNS = {
+    "venue": "venue",
+    "committee": "committee",
+    "affiliation_raw": "affiliation",
+    "country": "country",
+}
+PUB_DICT_COLUMNS = {
+    "venue": "pub_venue",
+    "pub_type": "pub_type",
+}
+
+# Link tables stored clustered by their primary key
+WITHOUT_ROWID_TABLES = ["role_institutions"]
+
+RESTRUCTURED = {"ac_roles", "publications", "authorships"}
+
+
+def table_columns(conn, table, schema="main"):
+    return [r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def column_decls(conn, table, schema="src"):
+    """name -> 'TYPE [NOT NULL]' as declared in the source table."""
+    decls = {}
+    for _, name, ctype, notnull, _, _ in conn.execute(f"PRAGMA {schema}.table_info({table})"):
+        decls[name] = f"{ctype} NOT NULL".strip() if notnull else ctype
+    return decls
+
+def create_dict(conn, name, sources):
+    """dict_<name> filled with the distinct non-NULL values of (table, column) sources."""
+    conn.execute(f"""
+        CREATE TABLE dict_{name} (
+            id    INTEGER PRIMARY KEY,
+            value TEXT NOT NULL UNIQUE
+        );
+    """)
+    union = " UNION ".join(
+        f"SELECT {col} FROM src.{table} WHERE {col} IS NOT NULL" for table, col in sources)
+    conn.execute(f"INSERT INTO dict_{name} (value) SELECT DISTINCT * FROM ({union}) ORDER BY 1")
+
+
+def dict_join(alias, col, name):
+    """(LEFT JOIN clause, view column) decoding `alias`.<col>_id through dict_<name>."""
+    d = f"d_{col}"
+    return (f"LEFT JOIN dict_{name} {d} ON {d}.id = {alias}.{col}_id",
+            f"{d}.value AS {col}")
+
+
+def copy_plain_objects(conn, kinds):
+    """Every other table / index / view of the given kinds, schema text unchanged."""
+    objects = conn.execute("""
+        SELECT type, name, tbl_name, sql
+        FROM src.sqlite_master
+        WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+        ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END, rowid
+    """).fetchall()
+    # FTS5 tables are re-created and refilled; their shadow tables come with them
+    virtual = [name for kind, name, _, sql in objects
+               if kind == "table" and sql.upper().startswith("CREATE VIRTUAL TABLE")]
+    for kind, name, tbl_name, sql in objects:
+        if kind not in kinds or name in RESTRUCTURED or tbl_name in RESTRUCTURED:
+            continue
+        if kind == "table" and any(name.startswith(v + "_") for v in virtual):
+            continue
+        if name in virtual:
+            conn.execute(sql)
+            conn.execute(f"INSERT INTO main.{name} SELECT * FROM src.{name}")
+            conn.execute(f"INSERT INTO main.{name} ({name}) VALUES ('optimize')")
+        elif kind == "table":
+            if name in WITHOUT_ROWID_TABLES and "WITHOUT ROWID" not in sql.upper():
+                sql = sql.rstrip().rstrip(";") + " WITHOUT ROWID"
+            conn.execute(sql)
+            conn.execute(f"INSERT INTO main.{name} SELECT * FROM src.{name}")
+        else:
+            conn.execute(sql)
+
+def build_roles(conn):
+    cols = table_columns(conn, "ac_roles", "src")
+    decls = column_decls(conn, "ac_roles")
+    for col, name in ROLE_DICT_COLUMNS.items():
+        create_dict(conn, name, [("ac_roles", col)])
+
+    data_cols, select_cols, view_cols, joins = [], [], [], []
+    for col in cols:
+        if col in ROLE_DICT_COLUMNS:
+            name = ROLE_DICT_COLUMNS[col]
+            data_cols.append(f"{col}_id INTEGER REFERENCES dict_{name}(id)")
+            select_cols.append(f"(SELECT id FROM dict_{name} WHERE value = r.{col})")
+            join, view_col = dict_join("r", col, name)
+            joins.append(join)
+            view_cols.append(view_col)
+        else:
+            decl = "INTEGER PRIMARY KEY" if col == "ac_role_id" else decls[col]
+            data_cols.append(f"{col} {decl}".strip())
+            select_cols.append(f"r.{col}")
+            view_cols.append(f"r.{col}")
+
+    conn.execute(f"CREATE TABLE ac_roles_data ({', '.join(data_cols)});")
+    conn.execute(f"""
+        INSERT INTO ac_roles_data
+        SELECT {', '.join(select_cols)} FROM src.ac_roles r ORDER BY r.ac_role_id
+    """)
+    conn.execute(f"""
+        CREATE VIEW ac_roles AS
+        SELECT {', '.join(view_cols)}
+        FROM ac_roles_data r
+        {' '.join(joins)}
+    """)
+
+    conn.execute("CREATE INDEX idx_ac_roles_data_year ON ac_roles_data(year, person_id);")
+    conn.execute("CREATE INDEX idx_ac_roles_data_person ON ac_roles_data(person_id);")
+    if "high_conf" in cols:
+        conn.execute("CREATE INDEX idx_ac_roles_data_high_conf ON ac_roles_data(high_conf, year, person_id);")
+    if "country_code" in cols:
+        conn.execute("CREATE INDEX idx_ac_roles_data_country_code ON ac_roles_data(country_code, year);")
+
+def build_publications(conn):
+    cols = table_columns(conn, "publications", "src")
+    decls = column_decls(conn, "publications")
+    for col, name in PUB_DICT_COLUMNS.items():
+        create_dict(conn, name, [("publications", col)])
+
+    data_cols = ["pub_id INTEGER PRIMARY KEY", "pub_key TEXT NOT NULL UNIQUE"]
+    select_cols = ["p.pub_key"]
+    view_cols = ["p.pub_key"]
+    joins = []
+    for col in cols:
+        if col == "pub_key":
+            continue
+        if col in PUB_DICT_COLUMNS:
+            name = PUB_DICT_COLUMNS[col]
+            data_cols.append(f"{col}_id INTEGER REFERENCES dict_{name}(id)")
+            select_cols.append(f"(SELECT id FROM dict_{name} WHERE value = p.{col})")
+            join, view_col = dict_join("p", col, name)
+            joins.append(join)
+            view_cols.append(view_col)
+        else:
+            data_cols.append(f"{col} {decls[col]}".strip())
+            select_cols.append(f"p.{col}")
+            view_cols.append(f"p.{col}")
+
+    conn.execute(f"CREATE TABLE publications_data ({', '.join(data_cols)});")
+    insert_cols = ["pub_key"] + [f"{c}_id" if c in PUB_DICT_COLUMNS else c for c in cols if c != "pub_key"]
+    conn.execute(f"""
+        INSERT INTO publications_data ({', '.join(insert_cols)})
+        SELECT {', '.join(select_cols)} FROM src.publications p ORDER BY p.year, p.pub_key
+    """)
+    conn.execute(f"""
+        CREATE VIEW publications AS
+        SELECT {', '.join(view_cols)}
+        FROM publications_data p
+        {' '.join(joins)}
+    """)
+    conn.execute("CREATE INDEX idx_publications_data_year ON publications_data(year);")
+
+def build_authorships(conn):
+    conn.execute("""
+        CREATE TABLE authorships_data (
+            pub_id     INTEGER NOT NULL REFERENCES publications_data(pub_id),
+            person_id  INTEGER NOT NULL,
+            author_pos INTEGER,
+            PRIMARY KEY (pub_id, person_id)
+        ) WITHOUT ROWID;
+    """)
+    conn.execute("""
+        INSERT INTO authorships_data (pub_id, person_id, author_pos)
+        SELECT p.pub_id, a.person_id, a.author_pos
+        FROM src.authorships a
+        JOIN publications_data p ON p.pub_key = a.pub_key
+        ORDER BY p.pub_id, a.person_id
+    """)
+    conn.execute("""
+        CREATE VIEW authorships AS
+        SELECT p.pub_key, a.person_id, a.author_pos
+        FROM authorships_data a
+        JOIN publications_data p ON p.pub_id = a.pub_id
+    """)
+    conn.execute("CREATE INDEX idx_authorships_data_person ON authorships_data(person_id, pub_id);")
+
+
+def optimize(src_path: Path, out_path: Path, page_size: int = PAGE_SIZE):
+    """
+    Write a compacted, read-optimized copy of src_path to out_path.
+    ac_roles / publications / authorships become views over *_data tables
+    with the same columns, so db_queries runs unchanged; the build scripts
+    that UPDATE these tables need the un-optimized DB.
+    """
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    conn = sqlite3.connect(tmp)
+    conn.execute(f"PRAGMA page_size = {page_size};")
+    conn.execute("ATTACH DATABASE ? AS src", (str(src_path),))
+    src_tables = {r[0] for r in conn.execute(
+        "SELECT name FROM src.sqlite_master WHERE type = 'table'")}
+    missing = RESTRUCTURED - src_tables
+    if missing:
+        raise SystemExit(f"[ERROR] {src_path} has no {', '.join(sorted(missing))} table "
+                         "(already optimized?)")
+
+    with conn:
+        copy_plain_objects(conn, {"table", "index"})
+        build_roles(conn)
+        build_publications(conn)
+        build_authorships(conn)
+        # Source views (e.g. an old persons_high_conf view) may read the new views
+        copy_plain_objects(conn, {"view", "trigger"})
+    conn.execute("DETACH DATABASE src")
+    conn.execute("ANALYZE;")
+    # Tiny dict tables would otherwise be planned as scans instead of the
+    # rowid lookups the views' joins expect
+    with conn:
+        conn.execute("DELETE FROM sqlite_stat1 WHERE tbl GLOB 'dict_*'")
+    conn.execute("VACUUM;")
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.close()
+    os.replace(tmp, out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a compacted, read-optimized copy of the DB.")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="output path (default: <db>.optimized.db)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args()
+
+    out = args.out or DB_PATH.with_suffix(".optimized.db")
+    if out.resolve() == DB_PATH.resolve():
+        raise SystemExit("[ERROR] --out must differ from the source DB; swap the files afterwards")
+    optimize(DB_PATH, out, args.page_size)
+
+    before = DB_PATH.stat().st_size
+    after = out.stat().st_size
+    print(f"{DB_PATH}: {before / 1e6:.2f} MB -> {out}: {after / 1e6:.2f} MB "
+          f"({100.0 * after / before:.0f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import argparse
+import sqlite3
+import time
+import tracemalloc
+from bisect import bisect_left
+from pathlib import Path
+from typing import List, Dict, Any
+
+from dblp_pick_best import name_key
+
+DB_PATH = Path("database/chi_ac.db")
+
+# SQLite's LOWER() and LIKE only fold ASCII letters; match that exactly
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def sql_lower(s: str) -> str:
+    return s.translate(_ASCII_LOWER)
+
+def trigrams(s: str):
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class PersonRecord:
+    __slots__ = ("person_id", "canonical_name", "key", "match_status", "dblp_pid", "high_conf")
+
+    def __init__(self, person_id, canonical_name, match_status, dblp_pid, high_conf):
+        self.person_id = person_id
+        self.canonical_name = canonical_name
+        self.key = name_key(canonical_name)
+        self.match_status = match_status
+        self.dblp_pid = dblp_pid
+        self.high_conf = high_conf
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "person_id": self.person_id,
+            "canonical_name": self.canonical_name,
+            "match_status": self.match_status,
+            "dblp_pid": self.dblp_pid,
+        }
+
+
+class PersonRegistry:
+    """
+    All persons in memory for name resolution without SQLite round-trips.
+    Records are kept sorted by (canonical_name, person_id), so every index
+    stores record positions and results come out in SQL ORDER BY order.
+
+    - by_id:     person_id -> record
+    - by_key:    normalized name key ("xing dong yang") -> positions
+    - by_token:  name token -> positions
+    - trigrams:  trigram of the ASCII-lowercased name -> positions, for the
+                 LIKE '%substring%' search of find_persons_by_name
+    - prefix search over the sorted normalized keys (bisect)
+    """
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda r: (r.canonical_name, r.person_id))
+        self.lower_names = [sql_lower(r.canonical_name) for r in self.records]
+        self.by_id = {}
+        self.by_key = {}
+        self.by_token = {}
+        self.trigrams = {}
+        for pos, r in enumerate(self.records):
+            self.by_id[r.person_id] = r
+            self.by_key.setdefault(r.key, []).append(pos)
+            for tok in set(r.key.split()):
+                self.by_token.setdefault(tok, []).append(pos)
+            for tri in trigrams(self.lower_names[pos]):
+                self.trigrams.setdefault(tri, []).append(pos)
+        self.sorted_keys = sorted((r.key, pos) for pos, r in enumerate(self.records))
+
+    @classmethod
+    def from_db(cls, db_path: Path = DB_PATH):
+        conn = sqlite3.connect(db_path)
+        try:
+            has_hc = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone()
+            cols = {r[1] for r in conn.execute("PRAGMA table_info(persons)")}
+            pid_col = "p.dblp_pid" if "dblp_pid" in cols else "NULL"
+            hc_col = ("p.person_id IN (SELECT person_id FROM persons_high_conf)"
+                      if has_hc else "0")
+            rows = conn.execute(f"""
+                SELECT p.person_id, p.canonical_name, p.match_status, {pid_col}, {hc_col}
+                FROM persons p
+            """).fetchall()
+        finally:
+            conn.close()
+        return cls(PersonRecord(pid, name, status, dblp_pid, bool(hc))
+                   for pid, name, status, dblp_pid, hc in rows)
+
+    def __len__(self):
+        return len(self.records)
+
+    # ----- lookups -----
+
+    def find(self, name_substring: str, high_conf_only: bool = False,
+             limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Same rows and order as the SQL find_persons_by_name, i.e.
+        LOWER(canonical_name) LIKE '%<name_substring.lower()>%'
+        ('%' and '_' in the query are taken literally here).
+        """
+        q = name_substring.lower()
+        tris = trigrams(q)
+        if tris:
+            postings = sorted((self.trigrams.get(t, ()) for t in tris), key=len)
+            cand = set(postings[0])
+            for p in postings[1:]:
+                cand.intersection_update(p)
+                if not cand:
+                    break
+            positions = sorted(cand)
+        else:
+            positions = range(len(self.records))
+
+        out = []
+        for pos in positions:
+            r = self.records[pos]
+            if high_conf_only and not r.high_conf:
+                continue
+            if q in self.lower_names[pos]:
+                out.append(r.as_dict())
+                if len(out) >= limit:
+                    break
+        return out
+
+    def by_name_key(self, name: str) -> List[PersonRecord]:
+        """Persons whose normalized name equals that of `name`."""
+        return [self.records[pos] for pos in self.by_key.get(name_key(name), ())]
+
+    def with_tokens(self, tokens) -> List[PersonRecord]:
+        """Persons whose name contains every token (normalized, any order)."""
+        tokens = [t for t in tokens if t]
+        if not tokens:
+            return []
+        postings = sorted((self.by_token.get(t, ()) for t in tokens), key=len)
+        cand = set(postings[0])
+        for p in postings[1:]:
+            cand.intersection_update(p)
+        return [self.records[pos] for pos in sorted(cand)]
+
+    def with_prefix(self, prefix: str, limit: int = 20) -> List[PersonRecord]:
+        """Persons whose normalized name starts with the normalized prefix."""
+        prefix = name_key(prefix)
+        if not prefix:
+            return []
+        out = []
+        i = bisect_left(self.sorted_keys, (prefix, -1))
+        while i < len(self.sorted_keys) and len(out) < limit:
+            key, pos = self.sorted_keys[i]
+            if not key.startswith(prefix):
+                break
+            out.append(self.records[pos])
+            i += 1
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the person registry and report its size and speed.")
+    parser.add_argument("queries", nargs="*", default=["yang", "Scott", "xing-dong yang"])
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    registry = PersonRegistry.from_db(DB_PATH)
+    build_s = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{len(registry)} persons, {len(registry.by_token)} tokens, "
+          f"{len(registry.trigrams)} trigrams; built in {build_s * 1000:.1f} ms, "
+          f"{size / 1e6:.2f} MB")
+
+    for q in args.queries:
+        n = 1000
+        t0 = time.perf_counter()
+        for _ in range(n):
+            hits = registry.find(q, limit=5)
+        us = (time.perf_counter() - t0) / n * 1e6
+        print(f"{q!r}: {len(hits)} hits in {us:.1f} us -> "
+              f"{[h['canonical_name'] for h in hits]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+DB_PATH = Path("database/chi_ac.db")
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Scraper output and its hand-cleaned version, which build_db reads
+SCRAPED_CSV = Path("data/raw/committee_members.csv")
+CLEANED_CSV = Path("data/raw/committee_members_cleaned.csv")
+
+# Per-pid DBLP person XML, shared by pick_best --evidence and fetch_publications
+XML_CACHE_DIR = Path("data/dblp_xml")
+
+# Capped network stages are re-run until nothing is pending or a run makes no progress
+MAX_ROUNDS = 1000
+
+MATCHED_STATUSES = "('matched_exact', 'matched_fuzzy', 'matched_evidence')"
+
+
+class Stage:
+    """
+    One pipeline step.
+    inputs:  "file:<path>" or "table:<name>" / "table:<name>(col1,col2)"
+    outputs: same notation; informational, they are the next stages' inputs
+    pending_sql: COUNT query of work left, for resumable capped stages
+    writes_db: at most one such stage runs at a time (SQLite has a single writer)
+    """
+
+    def __init__(self, name, module, deps=(), inputs=(), outputs=(), args=(),
+                 pending_sql=None, optional=False, writes_db=True):
+        self.name = name
+        self.module = module
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.pending_sql = pending_sql
+        self.optional = optional
+        self.writes_db = writes_db
+
+
+STAGES = [
+    Stage("scrape", "scrape_committees",
+          inputs=["file:sources/2006CHI.pdf", "file:sources/2007CHI.pdf", "file:sources/2008CHI.pdf"],
+          outputs=["file:data/raw/committee_members.csv"],
+          optional=True, writes_db=False),
+    # The scraped CSV is cleaned by hand into CLEANED_CSV (see Readme)
+    Stage("build_db", "build_db_from_csv",
+          deps=["scrape"],
+          inputs=[f"file:{CLEANED_CSV}"],
+          outputs=["table:ac_roles", "table:persons"],
+          args=["--upsert"]),
+    Stage("dedup_persons", "dedup_persons",
+          deps=["build_db"],
+          inputs=["table:ac_roles(ac_role_id,name_clean,affiliation_raw)"],
+          outputs=["table:persons", "table:person_aliases"]),
+    Stage("build_institutions", "build_institutions",
+          deps=["build_db"],
+          inputs=["table:ac_roles(ac_role_id,affiliation_raw)"],
+          outputs=["table:institutions", "table:institution_aliases", "table:role_institutions"]),
+    Stage("setup_dblp_schema", "setup_dblp_schema",
+          deps=["dedup_persons"],
+          outputs=["table:person_dblp_candidates", "table:dblp_search_results"]),
+    Stage("build_pub_tables", "build_pub_tables",
+          outputs=["table:publications", "table:authorships"]),
+    Stage("search_candidates", "dblp_search_candidates",
+          deps=["setup_dblp_schema"],
+          inputs=["table:persons(person_id,canonical_name)"],
+          outputs=["table:person_dblp_candidates", "table:dblp_search_results"],
+          pending_sql="""
+              SELECT COUNT(*) FROM persons
+              WHERE dblp_query_key IS NULL
+                AND person_id NOT IN (SELECT DISTINCT person_id FROM person_dblp_candidates)
+          """),
+    # --evidence reads the DBLP XML cache (and fills it, a capped number per run)
+    Stage("pick_best", "dblp_pick_best",
+          deps=["search_candidates"],
+          inputs=["table:persons(person_id,canonical_name)",
+                  "table:person_dblp_candidates(candidate_id,person_id,dblp_pid,dblp_url,author_name)",
+                  f"file:{XML_CACHE_DIR}"],
+          outputs=["table:persons(dblp_pid,dblp_url,match_status)", "table:dblp_profiles"],
+          args=["--evidence"]),
+    Stage("build_high_conf", "build_high_conf",
+          deps=["build_db", "pick_best"],
+          inputs=["table:persons(person_id,match_status,dblp_pid)",
+                  "table:ac_roles(ac_role_id,person_id)"],
+          outputs=["table:persons_high_conf"]),
+    Stage("build_tenure", "build_tenure",
+          deps=["build_db", "build_high_conf"],
+          inputs=["table:ac_roles(ac_role_id,person_id,year)", "table:persons_high_conf"],
+          outputs=["table:person_tenure", "table:year_turnover", "table:cohort_retention"]),
+    Stage("build_geography", "build_geography",
+          deps=["build_db", "build_high_conf"],
+          inputs=["table:ac_roles(ac_role_id,country,person_id)", "table:persons_high_conf"],
+          outputs=["table:countries", "table:geo_year_counts", "table:geo_total_counts"]),
+    Stage("build_title_index", "build_title_index",
+          deps=["fetch_publications", "build_high_conf"],
+          inputs=["table:publications(pub_key,title)", "table:authorships(pub_key,person_id)",
+                  "table:persons_high_conf"],
+          outputs=["table:pub_titles_fts", "table:topic_pubs", "table:pub_year_totals"]),
+    Stage("build_topic_model", "build_topic_model",
+          deps=["fetch_publications", "build_high_conf"],
+          inputs=["table:publications(pub_key,title,year)", "table:authorships(pub_key,person_id)",
+                  "table:persons_high_conf"],
+          outputs=["table:topic_model_topics", "table:pub_topics",
+                   "table:topic_year_shares", "table:person_topic_shares"]),
+    Stage("similar_acs", "similar_acs",
+          deps=["fetch_publications", "build_high_conf"],
+          inputs=["table:publications(pub_key,title,venue)", "table:authorships(pub_key,person_id)",
+                  "table:persons_high_conf"],
+          outputs=["file:data/similarity", "table:similar_acs_meta"]),
+    Stage("fetch_publications", "dblp_fetch_publications",
+          deps=["pick_best", "build_pub_tables"],
+          inputs=["table:persons(person_id,dblp_pid,match_status)"],
+          outputs=["table:publications", "table:authorships", "table:dblp_fetch_log"],
+          pending_sql=f"""
+              SELECT COUNT(*) FROM (
+                  SELECT p.person_id, COUNT(a.pub_key) AS n_pubs
+                  FROM persons p
+                  LEFT JOIN authorships a ON p.person_id = a.person_id
+                  WHERE p.match_status IN {MATCHED_STATUSES}
+                    AND p.dblp_pid IS NOT NULL
+                    AND p.person_id NOT IN (SELECT person_id FROM dblp_fetch_log)
+                  GROUP BY p.person_id
+                  HAVING n_pubs = 0
+              )
+          """),
+]
+
+
+# ---------------- Fingerprints ----------------
+
+def _file_fingerprint(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    if path.is_dir():
+        # Cache directories: names, sizes and mtimes, not every file's content
+        h = hashlib.sha1()
+        for f in sorted(p for p in path.rglob("*") if p.is_file()):
+            st = f.stat()
+            h.update(f"{f.relative_to(path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return h.hexdigest()
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _table_fingerprint(conn, spec: str) -> str:
+    if "(" in spec:
+        table, cols = spec[:-1].split("(", 1)
+        cols = [c.strip() for c in cols.split(",")]
+    else:
+        table, cols = spec, None
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (table,)
+    ).fetchone()
+    if not exists:
+        return "missing"
+    if cols:
+        existing_cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+        cols = [c for c in cols if c in existing_cols]
+        if not cols:
+            return "missing"
+    col_sql = ", ".join(cols) if cols else "*"
+    h = hashlib.sha1()
+    for row in conn.execute(f"SELECT {col_sql} FROM {table} ORDER BY 1"):
+        h.update(repr(tuple(row)).encode("utf-8"))
+    return h.hexdigest()
+
+def local_modules(module: str) -> list:
+    """The module and every scripts/ module it imports, directly or indirectly, sorted."""
+    seen = set()
+    todo = [module]
+    while todo:
+        name = todo.pop()
+        path = SCRIPTS_DIR / f"{name}.py"
+        if name in seen or not path.exists():
+            continue
+        seen.add(name)
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Import):
+                todo.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                todo.append(node.module)
+    return sorted(seen)
+
+def stage_fingerprint(stage: Stage, db_path: Path) -> str:
+    """Content hash of the stage's code (with its local imports), arguments and declared inputs."""
+    h = hashlib.sha1()
+    for name in local_modules(stage.module):
+        h.update(f"{name}={_file_fingerprint(SCRIPTS_DIR / f'{name}.py')}".encode())
+    h.update(json.dumps(stage.args).encode())
+    conn = sqlite3.connect(db_path) if db_path.exists() else None
+    try:
+        for spec in stage.inputs:
+            kind, target = spec.split(":", 1)
+            if kind == "file":
+                fp = _file_fingerprint(Path(target))
+            elif conn is None:
+                fp = "missing"
+            else:
+                fp = _table_fingerprint(conn, target)
+            h.update(f"{spec}={fp}".encode())
+    finally:
+        if conn is not None:
+            conn.close()
+    return h.hexdigest()
+
+def outputs_missing(stage: Stage, db_path: Path) -> bool:
+    """True if a declared output file/table is gone (e.g. the DB was deleted)."""
+    conn = sqlite3.connect(db_path) if db_path.exists() else None
+    try:
+        for spec in stage.outputs:
+            kind, target = spec.split(":", 1)
+            if kind == "file":
+                if not Path(target).exists():
+                    return True
+                continue
+            if conn is None:
+                return True
+            table = target.split("(", 1)[0]
+            if not conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+                    (table,)).fetchone():
+                return True
+    finally:
+        if conn is not None:
+            conn.close()
+    return False
+
+def pending_count(stage: Stage, db_path: Path):
+    if not stage.pending_sql:
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(stage.pending_sql).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+# ---------------- State (checkpoints) ----------------
+
+def state_path(db_path: Path) -> Path:
+    return db_path.with_suffix(".pipeline.json")
+
+def load_state(db_path: Path) -> dict:
+    path = state_path(db_path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def save_state(db_path: Path, state: dict):
+    path = state_path(db_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ---------------- Running ----------------
+
+def exec_stage(module_name: str, db_path: str, args):
+    """Child-process entry: point every loaded script at db_path, then call main()."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    module = importlib.import_module(module_name)
+    for mod in list(sys.modules.values()):
+        mod_file = getattr(mod, "__file__", None)
+        if mod_file and Path(mod_file).resolve().parent == SCRIPTS_DIR and hasattr(mod, "DB_PATH"):
+            mod.DB_PATH = Path(db_path)
+    sys.argv = [f"{module_name}.py"] + list(args)
+    module.main()
+
+def run_once(stage: Stage, db_path: Path) -> bool:
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--exec-stage", stage.module,
+           "--db", str(db_path), "--", *stage.args]
+    return subprocess.run(cmd).returncode == 0
+
+def run_stage(stage: Stage, db_path: Path) -> str:
+    """
+    Run a stage to completion. Resumable stages are re-run while their pending
+    count shrinks; each round's own checkpoints (candidates, fetch ledger) mean
+    an interrupted run continues where it stopped.
+    Returns 'done', 'partial' (work left that this run cannot finish; downstream
+    stages still run, but the stage is retried next time) or 'failed'.
+    """
+    if not stage.pending_sql:
+        return "done" if run_once(stage, db_path) else "failed"
+
+    before = pending_count(stage, db_path)
+    for _ in range(MAX_ROUNDS):
+        if not run_once(stage, db_path):
+            return "failed"
+        after = pending_count(stage, db_path)
+        print(f"[pipeline] {stage.name}: {after} pending")
+        if not after:
+            return "done"
+        if before is not None and after >= before:
+            print(f"[pipeline] {stage.name}: no progress, leaving {after} for the next run")
+            return "partial"
+        before = after
+    return "partial"
+
+def warn_uncleaned_scrape():
+    """build_db reads CLEANED_CSV only; a newer scrape is not used until it is cleaned."""
+    if (SCRAPED_CSV.exists() and CLEANED_CSV.exists()
+            and SCRAPED_CSV.stat().st_mtime > CLEANED_CSV.stat().st_mtime):
+        print(f"[pipeline] warning: {SCRAPED_CSV} is newer than {CLEANED_CSV}; "
+              f"build_db uses the cleaned file, clean the new scrape into it first")
+
+def run_pipeline(db_path: Path, only=None, force=False, include_optional=False,
+                 jobs=2, dry_run=False):
+    if only:
+        selected = [s for s in STAGES if s.name in only]
+    else:
+        selected = [s for s in STAGES if include_optional or not s.optional]
+    selected_names = {s.name for s in selected}
+    state = load_state(db_path)
+
+    done = set()
+    failed = set()
+    running = {}
+    by_name = {s.name: s for s in selected}
+
+    def deps_of(s):
+        return [d for d in s.deps if d in selected_names]
+
+    def start(pool, s):
+        fp = stage_fingerprint(s, db_path)
+        if (not force and state.get(s.name, {}).get("fingerprint") == fp
+                and not outputs_missing(s, db_path)):
+            print(f"[pipeline] {s.name}: up to date, skipped")
+            return None
+        if dry_run:
+            print(f"[pipeline] {s.name}: would run")
+            return None
+        print(f"[pipeline] {s.name}: running")
+        return pool.submit(lambda: (run_stage(s, db_path), fp, time.time()))
+
+    if "build_db" in selected_names:
+        warn_uncleaned_scrape()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(done) + len(failed) < len(selected):
+            for s in selected:
+                if s.name in done or s.name in failed or s.name in running:
+                    continue
+                if any(d in failed for d in deps_of(s)):
+                    failed.add(s.name)
+                    print(f"[pipeline] {s.name}: blocked by a failed dependency")
+                    continue
+                if all(d in done for d in deps_of(s)):
+                    if s.writes_db and any(by_name[n].writes_db for n in running):
+                        continue
+                    fut = start(pool, s)
+                    if fut is None:
+                        done.add(s.name)
+                    else:
+                        running[s.name] = fut
+            if not running:
+                continue
+            finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name, fut in list(running.items()):
+                if fut not in finished:
+                    continue
+                del running[name]
+                status, fp, ended = fut.result()
+                if status == "failed":
+                    failed.add(name)
+                    print(f"[pipeline] {name}: failed")
+                    continue
+                done.add(name)
+                if status == "done":
+                    # Checkpoint after every finished stage
+                    state[name] = {"fingerprint": fp, "finished_at": ended}
+                else:
+                    state.pop(name, None)
+                save_state(db_path, state)
+                print(f"[pipeline] {name}: {status}")
+
+    print(f"[pipeline] finished in {time.perf_counter() - t0:.1f}s "
+          f"({len(done)} ok, {len(failed)} failed)")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the CHIPulse build pipeline.")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--only", nargs="+", help="run only these stages")
+    parser.add_argument("--force", action="store_true", help="ignore fingerprints")
+    parser.add_argument("--with-scrape", action="store_true", help="include the scrape stage")
+    parser.add_argument("--jobs", type=int, default=2, help="stages run concurrently (DB writers one at a time)")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--list", action="store_true", help="list stages and exit")
+    parser.add_argument("--exec-stage", help=argparse.SUPPRESS)
+    parser.add_argument("stage_args", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.exec_stage:
+        exec_stage(args.exec_stage, str(args.db), args.stage_args)
+        return
+
+    if args.list:
+        for s in STAGES:
+            deps = ", ".join(s.deps) or "-"
+            print(f"{s.name:20s} deps: {deps}{'  (optional)' if s.optional else ''}")
+        return
+
+    ok = run_pipeline(args.db, only=args.only, force=args.force,
+                      include_optional=args.with_scrape, jobs=args.jobs, dry_run=args.dry_run)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,86 @@
 import os
 import time
 import csv
-import requests
+import hashlib
+import threading
 import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup, Tag, NavigableString
 from PyPDF2 import PdfReader
 from typing import List, Tuple
 
+import http_client
+
 
 # ---------------- Configuration ----------------
 OUTPUT_CSV = os.path.join("data", "raw", "committee_members.csv")
+PDF_TEXT_CACHE_DIR = os.path.join("data", "cache", "pdf_text")
 START_YEAR = 2005
 END_YEAR   = 2025
 USER_AGENT = "Mozilla/5.0 (compatible; Bot/0.1; +https://your.site/)"
 
+# Years are scraped concurrently; requests to the same host stay MIN_HOST_INTERVAL apart
+MAX_WORKERS = 8
+MIN_HOST_INTERVAL = 1.0
+SCRAPE_RETRY = http_client.RetryPolicy(max_retries=3, base=2, max_backoff=10)
+
+_host_lock_guard = threading.Lock()
+_host_locks = {}
+_host_last_request = {}
+
+def _wait_for_host(host):
+    """Per-host politeness: serialize requests to one host and space them out."""
+    with _host_lock_guard:
+        lock = _host_locks.setdefault(host, threading.Lock())
+    lock.acquire()
+    wait = _host_last_request.get(host, 0.0) + MIN_HOST_INTERVAL - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    return lock
+
 def fetch_url(url):
-    headers = {"User-Agent": USER_AGENT}
-    r = requests.get(url, headers=headers, timeout=10)
+    host = urlparse(url).netloc
+    lock = _wait_for_host(host)
+    try:
+        headers = {"User-Agent": USER_AGENT}
+        r = http_client.get(url, headers=headers, timeout=10, policy=SCRAPE_RETRY)
+    finally:
+        _host_last_request[host] = time.monotonic()
+        lock.release()
+    if r is None:
+        raise RuntimeError(f"Failed to fetch {url}")
     r.raise_for_status()
     return r.text
 
 
+def extract_pdf_text(pdf_path: str) -> str:
+    """
+    Full text of a PDF, cached on disk keyed by the file's sha1,
+    so PyPDF2 only runs once per distinct file.
+    """
+    with open(pdf_path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    cache_path = os.path.join(PDF_TEXT_CACHE_DIR, digest + ".txt")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            return f.read()
+
+    reader = PdfReader(pdf_path)
+    full_text = ""
+    for page in reader.pages:
+        txt = page.extract_text()
+        if txt:
+            full_text += txt + "\n"
+
+    os.makedirs(PDF_TEXT_CACHE_DIR, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(full_text)
+    os.replace(tmp_path, cache_path)
+    return full_text
+
+
 # ---------------- CHI 2005 - 2025 ----------------
 def scrape_chi_2005():
     """
@@ -86,12 +146,7 @@ def scrape_chi2006_2008_pdf(pdf_path: str, year: int) -> List[Tuple[int, str, st
     if year not in (2006, 2007, 2008):
         raise ValueError("year must be 2006/2007/2008")
 
-    reader = PdfReader(pdf_path)
-    full_text = ""
-    for page in reader.pages:
-        txt = page.extract_text()
-        if txt:
-            full_text += txt + "\n"
+    full_text = extract_pdf_text(pdf_path)
 
     patterns = {
         2006: r"Papers\s*,\s*Associate\s+Chairs(?:\s*[:\-–])?(.*?)(?=\n\s*Papers\s*,\s*Reviewers|\n\s*Papers\s+Reviewers|\n\s*ACKNOWLEDG(E)?MENTS|\Z)",
@@ -787,49 +842,55 @@ def scrape_chi_year(year):
 
 
 # ---------------- Main ----------------
+def scrape_year(yr):
+    if yr == 2005:
+        return scrape_chi_2005()
+    elif yr == 2006:
+        return scrape_chi2006_2008_pdf("sources/2006CHI.pdf", yr)
+    elif yr == 2007:
+        return scrape_chi2006_2008_pdf("sources/2007CHI.pdf", yr)
+    elif yr == 2008:
+        return scrape_chi2006_2008_pdf("sources/2008CHI.pdf", yr)
+    elif yr == 2009:
+        return scrape_chi_2009()
+    elif yr in (2010, 2011):
+        return scrape_chi_2010to2011(yr)
+    elif yr == 2012:
+        return scrape_chi_2012()
+    elif yr == 2013:
+        return scrape_chi_2013()
+    elif yr in (2014, 2015):
+        return scrape_chi_2014to2015(yr)
+    elif yr == 2016:
+        return scrape_chi_2016()
+    elif yr == 2017:
+        return scrape_chi_2017()
+    elif yr in (2018, 2019, 2020):
+        return scrape_chi_2018to2020(yr)
+    elif yr == 2021:
+        return scrape_chi_2021()
+    elif yr == 2022:
+        return scrape_chi_2022()
+    elif yr == 2023:
+        return scrape_chi_2023()
+    else:
+        return scrape_chi_year(yr)
+
+
 def main():
     os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
-    with open(OUTPUT_CSV, "w", encoding="utf-8", newline="") as f:
+    years = range(START_YEAR, END_YEAR + 1)
+    with open(OUTPUT_CSV, "w", encoding="utf-8", newline="") as f, \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
         w = csv.writer(f)
         w.writerow(["year","venue","committee","member"])
-        
-        for yr in range(START_YEAR, END_YEAR+1):
-            if yr == 2005:
-                rows = scrape_chi_2005()
-            elif yr == 2006:
-                rows = scrape_chi2006_2008_pdf("sources/2006CHI.pdf", yr)
-            elif yr == 2007:
-                rows = scrape_chi2006_2008_pdf("sources/2007CHI.pdf", yr)
-            elif yr == 2008:
-                rows = scrape_chi2006_2008_pdf("sources/2008CHI.pdf", yr)
-            elif yr == 2009:
-                rows = scrape_chi_2009()
-            elif yr in (2010, 2011):
-                rows = scrape_chi_2010to2011(yr)
-            elif yr == 2012:
-                rows = scrape_chi_2012()
-            elif yr == 2013:
-                rows = scrape_chi_2013()
-            elif yr in (2014, 2015):
-                rows = scrape_chi_2014to2015(yr)
-            elif yr == 2016:
-                rows = scrape_chi_2016()
-            elif yr == 2017:
-                rows = scrape_chi_2017()
-            elif yr in (2018, 2019, 2020):
-                rows = scrape_chi_2018to2020(yr)
-            elif yr == 2021:
-                rows = scrape_chi_2021()
-            elif yr == 2022:
-                rows = scrape_chi_2022()
-            elif yr == 2023:
-                rows = scrape_chi_2023()
-            else:
-                rows = scrape_chi_year(yr)
 
-            for y, c, m in rows:
+        futures = {yr: pool.submit(scrape_year, yr) for yr in years}
+        # Write in year order as soon as each year (and all before it) is done
+        for yr in years:
+            for y, c, m in futures[yr].result():
                 w.writerow([y, "CHI", c, m])
-            time.sleep(1)
+            f.flush()
 
     print("Finish output is", OUTPUT_CSV)
 
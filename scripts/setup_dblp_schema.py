@@ -8,6 +8,12 @@ def column_exists(cur, table, col):
     cols = [r[1] for r in cur.fetchall()]
     return col in cols
 
+def has_unique_index(cur, table, cols):
+    for _, name, unique, *_ in cur.execute(f"PRAGMA index_list({table});").fetchall():
+        if unique and [r[2] for r in cur.execute(f"PRAGMA index_info({name});")] == cols:
+            return True
+    return False
+
 def main():
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
@@ -16,6 +22,9 @@ def main():
         cur.execute("ALTER TABLE persons ADD COLUMN dblp_pid TEXT;")
     if not column_exists(cur, "persons", "dblp_url"):
         cur.execute("ALTER TABLE persons ADD COLUMN dblp_url TEXT;")
+    # Normalized name the person's candidates were searched under (see dblp_search_candidates)
+    if not column_exists(cur, "persons", "dblp_query_key"):
+        cur.execute("ALTER TABLE persons ADD COLUMN dblp_query_key TEXT;")
 
     cur.execute("""
         CREATE TABLE IF NOT EXISTS person_dblp_candidates (
@@ -26,9 +35,42 @@ def main():
             author_name    TEXT NOT NULL,
             score          REAL,
             chosen         INTEGER DEFAULT 0,
-            FOREIGN KEY(person_id) REFERENCES persons(person_id)
+            FOREIGN KEY(person_id) REFERENCES persons(person_id),
+            UNIQUE(person_id, dblp_pid)
         );
     """)
+    if not has_unique_index(cur, "person_dblp_candidates", ["person_id", "dblp_pid"]):
+        # Tables created before the constraint: drop re-search duplicates,
+        # keeping the chosen row (else the oldest), then enforce it
+        cur.execute("""
+            DELETE FROM person_dblp_candidates
+            WHERE candidate_id IN (
+                SELECT candidate_id FROM (
+                    SELECT candidate_id,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY person_id, dblp_pid
+                               ORDER BY chosen DESC, candidate_id
+                           ) AS rn
+                    FROM person_dblp_candidates
+                )
+                WHERE rn > 1
+            );
+        """)
+        print(f"Removed {cur.rowcount} duplicate candidate rows")
+        cur.execute("""
+            CREATE UNIQUE INDEX idx_person_dblp_candidates_person_pid
+            ON person_dblp_candidates(person_id, dblp_pid);
+        """)
+
+    # One DBLP author search per normalized name, shared by all persons with
+    # that name; hits are stored as a compact JSON list of [pid, author_name, url]
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS dblp_search_results (
+            query_key   TEXT PRIMARY KEY,
+            hits        TEXT NOT NULL,
+            searched_at TEXT NOT NULL DEFAULT (datetime('now'))
+        ) WITHOUT ROWID;
+    """)
 
     conn.commit()
     conn.close()
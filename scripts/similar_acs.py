@@ -0,0 +1,276 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import svds
+
+from build_topic_model import build_vocab, tfidf_matrix, tokenize
+
+DB_PATH = Path("database/chi_ac.db")
+INDEX_DIR = Path("data/similarity")
+
+# Bump when the features change, so indexes of older code are not reused
+FEATURE_VERSION = 1
+
+# Share of each block in the cosine similarity (block vectors are unit length)
+BLOCK_WEIGHTS = {"venues": 0.3, "titles": 0.5, "coauthors": 0.2}
+
+# Columns of the stored vectors (truncated SVD of the concatenated blocks)
+DIM = 128
+
+# Rows hashed at a time by inputs_fingerprint
+HASH_BATCH = 10000
+
+
+# ---------------- Features ----------------
+
+def _l2_rows(M):
+    norms = np.sqrt(np.asarray(M.multiply(M).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ M
+
+def _log_idf(M):
+    """log(1 + count) scaled by the inverse document frequency of each column."""
+    M = M.tocsr().astype(np.float64)
+    M.data = np.log1p(M.data)
+    df = np.bincount(M.indices, minlength=M.shape[1])
+    idf = np.log((1 + M.shape[0]) / (1 + df)) + 1
+    return M @ sparse.diags(idf)
+
+def _codes(values):
+    """Dense integer codes of an iterable of hashables, and the {value: code} index."""
+    index = {}
+    return np.array([index.setdefault(v, len(index)) for v in values], dtype=np.int64), index
+
+def load_feature_blocks(conn):
+    """
+    (person_ids, {block: sparse person x feature matrix}) for the ACs with
+    publications: high-confidence ACs when persons_high_conf exists.
+    venues: log/idf venue counts, as in get_person_pub_venues
+    titles: summed TF-IDF rows of their publication titles
+    coauthors: log/idf co-authored paper counts per co-author
+    """
+    has_hc = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone()
+    ac_filter = "WHERE person_id IN (SELECT person_id FROM persons_high_conf)" if has_hc else ""
+    person_ids = [r[0] for r in conn.execute(f"""
+        SELECT DISTINCT person_id FROM authorships {ac_filter} ORDER BY person_id
+    """)]
+    person_row = {p: i for i, p in enumerate(person_ids)}
+
+    pubs = conn.execute("""
+        SELECT pub_key, COALESCE(venue, ''), COALESCE(title, '') FROM publications ORDER BY pub_key
+    """).fetchall()
+    pub_col = {r[0]: i for i, r in enumerate(pubs)}
+    authorships = conn.execute("SELECT person_id, pub_key FROM authorships").fetchall()
+    authorships = [(p, k) for p, k in authorships if k in pub_col]
+
+    # persons x pubs incidence, and all authors x pubs for the co-author counts
+    ac_pairs = [(person_row[p], pub_col[k]) for p, k in authorships if p in person_row]
+    r, c = np.array(ac_pairs, dtype=np.int64).reshape(-1, 2).T
+    A = sparse.csr_matrix((np.ones(len(r)), (r, c)), shape=(len(person_ids), len(pubs)))
+    A.data[:] = 1
+    author_codes, author_index = _codes(p for p, _ in authorships)
+    all_cols = np.array([pub_col[k] for _, k in authorships], dtype=np.int64)
+    B = sparse.csr_matrix((np.ones(len(all_cols)), (author_codes, all_cols)),
+                          shape=(len(author_index), len(pubs)))
+    B.data[:] = 1
+
+    venue_codes, venue_index = _codes(v for _, v, _ in pubs)
+    P_venue = sparse.csr_matrix((np.ones(len(pubs)), (np.arange(len(pubs)), venue_codes)),
+                                shape=(len(pubs), len(venue_index)))
+
+    token_lists = [tokenize(t) for _, _, t in pubs]
+    vocab, idf = build_vocab(token_lists)
+    X = tfidf_matrix(token_lists, vocab, idf)
+
+    # Shared papers with every author, minus the AC's own column
+    coauthors = (A @ B.T).tocoo()
+    own = np.array([author_index[p] for p in person_ids], dtype=np.int64)
+    keep = coauthors.col != own[coauthors.row]
+    coauthors = sparse.csr_matrix((coauthors.data[keep], (coauthors.row[keep], coauthors.col[keep])),
+                                  shape=coauthors.shape)
+
+    blocks = {
+        "venues": _l2_rows(_log_idf(A @ P_venue)),
+        "titles": _l2_rows(A @ X),
+        "coauthors": _l2_rows(_log_idf(coauthors)),
+    }
+    return person_ids, blocks
+
+def build_vectors(blocks, dim: int = DIM):
+    """
+    Unit-length float32 rows whose dot product approximates the weighted sum
+    of the per-block cosines: concatenation of sqrt(weight) * block, reduced
+    to `dim` columns with a truncated SVD.
+    """
+    F = sparse.hstack([np.sqrt(BLOCK_WEIGHTS[name]) * M for name, M in blocks.items()]).tocsr()
+    k = min(dim, min(F.shape) - 1)
+    U, S, _ = svds(F, k=k, random_state=0)
+    V = (U * S).astype(np.float32)
+    norms = np.linalg.norm(V, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return V / norms
+
+
+# ---------------- Index files ----------------
+
+def has_inputs(conn) -> bool:
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+    return {"authorships", "publications"} <= names
+
+def inputs_fingerprint(conn) -> str:
+    """
+    Hash of the rows the vectors are computed from; names the index files.
+    Computed by build_index only, which records it in similar_acs_meta.
+    """
+    h = hashlib.sha1(f"v{FEATURE_VERSION}:{DIM}:{sorted(BLOCK_WEIGHTS.items())}".encode())
+    queries = [
+        "SELECT person_id, pub_key FROM authorships ORDER BY person_id, pub_key",
+        "SELECT pub_key, venue, title FROM publications ORDER BY pub_key",
+    ]
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'persons_high_conf'").fetchone():
+        queries.append("SELECT person_id FROM persons_high_conf ORDER BY person_id")
+    for sql in queries:
+        h.update(sql.encode())
+        cur = conn.execute(sql)
+        for rows in iter(lambda: cur.fetchmany(HASH_BATCH), []):
+            h.update(repr(rows).encode())
+    return h.hexdigest()[:16]
+
+def index_paths(fingerprint: str, index_dir: Path = INDEX_DIR):
+    return (index_dir / f"similar_acs-{fingerprint}.npy",
+            index_dir / f"similar_acs-{fingerprint}.ids.npy")
+
+def recorded_fingerprint(conn):
+    """Fingerprint of the last index built from this DB, or None."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'similar_acs_meta'").fetchone():
+        return None
+    row = conn.execute("SELECT value FROM similar_acs_meta WHERE key = 'fingerprint'").fetchone()
+    return row[0] if row else None
+
+def record_index(conn, fingerprint: str, n_persons: int):
+    """Point the DB at its index files; the write also tells servers to reload."""
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS similar_acs_meta;")
+        conn.execute("""
+            CREATE TABLE similar_acs_meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        conn.executemany("INSERT INTO similar_acs_meta (key, value) VALUES (?, ?)", [
+            ("fingerprint", fingerprint),
+            ("n_persons", str(n_persons)),
+            ("built_at", str(time.time())),
+        ])
+
+def build_index(conn, index_dir: Path = INDEX_DIR):
+    """Compute and save the vectors of the DB's current version; returns the vectors path."""
+    t0 = time.perf_counter()
+    fingerprint = inputs_fingerprint(conn)
+    vec_path, ids_path = index_paths(fingerprint, index_dir)
+    person_ids, blocks = load_feature_blocks(conn)
+    vectors = build_vectors(blocks)
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    # ids first: a reader that sees the vectors file always finds its ids
+    for path, array in ((ids_path, np.array(person_ids, dtype=np.int64)), (vec_path, vectors)):
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, path)
+    # Older versions: workers still mapping them keep their open file. Files
+    # written after this one belong to another DB sharing the directory.
+    written = vec_path.stat().st_mtime
+    for old in index_dir.glob("similar_acs-*.npy"):
+        if not old.name.startswith(f"similar_acs-{fingerprint}") and old.stat().st_mtime < written:
+            old.unlink(missing_ok=True)
+    record_index(conn, fingerprint, len(person_ids))
+    print(f"similar_acs: {vectors.shape[0]} ACs x {vectors.shape[1]} dims "
+          f"({', '.join(f'{n} {m.shape[1]}' for n, m in blocks.items())} features) "
+          f"in {time.perf_counter() - t0:.2f}s -> {vec_path}")
+    return vec_path
+
+
+class SimilarityIndex:
+    """
+    Brute-force cosine kNN over the memory-mapped AC vectors. The file is
+    mapped read-only, so every server worker shares the same page cache copy.
+    """
+
+    def __init__(self, vectors, person_ids):
+        self.vectors = vectors
+        self.person_ids = person_ids
+        self.row = {int(p): i for i, p in enumerate(person_ids)}
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, DIM), dtype=np.float32), np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def open(cls, db_path: Path = DB_PATH, index_dir: Path = INDEX_DIR):
+        """
+        Index last built from the DB (as recorded in similar_acs_meta); empty
+        when the DB has no publications or no index was built from it yet.
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            if not has_inputs(conn):
+                return cls.empty()
+            fingerprint = recorded_fingerprint(conn)
+        finally:
+            conn.close()
+        if fingerprint is None or not index_paths(fingerprint, index_dir)[0].exists():
+            print(f"[WARN] no similar-ACs index of the current DB in {index_dir}; "
+                  "run scripts/similar_acs.py")
+            return cls.empty()
+        vec_path, ids_path = index_paths(fingerprint, index_dir)
+        return cls(np.load(vec_path, mmap_mode="r"), np.load(ids_path))
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def similar(self, person_id: int, k: int = 10):
+        """[(person_id, cosine), ...] of the k nearest other ACs, most similar first."""
+        i = self.row.get(int(person_id))
+        if i is None:
+            return []
+        scores = self.vectors @ self.vectors[i]
+        scores[i] = -np.inf
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((self.person_ids[top], -scores[top]))]
+        return [(int(self.person_ids[j]), float(scores[j])) for j in top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the similar-ACs vector index of the DB.")
+    parser.add_argument("--person", type=int, help="after building, show the ACs most similar to this person_id")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        build_index(conn)
+    finally:
+        conn.close()
+    if args.person is not None:
+        index = SimilarityIndex.open(DB_PATH)
+        n = 1000
+        t0 = time.perf_counter()
+        for _ in range(n):
+            hits = index.similar(args.person, args.k)
+        print(f"{len(index)} ACs, query {(time.perf_counter() - t0) / n * 1000:.3f} ms")
+        for person_id, score in hits:
+            print(f"  {person_id:6d}  {score:.3f}")
+
+if __name__ == "__main__":
+    main()
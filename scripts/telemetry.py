@@ -0,0 +1,171 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from tqdm import tqdm
+
+LOG_PATH = Path("data/logs/pipeline_metrics.jsonl")
+
+# Upper bounds (seconds) of the latency / timing histogram buckets
+HIST_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, math.inf]
+
+
+class Histogram:
+    def __init__(self):
+        self.values = []
+
+    def add(self, v: float):
+        self.values.append(v)
+
+    def summary(self) -> dict:
+        if not self.values:
+            return {"count": 0}
+        vals = sorted(self.values)
+        n = len(vals)
+        buckets = {}
+        i = 0
+        for ub in HIST_BUCKETS:
+            c = 0
+            while i < n and vals[i] <= ub:
+                c += 1
+                i += 1
+            buckets["inf" if ub == math.inf else str(ub)] = c
+        return {
+            "count": n,
+            "sum": round(sum(vals), 4),
+            "mean": round(sum(vals) / n, 4),
+            "p50": round(vals[n // 2], 4),
+            "p95": round(vals[min(n - 1, int(n * 0.95))], 4),
+            "max": round(vals[-1], 4),
+            "buckets": buckets,
+        }
+
+
+class Telemetry:
+    """
+    Per-stage counters and histograms for the DBLP network stages.
+    Every HTTP request, retry and DB commit is appended to a JSON-lines log,
+    a summary record is written on close(), and a tqdm bar shows the live
+    request rate, 429 rate, bytes, rows/s and ETA.
+    """
+
+    def __init__(self, stage: str, total: int | None = None,
+                 log_path: Path | None = LOG_PATH, progress: bool = True):
+        self.stage = stage
+        self.run_id = f"{stage}-{int(time.time())}-{os.getpid()}"
+        self.started = time.perf_counter()
+        self.counters = {}
+        self.hists = {}
+        # Fetch workers record from several threads
+        self._lock = threading.Lock()
+        self._log = None
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log = log_path.open("a", encoding="utf-8")
+        self.bar = tqdm(total=total, desc=stage, unit="person") if progress else None
+        self.event("start", total=total)
+
+    @classmethod
+    def disabled(cls, stage: str = "disabled"):
+        """No log file and no progress bar; counters still work."""
+        return cls(stage, log_path=None, progress=False)
+
+    # ----- recording -----
+
+    def event(self, kind: str, **fields):
+        if self._log is None:
+            return
+        rec = {"ts": round(time.time(), 3), "run": self.run_id, "stage": self.stage, "event": kind}
+        rec.update(fields)
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._log.write(line)
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self.hists.setdefault(name, Histogram()).add(value)
+
+    def request(self, url: str, status, latency: float, nbytes: int = 0):
+        """One HTTP attempt; status is the HTTP code or 'error' for network failures."""
+        self.incr("requests")
+        self.incr(f"status_{status}")
+        self.incr("bytes", nbytes)
+        self.observe("request_latency_s", latency)
+        self.event("request", url=url, status=status, latency_s=round(latency, 4), bytes=nbytes)
+
+    def retry(self, reason, backoff_s: float):
+        self.incr("retries")
+        self.incr("backoff_s", backoff_s)
+        self.observe("backoff_s", backoff_s)
+        self.event("retry", reason=reason, backoff_s=backoff_s)
+
+    def rows(self, n: int):
+        self.incr("rows_inserted", n)
+
+    @contextmanager
+    def timer(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self.observe(name, dt)
+            self.event("timing", name=name, seconds=round(dt, 4))
+
+    def commit(self, conn):
+        with self.timer("db_commit_s"):
+            conn.commit()
+
+    # ----- progress -----
+
+    def write(self, msg: str):
+        """print() that does not break the progress bar."""
+        if self.bar is not None:
+            self.bar.write(msg)
+        else:
+            print(msg)
+
+    def step(self, n: int = 1):
+        self.incr("persons", n)
+        if self.bar is None:
+            return
+        with self._lock:
+            self.bar.update(n)
+        self.bar.set_postfix_str(self.summary_line(), refresh=False)
+
+    def summary_line(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        reqs = self.counters.get("requests", 0)
+        rate_429 = self.counters.get("status_429", 0) / reqs if reqs else 0.0
+        return (
+            f"{reqs / elapsed:.2f} req/s, 429 {rate_429:.0%}, "
+            f"{self.counters.get('bytes', 0) / 1e6:.1f} MB, "
+            f"{self.counters.get('rows_inserted', 0) / elapsed:.1f} rows/s, "
+            f"retries {self.counters.get('retries', 0)}"
+        )
+
+    def summary(self) -> dict:
+        return {
+            "elapsed_s": round(time.perf_counter() - self.started, 3),
+            "counters": dict(self.counters),
+            "histograms": {k: h.summary() for k, h in self.hists.items()},
+        }
+
+    def close(self):
+        summary = self.summary()
+        self.event("summary", **summary)
+        if self.bar is not None:
+            self.bar.close()
+            print(f"[{self.stage}] {self.summary_line()}")
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        return summary